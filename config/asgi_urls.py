@@ -0,0 +1,17 @@
+# config/asgi_urls.py
+
+"""
+URL configuration used by the ASGI application (see config/asgi.py).
+
+The FAQ list, detail, search and dump routes come first and resolve to the
+native async views; everything else falls through to config.urls.
+"""
+
+from django.urls import include, path
+
+from config.urls import urlpatterns as sync_urlpatterns
+
+
+urlpatterns = [
+    path('api/', include('faqs.async_urls', namespace='faqs_async')),
+] + sync_urlpatterns
@@ -55,6 +55,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'faqs.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -88,12 +89,50 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite by default, PostgreSQL with DB_ENGINE=postgresql
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'faqs'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', '127.0.0.1'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Persistent connections, reused across requests for this many
+            # seconds. They are checked before reuse, so a connection the
+            # server dropped isn't handed to a request. Use 0 under ASGI, or
+            # put PgBouncer in front for a shared pool.
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+            },
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+        }
+    }
+
+# Applied to every new SQLite connection by faqs.db.apply_sqlite_pragmas. WAL
+# lets readers carry on while a write transaction is open, busy_timeout makes
+# writers wait for each other (in ms) instead of failing with "database is
+# locked", and mmap_size reads the file through memory mapping.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'memory',
+} if os.getenv('SQLITE_TUNED', '1') == '1' else {}
 
 
 # Password validation
@@ -127,6 +166,19 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Languages FAQs are served in. English is the source, every other language is
+# translated from it; adding one here needs no schema change
+FAQ_LANGUAGES = [
+    ('en', 'English'),
+    ('hi', 'Hindi'),
+    ('bn', 'Bengali'),
+]
+
+# Languages tried for a requested language before English, when neither it nor
+# its base language (bn for bn-IN) is served, e.g. {'as': ['bn']}
+FAQ_LANGUAGE_FALLBACKS = {}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
@@ -158,7 +210,10 @@ CKEDITOR_CONFIG = {
         'width': '100%',
         'toolbar_Custom': [
             ['Bold', 'Italiz', 'Underline'],
-            ['NumberedList', 'BulletedList', '-', 'Outdent', 'Indent', '-', 'JustifyLeft', 'JustifyCenter', 'JustifyRight', 'JustifyBlock'],
+            [
+                'NumberedList', 'BulletedList', '-', 'Outdent', 'Indent', '-',
+                'JustifyLeft', 'JustifyCenter', 'JustifyRight', 'JustifyBlock',
+            ],
             ['Link', 'Unlink'],
             ['RemoveFormat', 'Source']
         ],
@@ -194,9 +249,21 @@ REST_FRAMEWORK = {
 # Cache configuration using Redis
 REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1')
 
-# Cache configuration
+# Cache configuration: a per-process LRU ("default") in front of Redis, kept
+# coherent through a Redis pub/sub invalidation channel
 CACHES = {
     "default": {
+        "BACKEND": "faqs.cache_backends.TwoTierCache",
+        "LOCATION": "redis",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 5000)),
+            "LOCAL_TIMEOUT": int(os.getenv('LOCAL_CACHE_TIMEOUT', 60)),
+            "CHANNEL": "faq-cache-invalidate",
+            # Connections of the async Redis pool, per event loop
+            "ASYNC_MAX_CONNECTIONS": int(os.getenv('ASYNC_REDIS_MAX_CONNECTIONS', 200)),
+        },
+    },
+    "redis": {
         "BACKEND": "django_redis.cache.RedisCache",  # updated backend
         "LOCATION": REDIS_URL,
         "OPTIONS": {
@@ -213,6 +280,75 @@ CACHES = {
 # Cache time to live is 15 minutes
 CACHE_TTL = 60 * 15
 
+# Pre-rendered FAQ responses are written through on save, so they can live long
+FAQ_RENDERED_TTL = 60 * 60 * 24
+
+# List pages are fresh for the soft TTL and kept (served stale while one
+# request rebuilds them) until the hard TTL
+FAQ_LIST_SOFT_TTL = 60 * 5
+FAQ_LIST_HARD_TTL = 60 * 60
+# Rebuild lock lifetime, and how long other requests wait for a rebuild
+FAQ_CACHE_LOCK_TIMEOUT = 10
+FAQ_CACHE_LOCK_WAIT = 2
+
+# Most results /api/faqs/search/ returns for one query
+FAQ_SEARCH_MAX_RESULTS = 50
+
+# Postings read per query term, heaviest first: the candidates a search ranks.
+# Bounds the work of a query on terms that appear in most FAQs
+FAQ_SEARCH_CANDIDATES_PER_TERM = 100
+
+# Most changes /api/faqs/changes/ reads per call, clients page with the returned token
+FAQ_CHANGES_PAGE_SIZE = 500
+
+# Seconds a change is held back from /api/faqs/changes/. Tokens are ids, given
+# out when a change is inserted rather than when it commits, so on PostgreSQL a
+# change can commit below a token a client already holds. Holding the newest
+# changes back covers transactions that commit within this many seconds.
+# SQLite commits writes in id order and needs none
+FAQ_CHANGES_SETTLE_SECONDS = int(os.getenv('FAQ_CHANGES_SETTLE_SECONDS', 0 if DB_ENGINE == 'sqlite' else 30))
+
+# FAQs read from the database and the cache at a time by /api/faqs/dump/
+FAQ_DUMP_CHUNK_SIZE = 500
+
+# Requests of each FAQ are counted in memory and added to the database at most
+# this often (seconds), warm_faq_cache reads the counts to pick the hot FAQs
+FAQ_ACCESS_FLUSH_INTERVAL = 60
+
+# Re-warm an FAQ and the first list pages in the background whenever its cache
+# is invalidated, instead of leaving the next requests to rebuild them
+FAQ_CACHE_REWARM = os.getenv('FAQ_CACHE_REWARM', '0') == '1'
+# List pages warmed per language, and the threads warm_faq_cache uses by default
+FAQ_CACHE_WARM_LIST_PAGES = 1
+FAQ_CACHE_WARM_WORKERS = int(os.getenv('FAQ_CACHE_WARM_WORKERS', 4))
+
+# Send each response's database / cache / translation / serialization timings
+# in a Server-Timing header. The /metrics histograms are collected either way.
+FAQ_SERVER_TIMING = os.getenv('FAQ_SERVER_TIMING', '1') == '1'
+
+# Who may read /metrics: scrapers from these addresses (comma separated) or
+# sending "Authorization: Bearer <FAQ_METRICS_TOKEN>". With neither set the
+# endpoint answers 404
+FAQ_METRICS_ALLOWED_IPS = [ip for ip in os.getenv('FAQ_METRICS_ALLOWED_IPS', '').split(',') if ip]
+FAQ_METRICS_TOKEN = os.getenv('FAQ_METRICS_TOKEN', '')
+
+# Translation queue: attempts before a job is marked failed, and the backoff
+# base/cap (seconds) between retries
+FAQ_TRANSLATION_MAX_ATTEMPTS = int(os.getenv('FAQ_TRANSLATION_MAX_ATTEMPTS', 5))
+FAQ_TRANSLATION_RETRY_BACKOFF = int(os.getenv('FAQ_TRANSLATION_RETRY_BACKOFF', 30))
+FAQ_TRANSLATION_RETRY_MAX_DELAY = 60 * 60
+# Running jobs older than this (seconds) are considered abandoned and re-claimed
+FAQ_TRANSLATION_LEASE = 5 * 60
+
+# Batched translation: max characters / segments packed into one backend call,
+# and how many calls run concurrently
+FAQ_TRANSLATION_BATCH_CHARS = 4500
+FAQ_TRANSLATION_BATCH_SIZE = 100
+FAQ_TRANSLATION_CONCURRENCY = int(os.getenv('FAQ_TRANSLATION_CONCURRENCY', 4))
+
+# Entries kept in the in-process LRU in front of the translation memory table
+FAQ_TRANSLATION_MEMORY_SIZE = 10000
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
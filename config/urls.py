@@ -21,10 +21,12 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from faqs.views import metrics
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('faqs.urls', namespace='faqs')),
     path('ckeditor/', include('ckeditor_uploader.urls')),
+    path('metrics', metrics, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
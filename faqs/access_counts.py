@@ -0,0 +1,73 @@
+# faqs/access_counts.py
+
+# How often each FAQ is served, read by warm_faq_cache to warm the most
+# requested FAQs first. Requests are counted in memory and added to the
+# database at most every FAQ_ACCESS_FLUSH_INTERVAL seconds, a few queries for
+# all the requests of the interval. The counts are kept in the database rather
+# than the cache so they survive the cache flush they are needed after.
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+from .models import FAQ, FAQAccessCount
+
+
+logger = logging.getLogger(__name__)
+
+_pending = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_access(faq_id):
+  """Count a request of an FAQ, returns True when the counts are due to be flushed"""
+  with _lock:
+    _pending[int(faq_id)] += 1
+    return time.monotonic() - _last_flush >= settings.FAQ_ACCESS_FLUSH_INTERVAL
+
+
+def flush_access_counts():
+  """Add the requests counted in memory to the database, returns how many there were"""
+  global _pending, _last_flush
+  with _lock:
+    pending, _pending = _pending, Counter()
+    _last_flush = time.monotonic()
+  if not pending:
+    return 0
+
+  try:
+    # FAQs deleted since they were requested are left out
+    existing = FAQ.objects.filter(pk__in=list(pending)).values_list('pk', flat=True)
+    by_amount = defaultdict(list)
+    for faq_id in existing:
+      by_amount[pending[faq_id]].append(faq_id)
+
+    with transaction.atomic():
+      FAQAccessCount.objects.bulk_create(
+        [FAQAccessCount(faq_id=faq_id) for ids in by_amount.values() for faq_id in ids],
+        ignore_conflicts=True,
+      )
+      # One UPDATE per distinct amount, most FAQs were requested a handful of times
+      for amount, ids in by_amount.items():
+        FAQAccessCount.objects.filter(faq_id__in=ids).update(count=F('count') + amount)
+  except DatabaseError as e:
+    logger.warning(f"Couldn't store the FAQ access counts, keeping them for the next flush: {str(e)}")
+    with _lock:
+      _pending.update(pending)
+    return 0
+  return sum(pending.values())
+
+
+def most_requested(limit):
+  """Ids of the `limit` most requested active FAQs, most requested first"""
+  return list(
+    FAQAccessCount.objects.filter(faq__is_active=True)
+    .order_by('-count', '-faq_id')
+    .values_list('faq_id', flat=True)[:limit]
+  )
@@ -1,14 +1,53 @@
 # faqs/admin.py
 
+from ckeditor.widgets import CKEditorWidget
+from django import forms
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import FAQ
+from .languages import LANGUAGES, TRANSLATION_LANGUAGES
+from .models import FAQ, TranslationJob
+
+def _translation_form_fields():
+  """Form fields for the question_<lang> / answer_<lang> attributes of every language"""
+  fields = {}
+  for lang in TRANSLATION_LANGUAGES:
+    name = LANGUAGES[lang]
+    fields[f'question_{lang}'] = forms.CharField(label=f'Question ({name})', required=False, widget=forms.Textarea)
+    fields[f'answer_{lang}'] = forms.CharField(label=f'Answer ({name})', required=False, widget=CKEditorWidget())
+  return fields
+
+
+class BaseFAQAdminForm(forms.ModelForm):
+  class Meta:
+    model = FAQ
+    fields = '__all__'
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    if self.instance.pk:
+      for name in _translation_form_fields():
+        self.initial.setdefault(name, getattr(self.instance, name))
+
+  def save(self, commit=True):
+    # Stage the translations on the instance, FAQ.save() stores them
+    for name in _translation_form_fields():
+      if name in self.changed_data:
+        setattr(self.instance, name, self.cleaned_data[name] or None)
+    return super().save(commit)
+
+
+FAQAdminForm = type('FAQAdminForm', (BaseFAQAdminForm,), _translation_form_fields())
+
 
 @admin.register(FAQ)
 class FAQAdmin(admin.ModelAdmin):
-  list_display = ('question_preview', 'languages_available', 'created_at', 'updated_at', 'is_active')
+  form = FAQAdminForm
+  list_display = (
+    'question_preview', 'languages_available', 'translation_status', 'created_at', 'updated_at', 'is_active',
+  )
   list_filter = ('is_active', 'created_at', 'updated_at')
-  search_fields = ('question', 'answer', 'question_hi', 'question_bn')
+  search_fields = ('question', 'answer', 'translations__question')
   readonly_fields = ('created_at', 'updated_at')
 
   fieldsets = (
@@ -16,16 +55,14 @@ class FAQAdmin(admin.ModelAdmin):
       'fields': ('question', 'answer'),
       'description': 'Enter the FAQ content in English (required)'
     }),
-    ('Hindi Translation', {
-      'fields': ('question_hi', 'answer_hi'),
+  ) + tuple(
+    (f'{LANGUAGES[lang]} Translation', {
+      'fields': (f'question_{lang}', f'answer_{lang}'),
       'classes': ('collapse',),
-      'description': 'Enter the hindi translation (optional)'
-    }),
-    ('Bengali Translation', {
-      'fields': ('question_bn', 'answer_bn'),
-      'classes': ('collapse',),
-      'description': 'Enter the bengali translation (optional)'
-    }),
+      'description': f'Enter the {LANGUAGES[lang].lower()} translation (optional)'
+    })
+    for lang in TRANSLATION_LANGUAGES
+  ) + (
     ('Metadata', {
       'fields': ('is_active', 'created_at', 'updated_at'),
       'classes': ('collapse',)
@@ -40,14 +77,21 @@ class FAQAdmin(admin.ModelAdmin):
   def languages_available(self, obj):
     """Display available translation"""
     languages = ['English']
-    if obj.question_hi and obj.answer_hi:
-      languages.append('Hindi')
-    if obj.question_bn and obj.answer_bn:
-      languages.append('Bengali')
+    for row in obj.translations.all():
+      if row.question and row.answer:
+        languages.append(LANGUAGES.get(row.lang, row.lang))
 
     return format_html('<br>'.join(languages))
   languages_available.short_description = 'Available Languages'
 
+  def translation_status(self, obj):
+    """Display the status of the background translations"""
+    return ', '.join(f'{job.lang}: {job.status}' for job in obj.translation_jobs.all())
+  translation_status.short_description = 'Translation Status'
+
+  def get_queryset(self, request):
+    return super().get_queryset(request).prefetch_related('translations', 'translation_jobs')
+
   class Media:
     css = {
       'all': ('admin/css/custom_admin.css',)
@@ -59,4 +103,17 @@ class FAQAdmin(admin.ModelAdmin):
     super().save_model(req, obj, form, change)
 
   def has_delete_permission(self, request, obj=None):
-    return request.user.is_superuser
\ No newline at end of file
+    return request.user.is_superuser
+
+
+@admin.register(TranslationJob)
+class TranslationJobAdmin(admin.ModelAdmin):
+  list_display = ('faq', 'lang', 'status', 'attempts', 'run_after', 'updated_at')
+  list_filter = ('status', 'lang')
+  readonly_fields = ('faq', 'lang', 'attempts', 'locked_at', 'last_error', 'created_at', 'updated_at')
+  actions = ['retry_jobs']
+
+  def retry_jobs(self, request, queryset):
+    """Put the selected jobs back on the queue"""
+    queryset.update(status=TranslationJob.STATUS_PENDING, attempts=0, run_after=timezone.now(), last_error='')
+  retry_jobs.short_description = 'Retry selected translation jobs'
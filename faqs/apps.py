@@ -1,9 +1,32 @@
 # faqs/app.py
 
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class FaqsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'faqs'
     verbose_name = 'FAQS'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, pre_delete
+        from .changes import log_deletion
+        from .db import apply_sqlite_pragmas
+        from .metrics import install_query_timer
+        from .models import FAQ
+        from .search import unindex_on_delete
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='faqs.db.apply_sqlite_pragmas')
+        # Every query is timed for the request metrics
+        connection_created.connect(install_query_timer, dispatch_uid='faqs.metrics.install_query_timer')
+        # Also covers queryset deletes, which skip FAQ.delete()
+        pre_delete.connect(unindex_on_delete, sender=FAQ, dispatch_uid='faqs.search.unindex_on_delete')
+        post_delete.connect(log_deletion, sender=FAQ, dispatch_uid='faqs.changes.log_deletion')
+
+        if settings.FAQ_CACHE_REWARM:
+            from .cache_warming import rewarm_on_clear
+            from .signals import faq_cache_cleared
+
+            faq_cache_cleared.connect(rewarm_on_clear, dispatch_uid='faqs.cache_warming.rewarm_on_clear')
@@ -0,0 +1,14 @@
+# faqs/async_urls.py
+
+from django.urls import path
+from . import async_views
+
+app_name = 'faqs_async'
+
+# Only the hot reads and the dump, every other API route is served by faqs.urls
+urlpatterns = [
+  path('faqs/', async_views.faq_list, name='faq-list'),
+  path('faqs/search/', async_views.faq_search, name='faq-search'),
+  path('faqs/dump/', async_views.faq_dump, name='faq-dump'),
+  path('faqs/<int:pk>/', async_views.faq_detail, name='faq-detail'),
+]
@@ -0,0 +1,118 @@
+# faqs/async_views.py
+
+# Native async FAQ reads, served through config/asgi.py. A request whose page
+# and bodies are all cached is answered without leaving the event loop; a miss
+# falls through to the sync viewset in a thread, where rebuilds keep their
+# stampede protection.
+
+import functools
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.request import Request
+
+from .access_counts import flush_access_counts, record_access
+from .cache_keys import LIST_NAMESPACE, aget_version, detail_key, faq_namespace, list_key, modified_key
+from .conditional import is_not_modified, make_etag, not_modified, page_etag, set_validators
+from .languages import get_language, set_language_headers
+from .pagination import FAQCursorPagination
+from .rendering import (
+  acompress_sequence, aget_rendered_many, aiter_rendered, astream_json, astream_ndjson, json_response, render_json,
+  render_page,
+)
+from .search import asearch
+from .views import FAQViewSet, dump_ids, dump_response
+
+
+_list_view = FAQViewSet.as_view({'get': 'list'})
+_detail_view = FAQViewSet.as_view({'get': 'retrieve'})
+
+
+def negotiated(view):
+  """Add the Content-Language and Vary headers the viewset adds to its responses"""
+  @functools.wraps(view)
+  async def wrapper(request, *args, **kwargs):
+    response = await view(request, *args, **kwargs)
+    return set_language_headers(response, get_language(request))
+  return wrapper
+
+
+@negotiated
+async def faq_list(request):
+  lang = get_language(request)
+  paginator = FAQCursorPagination()
+  cursor = request.GET.get(paginator.cursor_query_param, '')
+  page_size = paginator.get_page_size(Request(request))
+  version = await aget_version(LIST_NAMESPACE)
+  etag = make_etag('faq_list', version, lang, page_size, cursor)
+
+  # If-None-Match is answered from the counter alone, before the page is read
+  if 'If-None-Match' in request.headers and is_not_modified(request, etag, None):
+    return not_modified(etag)
+
+  envelope = await cache.aget(list_key(lang, page_size, cursor, version))
+  if envelope is None or envelope['fresh_until'] <= time.time():
+    return await sync_to_async(_list_view)(request)
+
+  page = envelope['value']
+  served_etag = page_etag(page, lang, page_size, cursor)
+  if is_not_modified(request, served_etag, lambda: page.get('last_modified')):
+    return not_modified(served_etag)
+
+  results = await aget_rendered_many(page['ids'], lang)
+  next_link = paginator.page_link(request, page.get('next_cursor'))
+  previous_link = paginator.page_link(request, page.get('previous_cursor'))
+  response = json_response(render_page(results, next_link, previous_link))
+  return set_validators(response, served_etag, page.get('last_modified'))
+
+
+@negotiated
+async def faq_detail(request, pk):
+  lang = get_language(request)
+  version = await aget_version(faq_namespace(pk))
+  etag = make_etag('faq', pk, version, lang)
+
+  if 'If-None-Match' in request.headers and is_not_modified(request, etag, None):
+    return not_modified(etag)
+
+  body_key, modified = detail_key(pk, lang, version), modified_key(pk, version)
+  found = await cache.aget_many([body_key, modified])
+  if body_key not in found or modified not in found:
+    return await sync_to_async(_detail_view)(request, pk=pk)
+
+  if is_not_modified(request, etag, lambda: found[modified]):
+    return not_modified(etag)
+  if record_access(pk):
+    await sync_to_async(flush_access_counts)()
+  return set_validators(json_response(found[body_key]), etag, found[modified])
+
+
+@negotiated
+async def faq_search(request):
+  lang = get_language(request)
+  query = request.GET.get('q', '').strip()
+  try:
+    limit = min(max(int(request.GET.get('limit', 10)), 1), settings.FAQ_SEARCH_MAX_RESULTS)
+  except ValueError:
+    return json_response(render_json({'detail': 'limit must be an integer'}), status=400)
+
+  results = await asearch(query, lang, limit=limit)
+  return json_response(render_json({'query': query, 'results': results}))
+
+
+@negotiated
+async def faq_dump(request):
+  """
+  The dump as an async stream. Under ASGI Django reads a sync stream into
+  memory before sending any of it, which the sync view's would be.
+  """
+  chunk_size = settings.FAQ_DUMP_CHUNK_SIZE
+  chunks = aiter_rendered(dump_ids().aiterator(chunk_size=chunk_size), get_language(request), chunk_size=chunk_size)
+
+  if request.GET.get('ndjson'):
+    content, content_type = astream_ndjson(chunks), 'application/x-ndjson'
+  else:
+    content, content_type = astream_json(chunks), 'application/json'
+  return dump_response(request, content, content_type, acompress_sequence)
@@ -0,0 +1,393 @@
+# faqs/benchmarks.py
+
+# In-process load generators for the API. Requests are handed straight to the
+# WSGI or ASGI application, so the numbers measure the request path without a
+# web server in front of it.
+
+import asyncio
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.test.utils import override_settings
+
+from .bulk import TRANSLATION_COLUMNS, import_faqs
+from .cache_warming import default_host
+from .languages import LANGUAGES
+from .models import FAQ
+from .rendering import render_faqs
+from .search import search
+from .serializers import FAQSerializer
+
+
+ENDPOINTS = ('list', 'detail', 'search')
+CACHE_STATES = ('cold', 'warm')
+
+# A cache of its own for benchmark runs, they flush it between scenarios
+LOCMEM_CACHES = {
+  'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'faq-benchmark',
+    'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+  },
+}
+
+# Distinct FAQs requested by the detail scenario
+DETAIL_SAMPLE = 200
+
+# An average of half a query more per request than the baseline is a regression
+QUERY_SLACK = 0.5
+
+# Latency differences below this are noise, whatever the tolerance
+LATENCY_SLACK_MS = 10
+
+# Words the seeded FAQs are made of, so searches have a realistic spread of hits
+VOCABULARY = (
+  'account', 'password', 'payment', 'refund', 'order', 'delivery', 'address', 'invoice', 'subscription',
+  'profile', 'email', 'phone', 'login', 'security', 'card', 'wallet', 'coupon', 'return', 'warranty',
+  'support', 'language', 'notification', 'privacy', 'report', 'upload', 'download', 'export', 'team',
+)
+VERBS = ('change', 'reset', 'cancel', 'update', 'track', 'verify', 'delete', 'add', 'find', 'share')
+
+
+@contextmanager
+def benchmark_database(keepdb=False, caches=LOCMEM_CACHES):
+  """
+  Run against a database of its own, created next to the configured one like
+  the test database, and the given caches.
+  """
+  test_settings = connection.settings_dict.setdefault('TEST', {})
+  if not test_settings.get('NAME'):
+    if connection.vendor == 'sqlite':
+      test_settings['NAME'] = str(settings.BASE_DIR / 'benchmark_faqs.sqlite3')
+    else:
+      test_settings['NAME'] = 'benchmark_faqs'
+  old_name = connection.settings_dict['NAME']
+  connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb, serialize=False)
+  try:
+    with override_settings(CACHES=caches):
+      yield
+  finally:
+    connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def seed_rows(count, seed=0):
+  """Synthetic FAQ rows with every translation filled in"""
+  rng = random.Random(seed)
+  for i in range(count):
+    verb, noun = rng.choice(VERBS), rng.choice(VOCABULARY)
+    question = f'How do I {verb} my {noun} ({i})?'
+    answer = ''.join(f"<p>{' '.join(rng.choices(VOCABULARY + VERBS, k=24))}.</p>" for _ in range(3))
+    row = {'question': question, 'answer': answer}
+    for column in TRANSLATION_COLUMNS:
+      lang = column.rsplit('_', 1)[1]
+      row[column] = f'[{lang}] {question}' if column.startswith('question') else answer.replace('<p>', f'<p>[{lang}] ')
+    yield row
+
+
+def seed_faqs(count, batch_size=1000):
+  """Top the database up to `count` FAQs, returns how many were created"""
+  missing = count - FAQ.objects.count()
+  if missing <= 0:
+    return 0
+  return import_faqs(seed_rows(missing), batch_size=batch_size)
+
+
+def scenario_paths(endpoint, sample=DETAIL_SAMPLE):
+  """Paths requested by a scenario, in every language"""
+  if endpoint == 'list':
+    paths = ['/api/faqs/?lang={lang}']
+  elif endpoint == 'detail':
+    ids = FAQ.objects.filter(is_active=True).order_by('?').values_list('pk', flat=True)[:sample]
+    paths = [f'/api/faqs/{pk}/?lang={{lang}}' for pk in ids]
+  else:
+    paths = [f'/api/faqs/search/?q={noun}+{verb}&lang={{lang}}' for noun, verb in zip(VOCABULARY, VERBS * 3)]
+  return [path.format(lang=lang) for path in paths for lang in LANGUAGES]
+
+
+def percentile(values, pct):
+  """Nearest-rank percentile of a list of numbers"""
+  if not values:
+    return None
+  ordered = sorted(values)
+  return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(results, elapsed):
+  """Throughput, latency percentiles (in ms) and queries per request of a run"""
+  latencies = [latency for latency, _, _ in results]
+  queries = [count for _, _, count in results if count is not None]
+  return {
+    'requests': len(results),
+    'errors': sum(1 for _, status, _ in results if status >= 400),
+    'rps': round(len(results) / elapsed, 1) if elapsed else None,
+    'p50': round(percentile(latencies, 50) * 1000, 2),
+    'p95': round(percentile(latencies, 95) * 1000, 2),
+    'p99': round(percentile(latencies, 99) * 1000, 2),
+    'queries': round(sum(queries) / len(queries), 2) if queries else None,
+  }
+
+
+def _wsgi_call(application, path, before=None):
+  parts = urlsplit(path)
+  environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query, 'HTTP_HOST': default_host()}
+  setup_testing_defaults(environ)
+  statuses = []
+  queries = 0
+
+  def count_query(execute, sql, params, many, context):
+    nonlocal queries
+    queries += 1
+    return execute(sql, params, many, context)
+
+  if before is not None:
+    before()
+
+  # The connection is per thread, so this only counts this request's queries
+  with connection.execute_wrapper(count_query):
+    started = time.perf_counter()
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+      for _ in body:
+        pass
+    finally:
+      if hasattr(body, 'close'):
+        body.close()
+    latency = time.perf_counter() - started
+  return latency, int(statuses[0].split()[0]), queries
+
+
+def run_wsgi(application, paths, requests, concurrency, before=None):
+  """
+  Send requests round-robin over paths from a pool of threads, like a threaded
+  WSGI server. ``before`` is called ahead of every request, outside the timing.
+  """
+  with ThreadPoolExecutor(max_workers=concurrency) as executor:
+    started = time.perf_counter()
+    results = list(executor.map(lambda i: _wsgi_call(application, paths[i % len(paths)], before), range(requests)))
+    elapsed = time.perf_counter() - started
+  return summarize(results, elapsed)
+
+
+async def _asgi_call(application, path):
+  parts = urlsplit(path)
+  scope = {
+    'type': 'http',
+    'asgi': {'version': '3.0'},
+    'http_version': '1.1',
+    'method': 'GET',
+    'scheme': 'http',
+    'path': parts.path,
+    'raw_path': parts.path.encode(),
+    'query_string': parts.query.encode(),
+    'root_path': '',
+    'headers': [(b'host', default_host().encode())],
+    'client': ('127.0.0.1', 0),
+    'server': ('127.0.0.1', 80),
+  }
+  sent_body = False
+  statuses = []
+
+  async def receive():
+    nonlocal sent_body
+    if not sent_body:
+      sent_body = True
+      return {'type': 'http.request', 'body': b'', 'more_body': False}
+    # The client never disconnects, the handler cancels this once it has answered
+    await asyncio.Event().wait()
+
+  async def send(message):
+    if message['type'] == 'http.response.start':
+      statuses.append(message['status'])
+
+  started = time.perf_counter()
+  await application(scope, receive, send)
+  # Queries run in sync_to_async threads and aren't counted
+  return time.perf_counter() - started, statuses[0], None
+
+
+def run_asgi(application, paths, requests, concurrency):
+  """Keep `concurrency` requests in flight on one event loop, like a single ASGI worker"""
+  async def main():
+    pending = iter(range(requests))
+    results = []
+
+    async def client():
+      for i in pending:
+        results.append(await _asgi_call(application, paths[i % len(paths)]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+  results, elapsed = asyncio.run(main())
+  return summarize(results, elapsed)
+
+
+def run_suite(application, requests, concurrency, endpoints=ENDPOINTS, states=CACHE_STATES):
+  """
+  Run every endpoint against a cold and a warm cache, returns the summaries by
+  '<endpoint>/<state>'. Cold requests each start from an empty cache, warm
+  ones run after every path has been requested once.
+  """
+  results = {}
+  for endpoint in endpoints:
+    paths = scenario_paths(endpoint)
+    for state in states:
+      cache.clear()
+      if state == 'cold':
+        results[f'{endpoint}/{state}'] = run_wsgi(application, paths, requests, concurrency, before=cache.clear)
+      else:
+        run_wsgi(application, paths, len(paths), 1)
+        results[f'{endpoint}/{state}'] = run_wsgi(application, paths, requests, concurrency)
+  return results
+
+
+def compare(results, baseline, tolerance=0.2):
+  """Regressions of a run against a baseline run, as messages"""
+  regressions = []
+  for name, base in baseline.items():
+    current = results.get(name)
+    if current is None:
+      continue
+    if current['p95'] > max(base['p95'] * (1 + tolerance), base['p95'] + LATENCY_SLACK_MS):
+      regressions.append(f"{name}: p95 {current['p95']}ms, baseline {base['p95']}ms")
+    if current['rps'] < base['rps'] * (1 - tolerance):
+      regressions.append(f"{name}: {current['rps']} req/s, baseline {base['rps']} req/s")
+    queries, base_queries = current['queries'], base['queries']
+    if queries is not None and base_queries is not None and queries - base_queries >= QUERY_SLACK:
+      regressions.append(f"{name}: {current['queries']} queries/request, baseline {base['queries']}")
+    if current['errors'] > base['errors']:
+      regressions.append(f"{name}: {current['errors']} errors, baseline {base['errors']}")
+  return regressions
+
+
+# Query shapes timed by benchmark_search. "how do i my" matches every seeded FAQ
+SEARCH_SHAPES = {
+  '1 term': 1,
+  '2 terms': 2,
+  '3 terms': 3,
+  'common words': ('how do i my',),
+}
+
+
+def search_queries(shape, count=20, seed=0):
+  """`count` queries of a shape: a number of vocabulary words, or fixed queries"""
+  if not isinstance(shape, int):
+    return list(shape)
+  rng = random.Random(seed)
+  return [' '.join(rng.sample(VOCABULARY + VERBS, shape)) for _ in range(count)]
+
+
+def run_searches(queries, repeat=5):
+  """
+  Time search() on each query in every language, `repeat` times, after one
+  untimed call. Returns summarize() of the timings, queries per search included.
+  """
+  results = []
+  elapsed = 0
+  for lang in LANGUAGES:
+    for query in queries:
+      search(query, lang)
+      for _ in range(repeat):
+        results.append(_timed_search(query, lang))
+        elapsed += results[-1][0]
+  return summarize(results, elapsed)
+
+
+def _timed_search(query, lang):
+  queries = 0
+
+  def count_query(execute, sql, params, many, context):
+    nonlocal queries
+    queries += 1
+    return execute(sql, params, many, context)
+
+  with connection.execute_wrapper(count_query):
+    started = time.perf_counter()
+    search(query, lang)
+    return time.perf_counter() - started, 200, queries
+
+
+def read_page(i, page_size=10):
+  """What the list endpoint reads and renders on a cache miss, in the i-th language"""
+  lang = list(LANGUAGES)[i % len(LANGUAGES)]
+  queryset = FAQSerializer.prepare_queryset(FAQ.objects.filter(is_active=True), lang)
+  render_faqs(list(queryset.order_by('-created_at', '-id')[:page_size]), lang)
+
+
+_writes = itertools.count()
+
+
+def write_faq():
+  """An admin save: the FAQ, its translations, change log and search terms in one transaction"""
+  n = next(_writes)
+  with transaction.atomic():
+    FAQ.objects.create(
+      question=f'Benchmark write {n}?',
+      answer='<p>Written while the readers run.</p>',
+      **{column: f'[{column}] {n}' for column in TRANSLATION_COLUMNS},
+    )
+
+
+def run_read_under_write(reads, readers, writers, read=read_page, write=write_faq):
+  """
+  Time `reads` calls of read() from a pool of `readers` threads while
+  `writers` threads call write() in a loop. Connections are released after
+  every call like at the end of a request. A call failing with a database
+  error (e.g. "database is locked") counts as an error.
+  """
+  stop = threading.Event()
+  lock = threading.Lock()
+  written = {'ok': 0, 'failed': 0}
+
+  def writer():
+    while not stop.is_set():
+      try:
+        write()
+        outcome = 'ok'
+      except DatabaseError:
+        outcome = 'failed'
+      finally:
+        close_old_connections()
+      with lock:
+        written[outcome] += 1
+    connection.close()
+
+  def reader(i):
+    started = time.perf_counter()
+    try:
+      read(i)
+      status = 200
+    except DatabaseError:
+      status = 500
+    finally:
+      close_old_connections()
+    return time.perf_counter() - started, status, None
+
+  threads = [threading.Thread(target=writer, daemon=True) for _ in range(writers)]
+  for thread in threads:
+    thread.start()
+  try:
+    with ThreadPoolExecutor(max_workers=readers) as executor:
+      started = time.perf_counter()
+      results = list(executor.map(reader, range(reads)))
+      elapsed = time.perf_counter() - started
+  finally:
+    stop.set()
+    for thread in threads:
+      thread.join()
+
+  summary = summarize(results, elapsed)
+  summary['writes'] = round(written['ok'] / elapsed, 1)
+  summary['write_errors'] = written['failed']
+  return summary
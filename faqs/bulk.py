@@ -0,0 +1,187 @@
+# faqs/bulk.py
+
+# Bulk import and export of FAQs. Files are streamed a row at a time so memory
+# use doesn't grow with the corpus. Imports are written a batch at a time with
+# bulk_create, skipping FAQ.save() and its per-row side effects: translations,
+# jobs, the change log and the search index are written per batch, and the
+# cache is invalidated once at the end.
+
+import csv
+import json
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+
+from .cache_keys import LIST_NAMESPACE, bump_version
+from .hashing import source_hash
+from .languages import TRANSLATION_LANGUAGES
+from .models import FAQ, FAQChange, FAQTranslation, TRANSLATED_FIELDS, TranslationJob, translations_prefetch
+from .search import index_new_faqs
+
+
+FORMATS = ('jsonl', 'csv')
+
+# Translations are columns named like the question_<lang> / answer_<lang> attributes
+TRANSLATION_COLUMNS = [f'{field}_{lang}' for lang in TRANSLATION_LANGUAGES for field in TRANSLATED_FIELDS]
+EXPORT_COLUMNS = ['id', 'question', 'answer', 'is_active', 'created_at', 'updated_at'] + TRANSLATION_COLUMNS
+
+
+def guess_format(path):
+  return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_rows(stream, fmt='jsonl'):
+  """Yield the rows of a JSONL or CSV stream as dicts"""
+  if fmt == 'csv':
+    yield from csv.DictReader(stream)
+    return
+
+  for number, line in enumerate(stream, start=1):
+    if not line.strip():
+      continue
+    try:
+      yield json.loads(line)
+    except ValueError as e:
+      raise ValueError(f"Line {number}: invalid JSON ({str(e)})")
+
+
+def _parse_bool(value, default=True):
+  if value is None or value == '':
+    return default
+  if isinstance(value, bool):
+    return value
+  return str(value).strip().lower() not in ('0', 'false', 'no')
+
+
+def _build(row, number):
+  """The unsaved FAQ of a row and the translations it brings along"""
+  question, answer = row.get('question'), row.get('answer')
+  if not question or not answer:
+    raise ValueError(f"Row {number}: question and answer are required")
+
+  faq = FAQ(question=question, answer=answer, is_active=_parse_bool(row.get('is_active')))
+  staged = {}
+  for lang in TRANSLATION_LANGUAGES:
+    for field in TRANSLATED_FIELDS:
+      if row.get(f'{field}_{lang}'):
+        staged[(lang, field)] = row[f'{field}_{lang}']
+  return faq, staged
+
+
+def _translate_missing(batch, translator):
+  """Translate the fields rows didn't bring, one batched call per field"""
+  for field in TRANSLATED_FIELDS:
+    entries = [
+      (faq, staged) for faq, staged in batch
+      if any((lang, field) not in staged for lang in TRANSLATION_LANGUAGES)
+    ]
+    if not entries:
+      continue
+
+    texts = [getattr(faq, field) for faq, _ in entries]
+    if field == 'answer':
+      translated = translator.translate_html_batch(texts, TRANSLATION_LANGUAGES)
+    else:
+      translated = translator.translate_batch(texts, TRANSLATION_LANGUAGES)
+
+    for lang in TRANSLATION_LANGUAGES:
+      for (_, staged), value in zip(entries, translated[lang]):
+        if value and (lang, field) not in staged:
+          staged[(lang, field)] = value
+
+
+def _write_batch(batch, translator=None):
+  if translator is not None:
+    _translate_missing(batch, translator)
+
+  with transaction.atomic():
+    faqs = FAQ.objects.bulk_create([faq for faq, _ in batch])
+
+    translations = []
+    jobs = []
+    for faq, staged in batch:
+      hashes = {field: source_hash(getattr(faq, field)) for field in TRANSLATED_FIELDS}
+      for lang in TRANSLATION_LANGUAGES:
+        values = {field: staged.get((lang, field)) for field in TRANSLATED_FIELDS}
+        if any(values.values()):
+          translations.append(FAQTranslation(
+            faq=faq,
+            lang=lang,
+            **values,
+            **{f'{field}_source_hash': hashes[field] for field, value in values.items() if value},
+          ))
+        # Whatever is still missing is left to the workers
+        if not all(values.values()):
+          jobs.append(TranslationJob(faq=faq, lang=lang))
+
+    FAQTranslation.objects.bulk_create(translations)
+    TranslationJob.objects.bulk_create(jobs)
+    FAQChange.objects.bulk_create([FAQChange(faq_id=faq.pk, action=FAQChange.ACTION_CREATED) for faq in faqs])
+
+    prefetch_related_objects(faqs, translations_prefetch())
+    index_new_faqs(faqs)
+
+  return len(faqs)
+
+
+def import_faqs(rows, batch_size=500, translator=None):
+  """
+  Create FAQs from an iterable of dicts, returns how many were created.
+
+  Translations missing from the rows are translated per batch when a
+  ``translator`` (a TranslationService) is given, and queued for the workers
+  otherwise. Ids in the rows are ignored, every row is a new FAQ.
+  """
+  count = 0
+  batch = []
+  try:
+    for number, row in enumerate(rows, start=1):
+      batch.append(_build(row, number))
+      if len(batch) >= batch_size:
+        count += _write_batch(batch, translator)
+        batch = []
+    if batch:
+      count += _write_batch(batch, translator)
+  finally:
+    # Once for the whole import, including the batches written before a failure
+    if count:
+      bump_version(LIST_NAMESPACE)
+  return count
+
+
+def export_rows(chunk_size=1000, active_only=False):
+  """Yield every FAQ as a dict of EXPORT_COLUMNS, reading chunk_size FAQs at a time"""
+  queryset = FAQ.objects.order_by('pk').prefetch_related(translations_prefetch())
+  if active_only:
+    queryset = queryset.filter(is_active=True)
+
+  for faq in queryset.iterator(chunk_size=chunk_size):
+    row = {
+      'id': faq.pk,
+      'question': faq.question,
+      'answer': faq.answer,
+      'is_active': faq.is_active,
+      'created_at': faq.created_at.isoformat(),
+      'updated_at': faq.updated_at.isoformat(),
+    }
+    for lang in TRANSLATION_LANGUAGES:
+      for field in TRANSLATED_FIELDS:
+        row[f'{field}_{lang}'] = faq.get_translation(field, lang)
+    yield row
+
+
+def write_rows(rows, stream, fmt='jsonl'):
+  """Write dict rows to a JSONL or CSV stream, returns how many were written"""
+  count = 0
+  if fmt == 'csv':
+    writer = csv.DictWriter(stream, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+      writer.writerow({column: '' if value is None else value for column, value in row.items()})
+      count += 1
+    return count
+
+  for row in rows:
+    stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+    count += 1
+  return count
@@ -0,0 +1,404 @@
+# faqs/cache_backends.py
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+try:
+  import redis.asyncio
+except ImportError:
+  redis = None
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LocalStore:
+  """A size and TTL bounded LRU kept in process memory"""
+
+  def __init__(self, max_entries=5000, timeout=60):
+    self.max_entries = max_entries
+    self.timeout = timeout
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return _MISSING
+      value, expires = entry
+      if expires <= time.monotonic():
+        del self._entries[key]
+        return _MISSING
+      self._entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, timeout=None):
+    ttl = self.timeout if timeout is None else min(timeout, self.timeout)
+    if ttl <= 0:
+      return
+    with self._lock:
+      self._entries[key] = (value, time.monotonic() + ttl)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def delete(self, key):
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def __len__(self):
+    return len(self._entries)
+
+
+class LocalInvalidationBus:
+  """In-process invalidation channel, for caches that are not shared between processes"""
+  _subscribers = {}
+  _lock = threading.Lock()
+
+  def __init__(self, channel):
+    self.channel = channel
+
+  def publish(self, message):
+    for callback in list(self._subscribers.get(self.channel, [])):
+      callback(message)
+
+  def subscribe(self, callback):
+    with self._lock:
+      self._subscribers.setdefault(self.channel, []).append(callback)
+
+
+class RedisInvalidationBus:
+  """Invalidation channel over Redis pub/sub, listened to from a daemon thread"""
+
+  def __init__(self, client, channel):
+    self.client = client
+    self.channel = channel
+
+  def _subscriber_client(self):
+    # The listener blocks for as long as nothing is published, so it gets its
+    # own connection without the cache's socket timeout
+    pool = self.client.connection_pool
+    kwargs = dict(pool.connection_kwargs, socket_timeout=None)
+    return self.client.__class__(connection_pool=pool.__class__(connection_class=pool.connection_class, **kwargs))
+
+  def publish(self, message):
+    self.client.publish(self.channel, json.dumps(message))
+
+  def subscribe(self, callback):
+    thread = threading.Thread(target=self._listen, args=(callback,), name='faq-cache-invalidation', daemon=True)
+    thread.start()
+
+  def _listen(self, callback):
+    client = self._subscriber_client()
+    while True:
+      try:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        # Whatever was published while we were not listening is lost
+        callback({'clear': True})
+        for message in pubsub.listen():
+          callback(json.loads(message['data']))
+      except Exception as e:
+        logger.error(f"Cache invalidation listener failed: {str(e)}")
+        time.sleep(1)
+
+
+def _default_bus(remote, channel):
+  client_getter = getattr(getattr(remote, 'client', None), 'get_client', None)
+  if client_getter is not None:
+    return RedisInvalidationBus(client_getter(write=True), channel)
+  return LocalInvalidationBus(channel)
+
+
+class _Tier:
+  """The local store and invalidation subscription shared by every thread of a process"""
+
+  def __init__(self, remote, options):
+    self.origin = uuid.uuid4().hex
+    # Bumped on every invalidation, so a read that raced with one isn't kept
+    self.epoch = 0
+    self.store = LocalStore(
+      max_entries=int(options.get('MAX_ENTRIES', 5000)),
+      timeout=float(options.get('LOCAL_TIMEOUT', 60)),
+    )
+    channel = options.get('CHANNEL', 'faq-cache-invalidate')
+    bus = options.get('BUS')
+    if bus is None:
+      self.bus = _default_bus(remote, channel)
+    else:
+      self.bus = import_string(bus)(channel) if isinstance(bus, str) else bus
+    self.bus.subscribe(self.on_message)
+    self.async_reader = _async_reader(remote, options)
+
+  def on_message(self, message):
+    if message.get('origin') == self.origin:
+      return
+    self.epoch += 1
+    if message.get('clear'):
+      self.store.clear()
+    for key in message.get('keys', []):
+      self.store.delete(key)
+
+  def invalidate(self, keys=None):
+    """Evict keys here and tell every other process to do the same"""
+    if keys is None:
+      self.store.clear()
+      message = {'origin': self.origin, 'clear': True}
+    else:
+      for key in keys:
+        self.store.delete(key)
+      message = {'origin': self.origin, 'keys': list(keys)}
+
+    try:
+      self.bus.publish(message)
+    except Exception as e:
+      logger.error(f"Cache invalidation publish failed: {str(e)}")
+
+
+class AsyncRedisReader:
+  """
+  Native async reads of a django-redis cache over a pooled redis.asyncio client.
+
+  Keys and values go through the django-redis client's own key function and
+  serializer, so the sync and async paths read the same entries. A pool is
+  bound to the event loop it was created in, so there is one per loop.
+  """
+
+  def __init__(self, remote, max_connections=100):
+    self.remote = remote
+    self.max_connections = max_connections
+    self._clients = weakref.WeakKeyDictionary()
+
+  def client(self):
+    loop = asyncio.get_running_loop()
+    client = self._clients.get(loop)
+    if client is None:
+      options = self.remote.client._options
+      pool = redis.asyncio.ConnectionPool.from_url(
+        self.remote.client._server[0],
+        max_connections=self.max_connections,
+        socket_timeout=options.get('SOCKET_TIMEOUT'),
+        socket_connect_timeout=options.get('SOCKET_CONNECT_TIMEOUT'),
+      )
+      client = self._clients[loop] = redis.asyncio.Redis(connection_pool=pool)
+    return client
+
+  async def get_many(self, keys, version=None):
+    codec = self.remote.client
+    map_keys = {codec.make_key(key, version=version): key for key in keys}
+    values = await self.client().mget(list(map_keys))
+    return {map_keys[key]: codec.decode(value) for key, value in zip(map_keys, values) if value is not None}
+
+
+def _async_reader(remote, options):
+  # Only django-redis caches can be read natively, the others go through a thread
+  codec = getattr(remote, 'client', None)
+  if redis is None or not hasattr(codec, 'decode'):
+    return None
+  return AsyncRedisReader(remote, max_connections=int(options.get('ASYNC_MAX_CONNECTIONS', 100)))
+
+
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+def _timed(method):
+  """Time a cache operation for the request metrics"""
+  if asyncio.iscoroutinefunction(method):
+    @functools.wraps(method)
+    async def async_wrapper(self, *args, **kwargs):
+      with metrics.timed('cache'):
+        return await method(self, *args, **kwargs)
+    return async_wrapper
+
+  @functools.wraps(method)
+  def wrapper(self, *args, **kwargs):
+    with metrics.timed('cache'):
+      return method(self, *args, **kwargs)
+  return wrapper
+
+
+class TwoTierCache(BaseCache):
+  """
+  Cache backend that keeps a per-process LRU in front of another cache alias.
+
+  Reads are served from process memory when possible. Every write goes to the
+  remote cache and is published on an invalidation channel so the other
+  processes drop their local copy. ``aget``/``aget_many`` read a django-redis
+  remote natively over redis.asyncio, without a thread hop.
+  """
+
+  def __init__(self, location, params):
+    super().__init__(params)
+    self._remote_alias = location
+    self._options = params.get('OPTIONS', {})
+
+  @property
+  def remote(self):
+    return caches[self._remote_alias]
+
+  @property
+  def tier(self):
+    tier = _tiers.get(self._remote_alias)
+    if tier is None:
+      with _tiers_lock:
+        tier = _tiers.get(self._remote_alias)
+        if tier is None:
+          tier = _tiers[self._remote_alias] = _Tier(self.remote, self._options)
+    return tier
+
+  def _local_key(self, key, version):
+    return self.remote.make_and_validate_key(key, version=version)
+
+  def _local_timeout(self, timeout):
+    if timeout is DEFAULT_TIMEOUT:
+      timeout = self.remote.default_timeout
+    return timeout
+
+  @_timed
+  def get(self, key, default=None, version=None):
+    local_key = self._local_key(key, version)
+    value = self.tier.store.get(local_key)
+    if value is not _MISSING:
+      metrics.count_cache_lookups(1, 0)
+      return value
+
+    epoch = self.tier.epoch
+    value = self.remote.get(key, _MISSING, version=version)
+    if value is _MISSING:
+      metrics.count_cache_lookups(0, 1)
+      return default
+    metrics.count_cache_lookups(1, 0)
+    if self.tier.epoch == epoch:
+      self.tier.store.set(local_key, value)
+    return value
+
+  @_timed
+  def get_many(self, keys, version=None):
+    found = {}
+    remote_keys = []
+    for key in keys:
+      value = self.tier.store.get(self._local_key(key, version))
+      if value is _MISSING:
+        remote_keys.append(key)
+      else:
+        found[key] = value
+
+    if remote_keys:
+      epoch = self.tier.epoch
+      fetched = self.remote.get_many(remote_keys, version=version)
+      if self.tier.epoch == epoch:
+        for key, value in fetched.items():
+          self.tier.store.set(self._local_key(key, version), value)
+      found.update(fetched)
+    metrics.count_cache_lookups(len(found), len(remote_keys) - len(fetched) if remote_keys else 0)
+    return found
+
+  async def aget(self, key, default=None, version=None):
+    found = await self.aget_many([key], version=version)
+    return found.get(key, default)
+
+  @_timed
+  async def aget_many(self, keys, version=None):
+    found = {}
+    remote_keys = []
+    for key in keys:
+      value = self.tier.store.get(self._local_key(key, version))
+      if value is _MISSING:
+        remote_keys.append(key)
+      else:
+        found[key] = value
+
+    if remote_keys:
+      epoch = self.tier.epoch
+      if self.tier.async_reader is not None:
+        fetched = await self.tier.async_reader.get_many(remote_keys, version=version)
+      else:
+        fetched = await self.remote.aget_many(remote_keys, version=version)
+      if self.tier.epoch == epoch:
+        for key, value in fetched.items():
+          self.tier.store.set(self._local_key(key, version), value)
+      found.update(fetched)
+    metrics.count_cache_lookups(len(found), len(remote_keys) - len(fetched) if remote_keys else 0)
+    return found
+
+  @_timed
+  def has_key(self, key, version=None):
+    if self.tier.store.get(self._local_key(key, version)) is not _MISSING:
+      return True
+    return self.remote.has_key(key, version=version)
+
+  @_timed
+  def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+    self.remote.set(key, value, timeout=timeout, version=version)
+    local_key = self._local_key(key, version)
+    self.tier.invalidate([local_key])
+    self.tier.store.set(local_key, value, self._local_timeout(timeout))
+
+  @_timed
+  def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+    failed = self.remote.set_many(data, timeout=timeout, version=version) or []
+    local_keys = {self._local_key(key, version): value for key, value in data.items() if key not in failed}
+    self.tier.invalidate(list(local_keys))
+    for local_key, value in local_keys.items():
+      self.tier.store.set(local_key, value, self._local_timeout(timeout))
+    return failed
+
+  @_timed
+  def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+    added = self.remote.add(key, value, timeout=timeout, version=version)
+    if added:
+      self.tier.invalidate([self._local_key(key, version)])
+    return added
+
+  @_timed
+  def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+    return self.remote.touch(key, timeout=timeout, version=version)
+
+  @_timed
+  def incr(self, key, delta=1, version=None):
+    value = self.remote.incr(key, delta, version=version)
+    self.tier.invalidate([self._local_key(key, version)])
+    return value
+
+  def decr(self, key, delta=1, version=None):
+    return self.incr(key, -delta, version=version)
+
+  @_timed
+  def delete(self, key, version=None):
+    deleted = self.remote.delete(key, version=version)
+    self.tier.invalidate([self._local_key(key, version)])
+    return deleted
+
+  @_timed
+  def delete_many(self, keys, version=None):
+    self.remote.delete_many(keys, version=version)
+    self.tier.invalidate([self._local_key(key, version) for key in keys])
+
+  @_timed
+  def clear(self):
+    self.remote.clear()
+    self.tier.invalidate()
+
+  def close(self, **kwargs):
+    self.remote.close(**kwargs)
@@ -0,0 +1,145 @@
+# faqs/cache_fill.py
+
+# Stampede protection for cache misses. Only one caller rebuilds a missing or
+# expired key: within a process the other threads wait for its result, across
+# processes a short lived lock key decides who rebuilds while the others wait
+# or are served the previous (stale) value.
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+  def __init__(self):
+    self.event = threading.Event()
+    self.done = False
+    self.result = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _in_process(key, compute):
+  """Run compute once per key at a time in this process, concurrent callers share the result"""
+  with _flights_lock:
+    flight = _flights.get(key)
+    leader = flight is None
+    if leader:
+      flight = _flights[key] = _Flight()
+
+  if not leader:
+    flight.event.wait(getattr(settings, 'FAQ_CACHE_LOCK_WAIT', 2))
+    if flight.done:
+      return flight.result
+    return compute()
+
+  try:
+    flight.result = compute()
+    flight.done = True
+    return flight.result
+  finally:
+    with _flights_lock:
+      _flights.pop(key, None)
+    flight.event.set()
+
+
+def _lock_key(key):
+  return f'{key}_lock'
+
+
+def _acquire(key):
+  return cache.add(_lock_key(key), 1, timeout=getattr(settings, 'FAQ_CACHE_LOCK_TIMEOUT', 10))
+
+
+def _release(key):
+  cache.delete(_lock_key(key))
+
+
+def _wait_for(key):
+  """Poll for a value another process is rebuilding, None if it doesn't show up in time"""
+  deadline = time.monotonic() + getattr(settings, 'FAQ_CACHE_LOCK_WAIT', 2)
+  while time.monotonic() < deadline:
+    time.sleep(0.05)
+    value = cache.get(key)
+    if value is not None:
+      return value
+  return None
+
+
+def single_flight(key, compute, timeout):
+  """Get a key, letting a single caller compute and store it on a miss"""
+  value = cache.get(key)
+  if value is not None:
+    return value
+
+  def fill():
+    if _acquire(key):
+      try:
+        value = compute()
+        cache.set(key, value, timeout=timeout)
+        return value
+      finally:
+        _release(key)
+
+    value = _wait_for(key)
+    if value is None:
+      logger.warning(f"Gave up waiting for {key} to be rebuilt")
+      value = compute()
+    return value
+
+  return _in_process(key, fill)
+
+
+def get_or_compute(key, compute, soft_ttl, hard_ttl, stale_key=None):
+  """
+  Get a key with stale-while-revalidate semantics.
+
+  Values are fresh for ``soft_ttl`` seconds and kept for ``hard_ttl``. Past
+  the soft TTL one caller rebuilds while the others keep getting the old
+  value. On a hard miss one caller rebuilds and the others are served the copy
+  under ``stale_key`` (if any), or wait for the rebuild.
+  """
+  def store(value):
+    envelope = {'value': value, 'fresh_until': time.time() + soft_ttl}
+    data = {key: envelope}
+    if stale_key:
+      data[stale_key] = envelope
+    cache.set_many(data, timeout=hard_ttl)
+    return value
+
+  envelope = cache.get(key)
+  if envelope is not None:
+    if envelope['fresh_until'] > time.time() or not _acquire(key):
+      return envelope['value']
+    try:
+      return store(compute())
+    finally:
+      _release(key)
+
+  def fill():
+    if _acquire(key):
+      try:
+        return store(compute())
+      finally:
+        _release(key)
+
+    if stale_key:
+      stale = cache.get(stale_key)
+      if stale is not None:
+        return stale['value']
+
+    envelope = _wait_for(key)
+    if envelope is not None:
+      return envelope['value']
+    logger.warning(f"Gave up waiting for {key} to be rebuilt")
+    return store(compute())
+
+  return _in_process(key, fill)
@@ -0,0 +1,112 @@
+# faqs/cache_keys.py
+
+# Every key embeds a generation counter. Invalidating is a single INCR of the
+# counter: keys built with the old generation are never read again and age out
+# on their own TTL, however many languages or list variants exist.
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+
+LIST_NAMESPACE = 'faq_list'
+
+
+def faq_namespace(faq_id):
+  return f'faq_{faq_id}'
+
+
+def _version_key(namespace):
+  return f'{namespace}_version'
+
+
+# Generation of a namespace that has no counter. Reads never create counters,
+# only invalidations do, so requests for FAQs that don't exist leave nothing
+# behind in the cache.
+INITIAL_VERSION = 0
+
+# Set once per lifetime of the cache's contents and part of every generation:
+# after a flush or a restart of Redis the counters start over, and the
+# generations (so the ETags) handed out before must not come back
+EPOCH_KEY = 'faq_cache_epoch'
+
+
+def _initial_version():
+  # Counters start from the clock rather than INITIAL_VERSION, so the first
+  # invalidation moves every namespace away from the keys built before it
+  return int(time.time() * 1000)
+
+
+def _start_epoch():
+  cache.add(EPOCH_KEY, _initial_version(), timeout=None)
+  return cache.get(EPOCH_KEY)
+
+
+def _versions(keys, found, epoch):
+  return {namespace: f'{epoch}.{found.get(key, INITIAL_VERSION)}' for namespace, key in keys.items()}
+
+
+def get_version(namespace):
+  """Get the current generation of a namespace"""
+  return get_versions([namespace])[namespace]
+
+
+def get_versions(namespaces):
+  """Get the current generation of many namespaces in one round-trip"""
+  keys = {namespace: _version_key(namespace) for namespace in namespaces}
+  found = cache.get_many([EPOCH_KEY, *keys.values()])
+  epoch = found.get(EPOCH_KEY)
+  return _versions(keys, found, _start_epoch() if epoch is None else epoch)
+
+
+async def aget_versions(namespaces):
+  """get_versions() for async code"""
+  keys = {namespace: _version_key(namespace) for namespace in namespaces}
+  found = await cache.aget_many([EPOCH_KEY, *keys.values()])
+  epoch = found.get(EPOCH_KEY)
+  return _versions(keys, found, await sync_to_async(_start_epoch)() if epoch is None else epoch)
+
+
+async def aget_version(namespace):
+  return (await aget_versions([namespace]))[namespace]
+
+
+def bump_version(namespace):
+  """Invalidate every key of a namespace"""
+  key = _version_key(namespace)
+  try:
+    return cache.incr(key)
+  except ValueError:
+    cache.add(key, _initial_version(), timeout=None)
+    return cache.incr(key)
+
+
+def translation_key(faq_id, field_name, lang, version=None):
+  if version is None:
+    version = get_version(faq_namespace(faq_id))
+  return f'faq_{faq_id}_v{version}_{field_name}_{lang}'
+
+
+def detail_key(faq_id, lang, version=None):
+  if version is None:
+    version = get_version(faq_namespace(faq_id))
+  return f'faq_detail_{faq_id}_v{version}_{lang}'
+
+
+def modified_key(faq_id, version=None):
+  """Last modification time of an FAQ, read to answer conditional requests without the body"""
+  if version is None:
+    version = get_version(faq_namespace(faq_id))
+  return f'faq_modified_{faq_id}_v{version}'
+
+
+def list_key(lang, page_size, cursor, version=None):
+  if version is None:
+    version = get_version(LIST_NAMESPACE)
+  return f'faq_list_v{version}_{lang}_{page_size}_{cursor}'
+
+
+def stale_list_key(lang, page_size, cursor):
+  """Unversioned copy of a list page, served while the current generation is rebuilt"""
+  return f'faq_list_stale_{lang}_{page_size}_{cursor}'
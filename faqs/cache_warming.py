@@ -0,0 +1,171 @@
+# faqs/cache_warming.py
+
+# Pre-populates the cached API responses, after a deploy or a cache flush with
+# warm_faq_cache, or right after an FAQ is invalidated (FAQ_CACHE_REWARM), so
+# the first requests aren't the ones reading the database. FAQ responses are
+# rendered in bulk. List pages go through the list view itself, so their keys
+# and cursors are exactly the ones requests look up.
+
+import functools
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+from .cache_keys import detail_key, faq_namespace, get_versions, modified_key
+from .models import FAQ
+from .rendering import RENDERED_LANGUAGES, render_faqs
+from .views import FAQViewSet
+
+
+logger = logging.getLogger(__name__)
+
+_list_view = FAQViewSet.as_view({'get': 'list'})
+
+
+def default_host():
+  """First concrete host of ALLOWED_HOSTS, localhost if there is none"""
+  hosts = [host for host in settings.ALLOWED_HOSTS if host and not host.startswith('.') and host != '*']
+  return hosts[0] if hosts else 'localhost'
+
+
+def warm_faqs(ids, languages=RENDERED_LANGUAGES):
+  """
+  Render the responses of the FAQs that aren't cached in every language,
+  returns how many FAQs were rendered. Inactive and unknown ids are skipped.
+  """
+  ids = list(ids)
+  versions = get_versions([faq_namespace(faq_id) for faq_id in ids])
+  keys = {}
+  for faq_id in ids:
+    version = versions[faq_namespace(faq_id)]
+    keys[faq_id] = [detail_key(faq_id, lang, version) for lang in languages] + [modified_key(faq_id, version)]
+  cached = cache.get_many([key for faq_keys in keys.values() for key in faq_keys])
+
+  missing = [faq_id for faq_id in ids if any(key not in cached for key in keys[faq_id])]
+  if not missing:
+    return 0
+
+  faqs = list(FAQ.objects.filter(pk__in=missing, is_active=True).with_translations())
+  entries = {}
+  for lang in languages:
+    for faq, payload in zip(faqs, render_faqs(faqs, lang)):
+      entries[detail_key(faq.id, lang, versions[faq_namespace(faq.id)])] = payload
+  for faq in faqs:
+    entries[modified_key(faq.id, versions[faq_namespace(faq.id)])] = faq.updated_at.timestamp()
+  cache.set_many(entries, timeout=settings.FAQ_RENDERED_TTL)
+  return len(faqs)
+
+
+def warm_list_pages(lang, pages):
+  """
+  Request the first `pages` pages of the list in a language, following the
+  next links, returns how many pages were requested. Pages still cached are
+  left as they are.
+  """
+  factory = RequestFactory()
+  path = f"{reverse('faqs:faq-list')}?lang={lang}"
+  for page in range(pages):
+    # Any allowed host will do, cached pages hold cursors rather than links
+    request = factory.get(path, HTTP_HOST=default_host())
+    response = _list_view(request)
+    if response.status_code != 200:
+      raise RuntimeError(f'{path} answered {response.status_code}')
+    next_link = json.loads(response.content)['next']
+    if not next_link:
+      return page + 1
+    next_parts = urlsplit(next_link)
+    path = f'{next_parts.path}?{next_parts.query}'
+  return pages
+
+
+def _chunks(ids, size):
+  ids = iter(ids)
+  while chunk := list(itertools.islice(ids, size)):
+    yield chunk
+
+
+def _in_worker(func, *args):
+  try:
+    return func(*args)
+  finally:
+    # Pool threads don't go through the request cycle that closes connections
+    connection.close()
+
+
+def warm_cache(ids=None, languages=RENDERED_LANGUAGES, list_pages=None, workers=None, chunk_size=500):
+  """
+  Warm the first list pages and the responses of the given FAQs (every active
+  one by default) in every language, from a pool of `workers` threads.
+  Returns {'pages': ..., 'faqs': ..., 'errors': ...}.
+  """
+  if ids is None:
+    ids = FAQ.objects.filter(is_active=True).order_by('-created_at', '-id').values_list('id', flat=True)
+  if list_pages is None:
+    list_pages = settings.FAQ_CACHE_WARM_LIST_PAGES
+  totals = {'pages': 0, 'faqs': 0, 'errors': 0}
+
+  workers = workers or settings.FAQ_CACHE_WARM_WORKERS
+  with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='faq-warm') as executor:
+    tasks = [
+      ('pages', executor.submit(_in_worker, warm_list_pages, lang, list_pages)) for lang in languages if list_pages
+    ]
+    tasks += [('faqs', executor.submit(_in_worker, warm_faqs, chunk, languages)) for chunk in _chunks(ids, chunk_size)]
+    for kind, future in tasks:
+      try:
+        totals[kind] += future.result()
+      except Exception as e:
+        logger.error(f"Cache warming failed: {str(e)}")
+        totals['errors'] += 1
+  return totals
+
+
+class Rewarmer:
+  """
+  Re-warms invalidated FAQs and the first list pages on a background thread.
+  FAQs invalidated while a pass runs are warmed together by the next one, so
+  a burst of saves costs a couple of passes rather than one each.
+  """
+
+  def __init__(self):
+    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='faq-rewarm')
+    self._lock = threading.Lock()
+    self._pending = set()
+    self._scheduled = False
+
+  def schedule(self, faq_id):
+    with self._lock:
+      self._pending.add(faq_id)
+      if self._scheduled:
+        return None
+      self._scheduled = True
+    return self._executor.submit(self.run)
+
+  def run(self):
+    with self._lock:
+      ids, self._pending = self._pending, set()
+      self._scheduled = False
+    try:
+      for lang in RENDERED_LANGUAGES:
+        warm_list_pages(lang, settings.FAQ_CACHE_WARM_LIST_PAGES)
+      warm_faqs(ids)
+    except Exception as e:
+      logger.error(f"Re-warming FAQs {sorted(ids)} failed: {str(e)}")
+    finally:
+      connection.close()
+
+
+rewarmer = Rewarmer()
+
+
+def rewarm_on_clear(sender, faq_id, **kwargs):
+  """faq_cache_cleared receiver, re-warms the FAQ once the change that invalidated it is committed"""
+  transaction.on_commit(functools.partial(rewarmer.schedule, faq_id))
@@ -0,0 +1,63 @@
+# faqs/changes.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .languages import DEFAULT_LANGUAGE, LANGUAGES
+from .models import FAQ, FAQChange
+
+
+def settled_token():
+  """
+  The newest token below which every change is committed: the one before the
+  oldest change younger than FAQ_CHANGES_SETTLE_SECONDS, the newest otherwise.
+  """
+  if settings.FAQ_CHANGES_SETTLE_SECONDS:
+    cutoff = timezone.now() - timedelta(seconds=settings.FAQ_CHANGES_SETTLE_SECONDS)
+    unsettled = FAQChange.objects.filter(created_at__gte=cutoff).aggregate(first=Min('pk'))['first']
+    if unsettled is not None:
+      return unsettled - 1
+  return FAQChange.objects.aggregate(latest=Max('pk'))['latest'] or 0
+
+
+def log_deletion(sender, instance, **kwargs):
+  """
+  post_delete receiver of FAQ, logs the deletion and invalidates its cache.
+  A receiver so queryset deletes (the admin's "Delete selected") are covered too.
+  """
+  # Still inside the delete's transaction, work deferred to the commit sees the FAQ gone
+  instance.clear_cache()
+  FAQChange.record(instance, FAQChange.ACTION_DELETED)
+
+
+def get_changes(since, lang=DEFAULT_LANGUAGE, limit=500):
+  """
+  What changed after a sync token, for one language.
+
+  Several changes of an FAQ collapse into one entry: it is in ``changed`` if
+  it is active now and in ``removed`` otherwise. Clients call again with the
+  returned ``token`` while ``has_more`` is set.
+  """
+  if lang not in LANGUAGES:
+    lang = DEFAULT_LANGUAGE
+
+  # Read the newest token first, so a change logged while we read isn't skipped
+  latest = settled_token()
+  rows = list(
+    FAQChange.objects.filter(Q(lang='') | Q(lang=lang), pk__gt=since, pk__lte=latest)
+    .order_by('pk').values_list('pk', 'faq_id')[:limit + 1]
+  )
+  has_more = len(rows) > limit
+  rows = rows[:limit]
+
+  faq_ids = list(dict.fromkeys(faq_id for _, faq_id in rows))
+  active = set(FAQ.objects.filter(pk__in=faq_ids, is_active=True).values_list('pk', flat=True))
+  return {
+    'token': rows[-1][0] if has_more else max(latest, since),
+    'changed': [faq_id for faq_id in faq_ids if faq_id in active],
+    'removed': [faq_id for faq_id in faq_ids if faq_id not in active],
+    'has_more': has_more,
+  }
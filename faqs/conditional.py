@@ -0,0 +1,59 @@
+# faqs/conditional.py
+
+# Conditional GET support. Validators are built from the cache generation
+# counters (see cache_keys.py), so a request can be answered with a 304 before
+# the page or the pre-rendered body is fetched.
+
+import hashlib
+
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+
+def make_etag(*parts):
+  """Strong ETag of a representation identified by parts (generation, language...)"""
+  digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+  return f'"{digest[:32]}"'
+
+
+def is_not_modified(request, etag, get_last_modified):
+  """
+  Whether the client's copy is current.
+
+  ``If-None-Match`` takes precedence, ``If-Modified-Since`` is only looked at
+  without it, so ``get_last_modified`` is only called when it is needed.
+  """
+  if_none_match = request.headers.get('If-None-Match')
+  if if_none_match:
+    return etag in parse_etags(if_none_match)
+
+  if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+  if if_modified_since is None:
+    return False
+  last_modified = get_last_modified()
+  return last_modified is not None and int(last_modified) <= if_modified_since
+
+
+def page_etag(page, lang, page_size, cursor):
+  """
+  ETag of a cached list page, from the generation the page was built in rather
+  than the current one: a page served stale while another process rebuilds it
+  must not validate as current. None for pages cached without their generation.
+  """
+  version = page.get('version')
+  return None if version is None else make_etag('faq_list', version, lang, page_size, cursor)
+
+
+def set_validators(response, etag, last_modified=None):
+  """Add the validators to a response, clients are asked to revalidate every time"""
+  if etag is not None:
+    response['ETag'] = etag
+  if last_modified is not None:
+    response['Last-Modified'] = http_date(last_modified)
+  patch_cache_control(response, no_cache=True)
+  return response
+
+
+def not_modified(etag, last_modified=None):
+  return set_validators(HttpResponseNotModified(), etag, last_modified)
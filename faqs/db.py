@@ -0,0 +1,14 @@
+# faqs/db.py
+
+# Per-connection database tuning, applied from the connection_created signal.
+
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+  """connection_created receiver applying settings.SQLITE_PRAGMAS to new SQLite connections"""
+  if connection.vendor != 'sqlite':
+    return
+  # On the raw connection, so the pragmas don't show up as the request's queries
+  for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+    connection.connection.execute(f'PRAGMA {name} = {value}')
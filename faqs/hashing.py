@@ -0,0 +1,14 @@
+# faqs/hashing.py
+
+import hashlib
+import unicodedata
+
+
+def normalize_text(text):
+  """Normalize unicode and whitespace so trivially different copies share a hash"""
+  return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+def source_hash(text):
+  """SHA-256 of the normalized source text"""
+  return hashlib.sha256(normalize_text(text or '').encode('utf-8')).hexdigest()
@@ -0,0 +1,253 @@
+# faqs/html_segments.py
+
+import html
+import re
+from html.parser import HTMLParser
+
+
+# Text inside these is never sent to the translator
+SKIP_TAGS = {'script', 'style', 'pre', 'code'}
+
+# Skipped tags that sit inside a sentence, kept whole as one placeholder
+OPAQUE_TAGS = {'code'}
+
+# Tags that format text inside a sentence rather than start a new block.
+# Every other tag ends the segment before it
+INLINE_TAGS = {
+  'a', 'abbr', 'b', 'bdi', 'bdo', 'big', 'cite', 'data', 'del', 'dfn', 'em', 'font', 'i', 'ins', 'kbd',
+  'label', 'mark', 'q', 's', 'samp', 'small', 'span', 'strike', 'strong', 'sub', 'sup', 'time', 'tt',
+  'u', 'var',
+}
+
+# Inline tags without content
+VOID_TAGS = {'br', 'img', 'wbr'}
+
+# <g1>…</g1> stands for a pair of inline tags in a segment, <x2/> for a tag
+# (or a code span) on its own. Translators tend to pad them with spaces
+_PLACEHOLDER_RE = re.compile(r'<\s*(/?)\s*([gx])\s*(\d+)\s*/?\s*>')
+
+
+class HTMLSegmenter(HTMLParser):
+  """
+  Split HTML into markup and block-level text segments.
+
+  The inline content of each block element (a paragraph, a list item, a
+  heading...) becomes one segment, so the translator sees whole sentences.
+  Inline tags inside it are replaced by numbered placeholders, markup
+  between blocks is kept byte for byte, so the tag tree can be rebuilt
+  around the translations.
+  """
+
+  def __init__(self):
+    super().__init__(convert_charrefs=True)
+    self.tokens = []
+    self.segments = []
+    self._skip_depth = 0
+    # Inline content of the current block, as (kind, ...) items
+    self._run = []
+    # Markup of the code span being read, and how deep in it we are
+    self._opaque = None
+    self._opaque_depth = 0
+
+  def _raw(self, markup):
+    """Markup inside a skipped or opaque element, where nothing is segmented"""
+    if self._opaque is not None:
+      self._opaque.append(markup)
+      return True
+    if self._skip_depth:
+      self.tokens.append(markup)
+      return True
+    return False
+
+  def handle_starttag(self, tag, attrs):
+    markup = self.get_starttag_text()
+    if self._opaque is not None and tag in OPAQUE_TAGS:
+      self._opaque_depth += 1
+    elif self._skip_depth and tag in SKIP_TAGS:
+      self._skip_depth += 1
+    if self._raw(markup):
+      return
+
+    if tag in OPAQUE_TAGS:
+      self._opaque, self._opaque_depth = [markup], 1
+    elif tag in SKIP_TAGS:
+      self._flush()
+      self._skip_depth = 1
+      self.tokens.append(markup)
+    elif tag in VOID_TAGS:
+      self._run.append(('void', markup))
+    elif tag in INLINE_TAGS:
+      self._run.append(('open', tag, markup))
+    else:
+      self._flush()
+      self.tokens.append(markup)
+
+  def handle_startendtag(self, tag, attrs):
+    markup = self.get_starttag_text()
+    if self._raw(markup):
+      return
+    if tag in VOID_TAGS or tag in INLINE_TAGS:
+      self._run.append(('void', markup))
+    else:
+      self._flush()
+      self.tokens.append(markup)
+
+  def handle_endtag(self, tag):
+    markup = f'</{tag}>'
+    if self._opaque is not None:
+      self._opaque.append(markup)
+      if tag in OPAQUE_TAGS:
+        self._opaque_depth -= 1
+        if not self._opaque_depth:
+          self._run.append(('void', ''.join(self._opaque)))
+          self._opaque = None
+      return
+    if self._skip_depth:
+      if tag in SKIP_TAGS:
+        self._skip_depth -= 1
+      self.tokens.append(markup)
+      return
+
+    if tag in INLINE_TAGS:
+      self._run.append(('close', tag, markup))
+    else:
+      self._flush()
+      self.tokens.append(markup)
+
+  def handle_data(self, data):
+    if self.cdata_elem:
+      # Raw script/style content, already unescaped by definition
+      self.tokens.append(data)
+    elif not self._raw(html.escape(data, quote=False)):
+      self._run.append(('text', data))
+
+  def _other_markup(self, markup):
+    if not self._raw(markup):
+      self._run.append(('void', markup))
+
+  def handle_comment(self, data):
+    self._other_markup(f'<!--{data}-->')
+
+  def handle_decl(self, decl):
+    self._other_markup(f'<!{decl}>')
+
+  def handle_pi(self, data):
+    self._other_markup(f'<?{data}>')
+
+  def unknown_decl(self, data):
+    self._other_markup(f'<![{data}]>')
+
+  def close(self):
+    super().close()
+    if self._opaque is not None:
+      self._run.append(('void', ''.join(self._opaque)))
+      self._opaque = None
+    self._flush()
+
+  def _flush(self):
+    """End the current block: its inline content becomes a segment, if it has any text"""
+    run, self._run = self._run, []
+    if not any(item[0] == 'text' and item[1].strip() for item in run):
+      self.tokens.extend(html.escape(item[1], quote=False) if item[0] == 'text' else item[-1] for item in run)
+      return
+
+    # Keep the surrounding whitespace out of the segment so it survives translation
+    leading = trailing = ''
+    if run[0][0] == 'text':
+      text = run[0][1]
+      leading, run[0] = text[:len(text) - len(text.lstrip())], ('text', text.lstrip())
+    if run[-1][0] == 'text':
+      text = run[-1][1]
+      trailing, run[-1] = text[len(text.rstrip()):], ('text', text.rstrip())
+
+    parts = []
+    placeholders = {}
+    opened = []
+    for kind, *item in run:
+      if kind == 'text':
+        parts.append(item[0])
+        continue
+      if kind == 'close':
+        tag, markup = item
+        names = [name for open_tag, name in opened if open_tag == tag]
+        if names:
+          # Tags left open inside this one stay unclosed, like in the source
+          while opened.pop()[1] != names[-1]:
+            pass
+          placeholders[names[-1]][1] = markup
+          parts.append(f'</{names[-1]}>')
+          continue
+        kind = 'void'
+        item = [markup]
+      name = f"{'g' if kind == 'open' else 'x'}{len(placeholders) + 1}"
+      if kind == 'open':
+        placeholders[name] = [item[1], '']
+        opened.append((item[0], name))
+        parts.append(f'<{name}>')
+      else:
+        placeholders[name] = item[-1]
+        parts.append(f'<{name}/>')
+
+    self.segments.append(''.join(parts))
+    self.tokens.append((leading, len(self.segments) - 1, trailing, placeholders))
+
+
+def segment_html(html_content):
+  """Parse HTML, returns the token list and the translatable text segments"""
+  parser = HTMLSegmenter()
+  parser.feed(html_content)
+  parser.close()
+  return parser.tokens, parser.segments
+
+
+def restore_placeholders(text, placeholders):
+  """
+  Escape a translated segment and put its inline tags back. Placeholders the
+  translator dropped are restored around the text, unknown ones are dropped,
+  so the result is always well-formed.
+  """
+  if not placeholders:
+    return html.escape(text, quote=False)
+
+  parts = []
+  opened = []
+  seen = set()
+  position = 0
+  for match in _PLACEHOLDER_RE.finditer(text):
+    parts.append(html.escape(text[position:match.start()], quote=False))
+    position = match.end()
+    closing, kind, number = match.groups()
+    name = f'{kind}{number}'
+    if name not in placeholders:
+      continue
+    if kind == 'x':
+      if name not in seen:
+        parts.append(placeholders[name])
+    elif not closing:
+      if name not in seen:
+        parts.append(placeholders[name][0])
+        opened.append(name)
+    elif name in opened:
+      while opened:
+        inner = opened.pop()
+        parts.append(placeholders[inner][1])
+        if inner == name:
+          break
+    seen.add(name)
+  parts.append(html.escape(text[position:], quote=False))
+
+  parts.extend(placeholders[name][1] for name in reversed(opened))
+  parts.extend(markup for name, markup in placeholders.items() if name.startswith('x') and name not in seen)
+  return ''.join(parts)
+
+
+def rebuild_html(tokens, translations):
+  """Put translated segments back into the original tag tree"""
+  parts = []
+  for token in tokens:
+    if isinstance(token, tuple):
+      leading, index, trailing, placeholders = token
+      parts.append(leading + restore_placeholders(translations[index], placeholders) + trailing)
+    else:
+      parts.append(token)
+  return ''.join(parts)
@@ -0,0 +1,106 @@
+# faqs/languages.py
+
+# The languages FAQs are served in, and the negotiation of a request's language
+# from ?lang= and Accept-Language. Whatever a client asks for resolves to one
+# of LANGUAGES, so cache keys and ETags only ever vary by a served language.
+
+import functools
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+
+# English is the source language every translation is made from
+DEFAULT_LANGUAGE = 'en'
+
+# Code -> display name of every language FAQs are served in
+LANGUAGES = dict(getattr(settings, 'FAQ_LANGUAGES', [('en', 'English'), ('hi', 'Hindi'), ('bn', 'Bengali')]))
+
+# Languages the background workers translate the English content into
+TRANSLATION_LANGUAGES = tuple(lang for lang in LANGUAGES if lang != DEFAULT_LANGUAGE)
+
+# Requested tag -> languages tried after it and before its base language
+LANGUAGE_FALLBACKS = {
+  tag.lower(): tuple(code.lower() for code in codes)
+  for tag, codes in getattr(settings, 'FAQ_LANGUAGE_FALLBACKS', {}).items()
+}
+
+# Served code by lowercase code, tags are case insensitive
+_SUPPORTED = {code.lower(): code for code in LANGUAGES}
+
+_TAG_RE = re.compile(r'^[a-z]{1,8}(-[a-z0-9]{1,8})*$')
+
+# Longer headers are cut, no browser sends anything close
+MAX_HEADER_LENGTH = 256
+
+
+def fallback_chain(tag):
+  """Tags tried for a language tag, most specific first: bn-IN -> bn-in, bn"""
+  subtags = tag.strip().lower().replace('_', '-').split('-')
+  chain = []
+  for end in range(len(subtags), 0, -1):
+    candidate = '-'.join(subtags[:end])
+    chain.append(candidate)
+    chain.extend(LANGUAGE_FALLBACKS.get(candidate, ()))
+  return list(dict.fromkeys(chain))
+
+
+@functools.lru_cache(maxsize=256)
+def match_language(tag):
+  """The served language a tag resolves to through its fallback chain, None if none does"""
+  if not _TAG_RE.match(tag.strip().lower().replace('_', '-')):
+    return None
+  for candidate in fallback_chain(tag):
+    if candidate in _SUPPORTED:
+      return _SUPPORTED[candidate]
+  return None
+
+
+@functools.lru_cache(maxsize=256)
+def parse_accept_language(header):
+  """Language ranges of an Accept-Language header by decreasing q-value, without the q=0 ones"""
+  ranges = []
+  for position, item in enumerate(header.split(',')):
+    tag, _, params = item.partition(';')
+    tag = tag.strip()
+    quality = 1.0
+    for param in params.split(';'):
+      name, _, value = param.partition('=')
+      if name.strip().lower() == 'q':
+        try:
+          quality = float(value)
+        except ValueError:
+          quality = 0
+    if tag and quality > 0:
+      ranges.append((-quality, position, tag))
+  return tuple(tag for _, _, tag in sorted(ranges))
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate_language(header):
+  """The served language that best matches an Accept-Language header"""
+  for tag in parse_accept_language(header):
+    if tag == '*':
+      return DEFAULT_LANGUAGE
+    lang = match_language(tag)
+    if lang is not None:
+      return lang
+  return DEFAULT_LANGUAGE
+
+
+def get_language(request):
+  """The language to serve a request in: ?lang=, then Accept-Language, then English"""
+  lang = request.GET.get('lang')
+  if lang:
+    return match_language(lang) or DEFAULT_LANGUAGE
+  header = request.headers.get('Accept-Language')
+  if header:
+    return negotiate_language(header[:MAX_HEADER_LENGTH])
+  return DEFAULT_LANGUAGE
+
+
+def set_language_headers(response, lang):
+  response['Content-Language'] = lang
+  patch_vary_headers(response, ('Accept-Language',))
+  return response
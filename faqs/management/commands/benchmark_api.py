@@ -0,0 +1,73 @@
+# faqs/management/commands/benchmark_api.py
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from faqs.benchmarks import CACHE_STATES, ENDPOINTS, LOCMEM_CACHES, benchmark_database, compare, run_suite, seed_faqs
+
+
+class Command(BaseCommand):
+  help = 'Measure latency, throughput and queries per request of the FAQ API on a seeded benchmark database'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--faqs', type=int, default=1000, help='FAQs to seed, e.g. 1000, 10000 or 100000')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=20, help='Requests kept in flight')
+    parser.add_argument(
+      '--endpoint', action='append', choices=ENDPOINTS, dest='endpoints', help='Only run this endpoint (repeatable)',
+    )
+    parser.add_argument('--cache', choices=['locmem', 'configured'], default='locmem',
+      help="locmem, or the configured CACHES (it is flushed between scenarios, don't point it at a shared Redis)")
+    parser.add_argument('--keepdb', action='store_true', help='Keep the seeded database for the next run')
+    parser.add_argument('--baseline', help='Fail if the run regresses against this JSON baseline')
+    parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 / req/s drift from the baseline')
+
+  def handle(self, *args, **options):
+    setup = {'faqs': options['faqs'], 'concurrency': options['concurrency'], 'cache': options['cache']}
+    baseline = self.load_baseline(options['baseline'], setup) if options['baseline'] else None
+
+    caches = LOCMEM_CACHES if options['cache'] == 'locmem' else settings.CACHES
+    with benchmark_database(options['keepdb'], caches):
+      created = seed_faqs(options['faqs'])
+      self.stdout.write(f"Seeded {created} FAQ(s), {options['faqs']} in total")
+
+      from config.wsgi import application
+      results = run_suite(
+        application, options['requests'], options['concurrency'], options['endpoints'] or ENDPOINTS, CACHE_STATES,
+      )
+
+    self.report(results)
+
+    if options['save_baseline']:
+      with open(options['save_baseline'], 'w', encoding='utf-8') as f:
+        json.dump({**setup, 'results': results}, f, indent=2, sort_keys=True)
+      self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+
+    if baseline is not None:
+      regressions = compare(results, baseline['results'], options['tolerance'])
+      if regressions:
+        raise CommandError('Regressed against the baseline:\n' + '\n'.join(regressions))
+      self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+  def load_baseline(self, path, setup):
+    try:
+      with open(path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    except (OSError, ValueError) as e:
+      raise CommandError(f"Can't read the baseline {path}: {str(e)}")
+
+    recorded = {key: baseline.get(key) for key in setup}
+    if recorded != setup:
+      raise CommandError(f"The baseline was recorded with {recorded}, this run uses {setup}")
+    return baseline
+
+  def report(self, results):
+    self.stdout.write(f"{'':16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+    for name, result in results.items():
+      self.stdout.write(
+        f"{name:16}{result['rps']:>10}{result['p50']:>10}{result['p95']:>10}{result['p99']:>10}"
+        f"{result['queries']:>9}{result['errors']:>8}"
+      )
@@ -0,0 +1,42 @@
+# faqs/management/commands/benchmark_asgi.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from faqs.benchmarks import run_asgi, run_wsgi
+from faqs.models import FAQ
+
+
+class Command(BaseCommand):
+  help = 'Compare the FAQ read path served by config/asgi.py against config/wsgi.py'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+    parser.add_argument('--concurrency', type=int, default=50, help='Requests kept in flight')
+    parser.add_argument('--lang', default='en', help='Language of the requests')
+    parser.add_argument(
+      '--path', action='append', dest='paths', help='Path to request (repeatable), defaults to list, detail and search',
+    )
+
+  def default_paths(self, lang):
+    faq = FAQ.objects.filter(is_active=True).order_by('-created_at').first()
+    if faq is None:
+      raise CommandError('There are no active FAQs to read, create or import some first')
+    word = faq.question.split()[0]
+    return [f'/api/faqs/?lang={lang}', f'/api/faqs/{faq.pk}/?lang={lang}', f'/api/faqs/search/?q={word}&lang={lang}']
+
+  def handle(self, *args, **options):
+    from config.asgi import application as asgi_application
+    from config.wsgi import application as wsgi_application
+
+    paths = options['paths'] or self.default_paths(options['lang'])
+    runs = [('wsgi', run_wsgi, wsgi_application), ('asgi', run_asgi, asgi_application)]
+
+    self.stdout.write(f"{len(paths)} path(s), {options['requests']} requests, {options['concurrency']} in flight")
+    self.stdout.write(f"{'':6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, run, application in runs:
+      # Warm the caches and connections first so both runs measure the same thing
+      run(application, paths, len(paths), 1)
+      result = run(application, paths, options['requests'], options['concurrency'])
+      self.stdout.write(
+        f"{name:6}{result['rps']:>10}{result['p50']:>10}{result['p95']:>10}{result['p99']:>10}{result['errors']:>8}"
+      )
@@ -0,0 +1,54 @@
+# faqs/management/commands/benchmark_db.py
+
+from django.conf import settings
+from django.db import connection
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from faqs.benchmarks import benchmark_database, run_read_under_write, seed_faqs
+
+
+class Command(BaseCommand):
+  help = 'Measure read throughput of the FAQ list query while admin-style writes run, per database profile'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--faqs', type=int, default=1000, help='FAQs to seed')
+    parser.add_argument('--reads', type=int, default=2000, help='Pages read per profile')
+    parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+    parser.add_argument('--writers', type=int, default=1, help='Writer threads saving FAQs in a loop')
+    parser.add_argument('--keepdb', action='store_true', help='Keep the seeded database for the next run')
+
+  def profiles(self):
+    """Settings compared on the configured backend"""
+    if connection.vendor == 'sqlite':
+      # journal_mode sticks to the file, so the default profile resets it explicitly
+      return [
+        ('rollback journal', {'SQLITE_PRAGMAS': {'journal_mode': 'delete'}}, None),
+        ('tuned (WAL)', {'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS or {'journal_mode': 'wal'}}, None),
+      ]
+    conn_max_age = connection.settings_dict['CONN_MAX_AGE'] or 60
+    return [
+      ('CONN_MAX_AGE=0', {}, 0),
+      (f'CONN_MAX_AGE={conn_max_age}', {}, conn_max_age),
+    ]
+
+  def handle(self, *args, **options):
+    with benchmark_database(options['keepdb']):
+      created = seed_faqs(options['faqs'])
+      self.stdout.write(f"Seeded {created} FAQ(s), {options['faqs']} in total, {connection.vendor}")
+      self.stdout.write(
+        f"{'':20}{'reads/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'writes/s':>10}{'failed':>8}"
+      )
+
+      for name, overrides, conn_max_age in self.profiles():
+        if conn_max_age is not None:
+          connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        with override_settings(**overrides):
+          # New connections pick the profile up
+          connection.close()
+          result = run_read_under_write(options['reads'], options['readers'], options['writers'])
+        self.stdout.write(
+          f"{name:20}{result['rps']:>10}{result['p50']:>10}{result['p95']:>10}{result['p99']:>10}"
+          f"{result['errors']:>8}{result['writes']:>10}{result['write_errors']:>8}"
+        )
+      connection.close()
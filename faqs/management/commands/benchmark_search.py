@@ -0,0 +1,33 @@
+# faqs/management/commands/benchmark_search.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from faqs.benchmarks import SEARCH_SHAPES, benchmark_database, run_searches, search_queries, seed_faqs
+
+
+class Command(BaseCommand):
+  help = 'Measure the latency of search queries of 1 to 3 terms, and of terms every FAQ contains, on a seeded database'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--faqs', type=int, default=10000, help='FAQs to seed, e.g. 10000 or 100000')
+    parser.add_argument('--queries', type=int, default=20, help='Distinct queries per shape')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs of each query, per language')
+    parser.add_argument('--keepdb', action='store_true', help='Keep the seeded database for the next run')
+
+  def handle(self, *args, **options):
+    with benchmark_database(options['keepdb']):
+      created = seed_faqs(options['faqs'])
+      self.stdout.write(
+        f"Seeded {created} FAQ(s), {options['faqs']} in total, {connection.vendor}, "
+        f"{settings.FAQ_SEARCH_CANDIDATES_PER_TERM} candidate(s) per term"
+      )
+      self.stdout.write(f"{'':16}{'searches':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}")
+      for name, shape in SEARCH_SHAPES.items():
+        result = run_searches(search_queries(shape, options['queries']), options['repeat'])
+        self.stdout.write(
+          f"{name:16}{result['requests']:>10}{result['p50']:>10}{result['p95']:>10}{result['p99']:>10}"
+          f"{result['queries']:>10}"
+        )
+      connection.close()
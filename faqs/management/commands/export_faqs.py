@@ -0,0 +1,28 @@
+# faqs/management/commands/export_faqs.py
+
+from django.core.management.base import BaseCommand
+
+from faqs.bulk import FORMATS, export_rows, guess_format, write_rows
+
+
+class Command(BaseCommand):
+  help = 'Export FAQs and their translations to a JSONL or CSV file'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path', nargs='?', default='-', help="File to write, '-' (the default) for stdout")
+    parser.add_argument('--format', choices=FORMATS, help='Defaults to csv for .csv files, jsonl otherwise')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='FAQs read from the database at a time')
+    parser.add_argument('--active-only', action='store_true', help='Skip deactivated FAQs')
+
+  def handle(self, *args, **options):
+    path = options['path']
+    fmt = options['format'] or guess_format(path)
+    rows = export_rows(chunk_size=options['chunk_size'], active_only=options['active_only'])
+
+    if path == '-':
+      write_rows(rows, self.stdout, fmt)
+      return
+
+    with open(path, 'w', encoding='utf-8', newline='') as stream:
+      count = write_rows(rows, stream, fmt)
+    self.stdout.write(self.style.SUCCESS(f'Exported {count} FAQ(s) to {path}'))
@@ -0,0 +1,39 @@
+# faqs/management/commands/import_faqs.py
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from faqs.bulk import FORMATS, guess_format, import_faqs, read_rows
+from faqs.utils import TranslationService
+
+
+class Command(BaseCommand):
+  help = 'Import FAQs from a JSONL or CSV file (one FAQ per line / row)'
+
+  def add_arguments(self, parser):
+    parser.add_argument('path', help="File to read, '-' for stdin")
+    parser.add_argument('--format', choices=FORMATS, help='Defaults to csv for .csv files, jsonl otherwise')
+    parser.add_argument('--batch-size', type=int, default=500, help='FAQs written per transaction')
+    parser.add_argument(
+      '--translate', action='store_true',
+      help='Translate missing translations while importing, instead of queueing them for the workers',
+    )
+
+  def handle(self, *args, **options):
+    path = options['path']
+    fmt = options['format'] or guess_format(path)
+    translator = TranslationService() if options['translate'] else None
+    started = time.monotonic()
+
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+    try:
+      count = import_faqs(read_rows(stream, fmt), batch_size=options['batch_size'], translator=translator)
+    except ValueError as e:
+      raise CommandError(str(e))
+    finally:
+      if stream is not sys.stdin:
+        stream.close()
+
+    self.stdout.write(self.style.SUCCESS(f'Imported {count} FAQ(s) in {time.monotonic() - started:.1f}s'))
@@ -0,0 +1,19 @@
+# faqs/management/commands/rebuild_search_index.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from faqs.search import rebuild_index
+
+
+class Command(BaseCommand):
+  help = 'Rebuild the FAQ search index from the stored FAQs and translations'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--batch-size', type=int, default=500, help='FAQs loaded and indexed per batch')
+
+  def handle(self, *args, **options):
+    started = time.monotonic()
+    count = rebuild_index(batch_size=options['batch_size'])
+    self.stdout.write(self.style.SUCCESS(f'Indexed {count} FAQ(s) in {time.monotonic() - started:.1f}s'))
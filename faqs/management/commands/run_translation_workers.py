@@ -0,0 +1,34 @@
+# faqs/management/commands/run_translation_workers.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from faqs.translation_queue import TranslationWorkerPool
+
+
+class Command(BaseCommand):
+  help = 'Run the background workers that translate queued FAQs'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--workers', type=int, default=2, help='Number of worker threads')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+    parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+  def handle(self, *args, **options):
+    pool = TranslationWorkerPool(
+      workers=options['workers'],
+      poll_interval=options['poll_interval'],
+      once=options['once'],
+    )
+    self.stdout.write(f"Starting {options['workers']} translation worker(s)")
+    pool.start()
+
+    try:
+      pool.join()
+    except KeyboardInterrupt:
+      self.stdout.write('Stopping translation workers')
+      pool.stop()
+      pool.join()
+
+    if pool.errors:
+      raise CommandError(f'Translation workers stopped after {pool.errors} error(s), see the log')
+    self.stdout.write(self.style.SUCCESS('Translation workers stopped'))
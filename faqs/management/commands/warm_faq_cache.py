@@ -0,0 +1,54 @@
+# faqs/management/commands/warm_faq_cache.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from faqs.access_counts import most_requested
+from faqs.cache_warming import warm_cache
+from faqs.languages import LANGUAGES
+
+
+class Command(BaseCommand):
+  help = 'Pre-populate the cached FAQ list pages and responses in every language, e.g. after a deploy or a cache flush'
+
+  def add_arguments(self, parser):
+    parser.add_argument('--top', type=int, help='Only warm the N most requested FAQs (by recorded access counts)')
+    parser.add_argument(
+      '--pages', type=int, default=settings.FAQ_CACHE_WARM_LIST_PAGES,
+      help='List pages warmed per language, 0 for none',
+    )
+    parser.add_argument(
+      '--workers', type=int, default=settings.FAQ_CACHE_WARM_WORKERS, help='Threads warming in parallel',
+    )
+    parser.add_argument(
+      '--lang', action='append', choices=list(LANGUAGES), dest='languages', help='Only warm this language (repeatable)',
+    )
+    parser.add_argument('--chunk-size', type=int, default=500, help='FAQs read and rendered per task')
+
+  def handle(self, *args, **options):
+    if options['workers'] < 1:
+      raise CommandError('--workers must be at least 1')
+
+    ids = None
+    if options['top'] is not None:
+      ids = most_requested(options['top'])
+      if not ids:
+        self.stdout.write(self.style.WARNING('No access counts recorded yet, only warming the list pages'))
+
+    started = time.monotonic()
+    totals = warm_cache(
+      ids,
+      languages=options['languages'] or list(LANGUAGES),
+      list_pages=options['pages'],
+      workers=options['workers'],
+      chunk_size=options['chunk_size'],
+    )
+    summary = (
+      f"Warmed {totals['pages']} list page(s) and rendered {totals['faqs']} FAQ(s)"
+      f" in {time.monotonic() - started:.1f}s"
+    )
+    if totals['errors']:
+      raise CommandError(f"{summary}, {totals['errors']} task(s) failed")
+    self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,189 @@
+# faqs/metrics.py
+
+# Request instrumentation. Database queries, cache operations, translator calls
+# and serialization are timed where they happen. The time is added to the
+# current request (reported in its Server-Timing header by TimingMiddleware)
+# and to process wide histograms served in the Prometheus text format on
+# /metrics. Everything is in memory and per process, so each worker exposes
+# its own numbers.
+
+import threading
+import time
+from contextvars import ContextVar
+
+
+KINDS = ('db', 'cache', 'translation', 'serialize')
+
+# Upper bounds in seconds, from a local cache hit to a slow translator call
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=''):
+  pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+  if extra:
+    pairs.append(extra)
+  return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+  def __init__(self, name, help_text, labels=()):
+    self.name = name
+    self.help_text = help_text
+    self.labels = labels
+    self._values = {}
+    self._lock = threading.Lock()
+
+  def inc(self, *labels, amount=1):
+    with self._lock:
+      self._values[labels] = self._values.get(labels, 0) + amount
+
+  def value(self, *labels):
+    return self._values.get(labels, 0)
+
+  def render(self):
+    lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+    with self._lock:
+      for labels, value in sorted(self._values.items()):
+        lines.append(f'{self.name}{_format_labels(self.labels, labels)} {value}')
+    return lines
+
+
+class Histogram:
+  def __init__(self, name, help_text, labels=(), buckets=BUCKETS):
+    self.name = name
+    self.help_text = help_text
+    self.labels = labels
+    self.buckets = buckets
+    # labels -> [count per bucket (not cumulative), sum, count]
+    self._series = {}
+    self._lock = threading.Lock()
+
+  def observe(self, value, *labels):
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+      for i, bound in enumerate(self.buckets):
+        if value <= bound:
+          series[0][i] += 1
+          break
+      series[1] += value
+      series[2] += 1
+
+  def count(self, *labels):
+    series = self._series.get(labels)
+    return series[2] if series else 0
+
+  def _bucket_line(self, labels, bound, value):
+    le = f'le="{bound}"'
+    return f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {value}'
+
+  def render(self):
+    lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+    with self._lock:
+      for labels, (buckets, total, count) in sorted(self._series.items()):
+        cumulative = 0
+        for bound, n in zip(self.buckets, buckets):
+          cumulative += n
+          lines.append(self._bucket_line(labels, bound, cumulative))
+        lines.append(self._bucket_line(labels, '+Inf', count))
+        lines.append(f'{self.name}_sum{_format_labels(self.labels, labels)} {total}')
+        lines.append(f'{self.name}_count{_format_labels(self.labels, labels)} {count}')
+    return lines
+
+
+REQUEST_SECONDS = Histogram('faq_request_duration_seconds', 'Time spent answering requests', ('view', 'method'))
+OPERATION_SECONDS = Histogram(
+  'faq_operation_duration_seconds', 'Time spent in database, cache, translator and serialization calls', ('kind',),
+)
+CACHE_LOOKUPS = Counter('faq_cache_lookups_total', 'Cache keys read, by result', ('result',))
+
+REGISTRY = (REQUEST_SECONDS, OPERATION_SECONDS, CACHE_LOOKUPS)
+
+
+class RequestTimings:
+  """What a request spent its time on"""
+  __slots__ = ('durations', 'counts', 'cache_hits', 'cache_misses')
+
+  def __init__(self):
+    self.durations = dict.fromkeys(KINDS, 0.0)
+    self.counts = dict.fromkeys(KINDS, 0)
+    self.cache_hits = 0
+    self.cache_misses = 0
+
+  def server_timing(self, total):
+    """Server-Timing header value, in milliseconds"""
+    entries = []
+    for kind in KINDS:
+      if not self.counts[kind]:
+        continue
+      if kind == 'cache':
+        desc = f'{self.cache_hits} hits / {self.cache_misses} misses'
+      elif kind == 'db':
+        desc = f"{self.counts[kind]} queries"
+      else:
+        desc = f"{self.counts[kind]} calls"
+      entries.append(f'{kind};dur={self.durations[kind] * 1000:.2f};desc="{desc}"')
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+_current = ContextVar('faq_request_timings', default=None)
+
+
+def start_request():
+  """Start collecting timings for the request running in this context"""
+  timings = RequestTimings()
+  return timings, _current.set(timings)
+
+
+def end_request(token):
+  _current.reset(token)
+
+
+class timed:
+  """Context manager timing one operation of a kind"""
+  __slots__ = ('kind', 'started')
+
+  def __init__(self, kind):
+    self.kind = kind
+
+  def __enter__(self):
+    self.started = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    elapsed = time.perf_counter() - self.started
+    OPERATION_SECONDS.observe(elapsed, self.kind)
+    timings = _current.get()
+    if timings is not None:
+      timings.durations[self.kind] += elapsed
+      timings.counts[self.kind] += 1
+
+
+def count_cache_lookups(hits, misses):
+  if hits:
+    CACHE_LOOKUPS.inc('hit', amount=hits)
+  if misses:
+    CACHE_LOOKUPS.inc('miss', amount=misses)
+  timings = _current.get()
+  if timings is not None:
+    timings.cache_hits += hits
+    timings.cache_misses += misses
+
+
+def time_query(execute, sql, params, many, context):
+  """Database execute wrapper, installed on every connection"""
+  with timed('db'):
+    return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+  """connection_created receiver"""
+  if time_query not in connection.execute_wrappers:
+    connection.execute_wrappers.append(time_query)
+
+
+def render():
+  """Every metric in the Prometheus text exposition format"""
+  return '\n'.join(line for metric in REGISTRY for line in metric.render()) + '\n'
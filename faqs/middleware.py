@@ -0,0 +1,54 @@
+# faqs/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+
+class TimingMiddleware:
+  """
+  Time every request and what it spent on the database, cache, translator and
+  serialization. The breakdown is sent in a Server-Timing header (unless
+  FAQ_SERVER_TIMING is off) and added to the /metrics histograms.
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    self.is_async = iscoroutinefunction(get_response)
+    if self.is_async:
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if self.is_async:
+      return self.__acall__(request)
+
+    started = time.perf_counter()
+    timings, token = metrics.start_request()
+    try:
+      response = self.get_response(request)
+    finally:
+      metrics.end_request(token)
+    return self.finish(request, response, timings, started)
+
+  async def __acall__(self, request):
+    started = time.perf_counter()
+    timings, token = metrics.start_request()
+    try:
+      response = await self.get_response(request)
+    finally:
+      metrics.end_request(token)
+    return self.finish(request, response, timings, started)
+
+  def finish(self, request, response, timings, started):
+    total = time.perf_counter() - started
+    # Labelled by route, not path, so there is a bounded number of series
+    match = getattr(request, 'resolver_match', None)
+    metrics.REQUEST_SECONDS.observe(total, match.view_name if match else 'unmatched', request.method)
+    if settings.FAQ_SERVER_TIMING:
+      response['Server-Timing'] = timings.server_timing(total)
+    return response
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lang', models.CharField(max_length=10)),
+                ('status', models.CharField(
+                    choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')],
+                    default='pending',
+                    max_length=10,
+                )),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('faq', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='translation_jobs', to='faqs.faq',
+                )),
+            ],
+            options={
+                'verbose_name': 'Translation job',
+                'verbose_name_plural': 'Translation jobs',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='faqs_transjob_queue_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translationjob',
+            constraint=models.UniqueConstraint(fields=('faq', 'lang'), name='unique_translation_job'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0002_translation_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('target_lang', models.CharField(max_length=10)),
+                ('backend', models.CharField(max_length=50)),
+                ('source_text', models.TextField()),
+                ('translated_text', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Translation memory entry',
+                'verbose_name_plural': 'Translation memory',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translationmemory',
+            constraint=models.UniqueConstraint(
+                fields=('source_hash', 'target_lang', 'backend'), name='unique_translation_memory',
+            ),
+        ),
+    ]
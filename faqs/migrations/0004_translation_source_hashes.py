@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0003_translation_memory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translationjob',
+            name='answer_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='translationjob',
+            name='question_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0004_translation_source_hashes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['-created_at', '-id'], name='faqs_faq_created_id_idx'),
+        ),
+    ]
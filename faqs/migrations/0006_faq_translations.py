@@ -0,0 +1,111 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:54
+
+import ckeditor.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+from faqs.hashing import source_hash
+
+
+# The per-language columns this migration folds into FAQTranslation rows
+LEGACY_LANGUAGES = ('hi', 'bn')
+
+
+def copy_columns_to_translations(apps, schema_editor):
+    FAQ = apps.get_model('faqs', 'FAQ')
+    FAQTranslation = apps.get_model('faqs', 'FAQTranslation')
+    TranslationJob = apps.get_model('faqs', 'TranslationJob')
+
+    jobs = {(job.faq_id, job.lang): job for job in TranslationJob.objects.all()}
+    rows = []
+    for faq in FAQ.objects.iterator(chunk_size=500):
+        for lang in LEGACY_LANGUAGES:
+            question = getattr(faq, f'question_{lang}')
+            answer = getattr(faq, f'answer_{lang}')
+            if not question and not answer:
+                continue
+
+            # Translations made before source hashes existed are taken to match the current English
+            job = jobs.get((faq.id, lang))
+            rows.append(FAQTranslation(
+                faq_id=faq.id,
+                lang=lang,
+                question=question,
+                answer=answer,
+                question_source_hash=(job and job.question_hash) or (source_hash(faq.question) if question else ''),
+                answer_source_hash=(job and job.answer_hash) or (source_hash(faq.answer) if answer else ''),
+            ))
+    FAQTranslation.objects.bulk_create(rows, batch_size=500)
+
+
+def copy_translations_to_columns(apps, schema_editor):
+    FAQ = apps.get_model('faqs', 'FAQ')
+    FAQTranslation = apps.get_model('faqs', 'FAQTranslation')
+    TranslationJob = apps.get_model('faqs', 'TranslationJob')
+
+    for row in FAQTranslation.objects.filter(lang__in=LEGACY_LANGUAGES).iterator(chunk_size=500):
+        FAQ.objects.filter(pk=row.faq_id).update(**{
+            f'question_{row.lang}': row.question,
+            f'answer_{row.lang}': row.answer,
+        })
+        TranslationJob.objects.filter(faq_id=row.faq_id, lang=row.lang).update(
+            question_hash=row.question_source_hash,
+            answer_hash=row.answer_source_hash,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0005_faq_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FAQTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lang', models.CharField(max_length=10)),
+                ('question', models.TextField(blank=True, null=True, verbose_name='Question')),
+                ('answer', ckeditor.fields.RichTextField(blank=True, null=True, verbose_name='Answer')),
+                ('question_source_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('answer_source_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('faq', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='faqs.faq',
+                )),
+            ],
+            options={
+                'verbose_name': 'FAQ translation',
+                'verbose_name_plural': 'FAQ translations',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='faqtranslation',
+            constraint=models.UniqueConstraint(fields=('faq', 'lang'), name='unique_faq_translation'),
+        ),
+        migrations.RunPython(copy_columns_to_translations, copy_translations_to_columns),
+        migrations.RemoveField(
+            model_name='faq',
+            name='answer_bn',
+        ),
+        migrations.RemoveField(
+            model_name='faq',
+            name='answer_hi',
+        ),
+        migrations.RemoveField(
+            model_name='faq',
+            name='question_bn',
+        ),
+        migrations.RemoveField(
+            model_name='faq',
+            name='question_hi',
+        ),
+        migrations.RemoveField(
+            model_name='translationjob',
+            name='answer_hash',
+        ),
+        migrations.RemoveField(
+            model_name='translationjob',
+            name='question_hash',
+        ),
+    ]
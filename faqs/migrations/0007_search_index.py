@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 06:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0006_faq_translations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lang', models.CharField(max_length=10)),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('faq', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='faqs.faq',
+                )),
+            ],
+            options={
+                'verbose_name': 'Search term',
+                'verbose_name_plural': 'Search terms',
+                'indexes': [models.Index(fields=['lang', 'term', 'faq', 'weight'], name='faqs_searchterm_lookup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('faq', 'lang', 'term'), name='unique_search_term'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faq',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
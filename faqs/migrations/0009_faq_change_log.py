@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:25
+
+from django.db import migrations, models
+
+
+def log_existing_faqs(apps, schema_editor):
+    # Clients syncing from token 0 get every FAQ that exists today
+    FAQ = apps.get_model('faqs', 'FAQ')
+    FAQChange = apps.get_model('faqs', 'FAQChange')
+    FAQChange.objects.bulk_create(
+        [
+            FAQChange(faq_id=faq_id, action='created')
+            for faq_id in FAQ.objects.order_by('created_at', 'id').values_list('id', flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0008_faq_updated_at_auto_now'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FAQChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('faq_id', models.BigIntegerField()),
+                ('lang', models.CharField(blank=True, default='', max_length=10)),
+                ('action', models.CharField(
+                    choices=[
+                        ('created', 'Created'), ('updated', 'Updated'), ('deactivated', 'Deactivated'),
+                        ('deleted', 'Deleted'),
+                    ],
+                    max_length=12,
+                )),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'FAQ change',
+                'verbose_name_plural': 'FAQ changes',
+            },
+        ),
+        migrations.RunPython(log_existing_faqs, migrations.RunPython.noop),
+    ]
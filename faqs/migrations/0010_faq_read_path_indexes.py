@@ -0,0 +1,25 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0009_faq_change_log'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(
+                condition=models.Q(('is_active', True)),
+                fields=['-created_at', '-id'],
+                name='faqs_faq_active_created_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['updated_at', 'id'], name='faqs_faq_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.2 on 2026-10-18 07:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0010_faq_read_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FAQAccessCount',
+            fields=[
+                ('faq', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='access_count',
+                    serialize=False,
+                    to='faqs.faq',
+                )),
+                ('count', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'FAQ access count',
+                'verbose_name_plural': 'FAQ access counts',
+                'indexes': [models.Index(fields=['-count'], name='faqs_faq_access_count_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-18 08:39
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_indexed_terms(apps, schema_editor):
+    # Document frequencies of the postings indexed so far
+    SearchTerm = apps.get_model('faqs', 'SearchTerm')
+    SearchTermFrequency = apps.get_model('faqs', 'SearchTermFrequency')
+    rows = [
+        SearchTermFrequency(lang=lang, term=term, documents=n)
+        for lang, term, n in SearchTerm.objects.values_list('lang', 'term').annotate(n=Count('pk')).order_by()
+    ]
+    rows += [
+        SearchTermFrequency(lang=lang, term='', documents=n)
+        for lang, n in SearchTerm.objects.values_list('lang').annotate(n=Count('faq', distinct=True)).order_by()
+    ]
+    SearchTermFrequency.objects.bulk_create(rows, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0011_faq_access_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTermFrequency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lang', models.CharField(max_length=10)),
+                ('term', models.CharField(blank=True, max_length=64)),
+                ('documents', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Search term frequency',
+                'verbose_name_plural': 'Search term frequencies',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['lang', 'term', '-weight', '-faq'], name='faqs_searchterm_weight_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchtermfrequency',
+            constraint=models.UniqueConstraint(fields=('lang', 'term'), name='unique_search_term_frequency'),
+        ),
+        migrations.RunPython(count_indexed_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faqs', '0012_search_term_frequencies'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='faqchange',
+            index=models.Index(fields=['created_at'], name='faqs_faqchange_created_idx'),
+        ),
+    ]
@@ -1,34 +1,74 @@
 # faqs/models.py
 
+import logging
 from django.db import models
 from django.conf import settings
 from django.core.cache import cache
+from django.utils import timezone
 from ckeditor.fields import RichTextField
 from django.utils.translation import gettext_lazy as _
-from .utils import TranslationService
+from .cache_keys import LIST_NAMESPACE, bump_version, faq_namespace, get_versions, translation_key
+from .hashing import source_hash
+from .languages import TRANSLATION_LANGUAGES
+from .signals import faq_cache_cleared
+
+
+logger = logging.getLogger(__name__)
+
+# English fields that have a translation per language
+TRANSLATED_FIELDS = ('question', 'answer')
+
+# FAQTranslation columns needed to read a translation, the source hashes are only used on save
+TRANSLATION_READ_COLUMNS = ('id', 'faq', 'lang', 'question', 'answer')
+
+def translations_prefetch(lang=None):
+  """Prefetch of the translation rows, only the ones of a language when it is given"""
+  translations = FAQTranslation.objects.only(*TRANSLATION_READ_COLUMNS)
+  if lang is not None:
+    translations = translations.filter(lang=lang)
+  return models.Prefetch('translations', queryset=translations)
+
+
+class FAQQuerySet(models.QuerySet):
+  def with_translations(self, lang=None):
+    """Prefetch the translations, only the rows of one language when it is given"""
+    if lang is not None and lang not in TRANSLATION_LANGUAGES:
+      return self
+    return self.prefetch_related(translations_prefetch(lang))
+
 
 class FAQ(models.Model):
   # Base field english
   question = models.TextField(_('Question (English)'))
   answer = RichTextField(_('Answer (English)'))
 
-  # Hindi translation
-  question_hi = models.TextField(_('Question (Hindi)'), blank=True, null=True)
-  answer_hi = RichTextField(_('Answer (Hindi)'), blank=True, null=True)
-
-  # Bengali translation
-  question_bn = models.TextField(_('Question (Bengali)'), blank=True, null=True)
-  answer_bn = RichTextField(_('Answer (Bengali)'), blank=True, null=True)
+  # Translations live in FAQTranslation, one row per language. They are also
+  # reachable as question_<lang> / answer_<lang> attributes (see below).
 
   # Metadata
   created_at = models.DateTimeField(auto_now_add=True)
-  updated_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
   is_active = models.BooleanField(default=True)
 
+  objects = FAQQuerySet.as_manager()
+
+  # Translations set through the question_<lang> / answer_<lang> attributes, until save()
+  _staged_translations = {}
+
   class Meta:
     verbose_name = 'FAQ'
     verbose_name_plural = 'FAQs'
     ordering = ['-created_at']
+    indexes = [
+      # The admin's default ordering, over every FAQ
+      models.Index(fields=['-created_at', '-id'], name='faqs_faq_created_id_idx'),
+      # Keyset pagination of the list endpoint and the dump, which only read active FAQs
+      models.Index(
+        fields=['-created_at', '-id'], condition=models.Q(is_active=True), name='faqs_faq_active_created_idx',
+      ),
+      # Last-Modified of the list (MAX(updated_at)) and the admin's updated_at sort and filter
+      models.Index(fields=['updated_at', 'id'], name='faqs_faq_updated_idx'),
+    ]
 
   def __str__(self):
     return self.question[:100]
@@ -37,65 +77,164 @@ class FAQ(models.Model):
     # Check if the object is new or being updated
     is_new = self._state.adding
 
-    # If new, proceed to generate translations before the first save
-    if is_new:
-        # Initialize translation service
-        translator = TranslationService()
-
-        # Generate translations
-        try:
-            self.question_hi = translator.translate_text(self.question, 'hi')
-            self.answer_hi = translator.translate_html(self.answer, 'hi')
-        except Exception as e:
-            logger.error(f"Hindi translation failed: {str(e)}")
-            self.question_hi = self.question  # Fallback to English
-            self.answer_hi = self.answer
-
-        try:
-            self.question_bn = translator.translate_text(self.question, 'bn')
-            self.answer_bn = translator.translate_html(self.answer, 'bn')
-        except Exception as e:
-            logger.error(f"Bengali translation failed: {str(e)}")
-            self.question_bn = self.question  # Fallback to English
-            self.answer_bn = self.answer
-
-    # Clear cache before saving
-    self.clear_cache()
-
     # Save the object once
     super().save(*args, **kwargs)
 
+    # Store translations typed in by an editor, and queue the workers for
+    # the rest instead of calling the translator inline
+    self.schedule_translations(is_new, self._staged_translations)
+    self._staged_translations = {}
+    getattr(self, '_prefetched_objects_cache', {}).pop('translations', None)
+
+    # Tell the clients syncing through /api/faqs/changes/
+    FAQChange.record(self, FAQChange.ACTION_CREATED if is_new else None)
+
+    # Clear cache once the translations are stored, before re-rendering it
+    self.clear_cache()
+
+    # Keep the search index in step, it drops the FAQ if it was deactivated
+    from .search import index_faq
+    index_faq(self)
+
+    # Write-through the pre-rendered API responses
+    if self.is_active:
+      from .rendering import store_rendered
+      store_rendered(self)
+
+  def schedule_translations(self, is_new=False, staged=None):
+    """
+    Queue re-translation of the fields whose English source changed.
+
+    Each translation records the hash of the English text it was made from;
+    only fields whose hash no longer matches are re-translated. Translations
+    typed in by an editor (``staged``) are stored and marked as current.
+    """
+    staged = staged or {}
+    hashes = {field: source_hash(getattr(self, field)) for field in TRANSLATED_FIELDS}
+    rows = {} if is_new else {row.lang: row for row in FAQTranslation.objects.filter(faq=self)}
+
+    for lang in TRANSLATION_LANGUAGES:
+      row = rows.get(lang) or FAQTranslation(faq=self, lang=lang)
+      before = (row.question, row.answer, row.question_source_hash, row.answer_source_hash)
+      stale = False
+
+      for field in TRANSLATED_FIELDS:
+        hash_field = f'{field}_source_hash'
+        edited = (lang, field) in staged and staged[(lang, field)] != getattr(row, field)
+        if edited:
+          setattr(row, field, staged[(lang, field)])
+
+        if not getattr(row, field):
+          stale = True
+        elif edited:
+          setattr(row, hash_field, hashes[field])
+        elif getattr(row, hash_field) != hashes[field]:
+          stale = True
+
+      if before != (row.question, row.answer, row.question_source_hash, row.answer_source_hash):
+        row.save()
+
+      if stale:
+        TranslationJob.objects.update_or_create(
+          faq=self,
+          lang=lang,
+          defaults={
+            'status': TranslationJob.STATUS_PENDING,
+            'attempts': 0,
+            'run_after': timezone.now(),
+            'last_error': '',
+          },
+        )
+
+  def get_translation(self, field_name, lang):
+    """Get the stored translation of a field, None if there is none"""
+    if (lang, field_name) in self._staged_translations:
+      return self._staged_translations[(lang, field_name)]
+    if self.pk is None:
+      return None
+
+    # Uses the (possibly language filtered) prefetched rows when there are some
+    if 'translations' not in getattr(self, '_prefetched_objects_cache', {}):
+      models.prefetch_related_objects([self], translations_prefetch())
+    for row in self.translations.all():
+      if row.lang == lang:
+        return getattr(row, field_name)
+    return None
+
+  def translation_status(self, lang):
+    """Get the translation status for a language"""
+    job = self.translation_jobs.filter(lang=lang).only('status').first()
+    return job.status if job else TranslationJob.STATUS_DONE
+
   def clear_cache(self):
-    """Clear all cached version of this FAQ"""
-    languages = ['en', 'hi', 'bn']
-    for lang in languages:
-      cache.delete(f'faq_{self.id}_question_{lang}')
-      cache.delete(f'faq_{self.id}_answer_{lang}')
-      cache.delete(f'faq_list_{lang}')
-      cache.delete(f'faq_detail_{self.id}_{lang}')
+    """Invalidate all cached versions of this FAQ and every list page"""
+    if self.id is None:
+      return
+    bump_version(faq_namespace(self.id))
+    bump_version(LIST_NAMESPACE)
+    faq_cache_cleared.send(sender=self.__class__, faq_id=self.id)
 
   def get_cached_translation(self, field_name, lang):
     """Get cached translation for a field"""
-    cache_key = f'faq_{self.id}_{field_name}_{lang}'
+    cache_key = translation_key(self.id, field_name, lang)
     cached_value = cache.get(cache_key)
 
     if cached_value is None:
-        if lang == 'en':
-            value = getattr(self, field_name)
-        else:
-          translation_field = f'{field_name}_{lang}'
-          if hasattr(self, translation_field):
-              value = getattr(self, translation_field)
-              if not value:  # Fallback to english if translation is not available
-                  value = getattr(self, field_name)
-          else:
+        value = None
+        if lang in TRANSLATION_LANGUAGES:
+            value = self.get_translation(field_name, lang)
+        if not value:  # Fallback to english if translation is not available
             value = getattr(self, field_name)
-            
+
         cache.set(cache_key, value, timeout=settings.CACHE_TTL)
         return value
 
     return cached_value
 
+  @staticmethod
+  def get_cached_translations_many(faqs, lang, field_names=TRANSLATED_FIELDS):
+    """
+    Translations of many FAQs in a language, with the English fallback, as
+    {(faq id, field): text}.
+
+    FAQs whose translation rows are already loaded are answered from them
+    without the cache. The others share one cache read and one cache write,
+    however many there are.
+    """
+    values = {}
+    uncached = []
+    for faq in faqs:
+      loaded = faq.pk is None or 'translations' in getattr(faq, '_prefetched_objects_cache', {})
+      if lang not in TRANSLATION_LANGUAGES or loaded:
+        for field_name in field_names:
+          value = faq.get_translation(field_name, lang) if lang in TRANSLATION_LANGUAGES else None
+          values[(faq.pk, field_name)] = value or getattr(faq, field_name)
+      else:
+        uncached.append(faq)
+
+    if not uncached:
+      return values
+
+    versions = get_versions([faq_namespace(faq.pk) for faq in uncached])
+    keys = {
+      (faq.pk, field_name): translation_key(faq.pk, field_name, lang, versions[faq_namespace(faq.pk)])
+      for faq in uncached for field_name in field_names
+    }
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [faq for faq in uncached if any(keys[(faq.pk, field_name)] not in cached for field_name in field_names)]
+    if missing:
+      models.prefetch_related_objects(missing, translations_prefetch(lang))
+      fresh = {
+        keys[(faq.pk, field_name)]: faq.get_translation(field_name, lang) or getattr(faq, field_name)
+        for faq in missing for field_name in field_names
+      }
+      cache.set_many(fresh, timeout=settings.CACHE_TTL)
+      cached.update(fresh)
+
+    values.update((pair, cached[key]) for pair, key in keys.items())
+    return values
+
   def get_question(self, lang='en'):
     """Get questions in a specified language"""
     if lang == 'en':
@@ -118,4 +257,211 @@ class FAQ(models.Model):
       'answer': self.get_answer(lang),
       'created_at': self.created_at,
       'updated_at': self.updated_at,
-    }
\ No newline at end of file
+    }
+
+
+
+def _translation_property(field_name, lang):
+  """question_<lang> / answer_<lang> accessor, setting it stages the value until save()"""
+  def getter(self):
+    return self.get_translation(field_name, lang)
+
+  def setter(self, value):
+    self.__dict__.setdefault('_staged_translations', {})[(lang, field_name)] = value
+
+  return property(getter, setter)
+
+
+for _lang in TRANSLATION_LANGUAGES:
+  for _field in TRANSLATED_FIELDS:
+    setattr(FAQ, f'{_field}_{_lang}', _translation_property(_field, _lang))
+
+
+class FAQTranslation(models.Model):
+  """An FAQ's question and answer in one language"""
+  faq = models.ForeignKey(FAQ, on_delete=models.CASCADE, related_name='translations')
+  lang = models.CharField(max_length=10)
+  question = models.TextField(_('Question'), blank=True, null=True)
+  answer = RichTextField(_('Answer'), blank=True, null=True)
+  # Hashes of the English text the translations were made from
+  question_source_hash = models.CharField(max_length=64, blank=True, default='')
+  answer_source_hash = models.CharField(max_length=64, blank=True, default='')
+
+  class Meta:
+    verbose_name = 'FAQ translation'
+    verbose_name_plural = 'FAQ translations'
+    constraints = [
+      models.UniqueConstraint(fields=['faq', 'lang'], name='unique_faq_translation'),
+    ]
+
+  def __str__(self):
+    return f'{self.faq_id} [{self.lang}]'
+
+
+
+class TranslationJob(models.Model):
+  """A queued translation of one FAQ into one language"""
+  STATUS_PENDING = 'pending'
+  STATUS_RUNNING = 'running'
+  STATUS_DONE = 'done'
+  STATUS_FAILED = 'failed'
+  STATUS_CHOICES = (
+    (STATUS_PENDING, _('Pending')),
+    (STATUS_RUNNING, _('Running')),
+    (STATUS_DONE, _('Done')),
+    (STATUS_FAILED, _('Failed')),
+  )
+
+  faq = models.ForeignKey(FAQ, on_delete=models.CASCADE, related_name='translation_jobs')
+  lang = models.CharField(max_length=10)
+  status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+  attempts = models.PositiveIntegerField(default=0)
+  run_after = models.DateTimeField(default=timezone.now)
+  locked_at = models.DateTimeField(blank=True, null=True)
+  last_error = models.TextField(blank=True, default='')
+  created_at = models.DateTimeField(auto_now_add=True)
+  updated_at = models.DateTimeField(auto_now=True)
+
+  class Meta:
+    verbose_name = 'Translation job'
+    verbose_name_plural = 'Translation jobs'
+    constraints = [
+      models.UniqueConstraint(fields=['faq', 'lang'], name='unique_translation_job'),
+    ]
+    indexes = [
+      models.Index(fields=['status', 'run_after'], name='faqs_transjob_queue_idx'),
+    ]
+
+  def __str__(self):
+    return f'{self.faq_id} [{self.lang}] {self.status}'
+
+
+class TranslationMemory(models.Model):
+  """A previously translated text, reused instead of calling the translator again"""
+  source_hash = models.CharField(max_length=64)
+  target_lang = models.CharField(max_length=10)
+  backend = models.CharField(max_length=50)
+  source_text = models.TextField()
+  translated_text = models.TextField()
+  hits = models.PositiveIntegerField(default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    verbose_name = 'Translation memory entry'
+    verbose_name_plural = 'Translation memory'
+    constraints = [
+      models.UniqueConstraint(fields=['source_hash', 'target_lang', 'backend'], name='unique_translation_memory'),
+    ]
+
+  def __str__(self):
+    return f'[{self.target_lang}] {self.source_text[:50]}'
+
+
+class SearchTerm(models.Model):
+  """A posting of the search index: how much a term weighs in an active FAQ, in one language"""
+  faq = models.ForeignKey(FAQ, on_delete=models.CASCADE, related_name='search_terms')
+  lang = models.CharField(max_length=10)
+  term = models.CharField(max_length=64)
+  weight = models.PositiveIntegerField(default=1)
+
+  class Meta:
+    verbose_name = 'Search term'
+    verbose_name_plural = 'Search terms'
+    constraints = [
+      models.UniqueConstraint(fields=['faq', 'lang', 'term'], name='unique_search_term'),
+    ]
+    indexes = [
+      # Covers the scoring of the candidates, the postings of the query terms in a set of FAQs
+      models.Index(fields=['lang', 'term', 'faq', 'weight'], name='faqs_searchterm_lookup_idx'),
+      # The heaviest postings of a term first, without sorting them
+      models.Index(fields=['lang', 'term', '-weight', '-faq'], name='faqs_searchterm_weight_idx'),
+    ]
+
+  def __str__(self):
+    return f'{self.term} [{self.lang}] -> {self.faq_id}'
+
+
+class SearchTermFrequency(models.Model):
+  """
+  How many indexed FAQs a term appears in, in one language, for the IDF of the
+  ranking. The row with a blank term counts the indexed FAQs themselves. Kept
+  in step with the SearchTerm rows by faqs.search.
+  """
+  DOCUMENTS = ''
+
+  lang = models.CharField(max_length=10)
+  term = models.CharField(max_length=64, blank=True)
+  documents = models.IntegerField(default=0)
+
+  class Meta:
+    verbose_name = 'Search term frequency'
+    verbose_name_plural = 'Search term frequencies'
+    constraints = [
+      models.UniqueConstraint(fields=['lang', 'term'], name='unique_search_term_frequency'),
+    ]
+
+  def __str__(self):
+    return f'{self.term or "*"} [{self.lang}]: {self.documents}'
+
+
+class FAQChange(models.Model):
+  """
+  Append-only log of FAQ changes, read by clients that keep a local copy.
+
+  The auto-incremented id is the sync token, the newest changes are held
+  back until older ids are sure to be committed (see faqs.changes). ``faq_id`` isn't a foreign key
+  so the log outlives deleted FAQs. ``lang`` is set when only one language
+  changed, blank when all of them did.
+  """
+  ACTION_CREATED = 'created'
+  ACTION_UPDATED = 'updated'
+  ACTION_DEACTIVATED = 'deactivated'
+  ACTION_DELETED = 'deleted'
+  ACTION_CHOICES = (
+    (ACTION_CREATED, _('Created')),
+    (ACTION_UPDATED, _('Updated')),
+    (ACTION_DEACTIVATED, _('Deactivated')),
+    (ACTION_DELETED, _('Deleted')),
+  )
+
+  faq_id = models.BigIntegerField()
+  lang = models.CharField(max_length=10, blank=True, default='')
+  action = models.CharField(max_length=12, choices=ACTION_CHOICES)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  class Meta:
+    verbose_name = 'FAQ change'
+    verbose_name_plural = 'FAQ changes'
+    indexes = [
+      # The changes still settling, see FAQ_CHANGES_SETTLE_SECONDS
+      models.Index(fields=['created_at'], name='faqs_faqchange_created_idx'),
+    ]
+
+  def __str__(self):
+    return f'#{self.pk} {self.faq_id} {self.action}'
+
+  @classmethod
+  def record(cls, faq, action=None, lang=''):
+    """Log a change of an FAQ, an update or a deactivation depending on its state by default"""
+    if action is None:
+      action = cls.ACTION_UPDATED if faq.is_active else cls.ACTION_DEACTIVATED
+    return cls.objects.create(faq_id=faq.pk, lang=lang, action=action)
+
+
+class FAQAccessCount(models.Model):
+  """
+  How many times an FAQ was served, for warming the cache with the most
+  requested FAQs first. Added to in batches by faqs.access_counts.
+  """
+  faq = models.OneToOneField(FAQ, on_delete=models.CASCADE, primary_key=True, related_name='access_count')
+  count = models.PositiveBigIntegerField(default=0)
+
+  class Meta:
+    verbose_name = 'FAQ access count'
+    verbose_name_plural = 'FAQ access counts'
+    indexes = [
+      models.Index(fields=['-count'], name='faqs_faq_access_count_idx'),
+    ]
+
+  def __str__(self):
+    return f'{self.faq_id}: {self.count}'
@@ -0,0 +1,45 @@
+# faqs/pagination.py
+
+from urllib.parse import parse_qs, urlsplit
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class FAQCursorPagination(CursorPagination):
+  """
+  Keyset pagination over (-created_at, -id).
+
+  Pages are fetched with a WHERE on the cursor position instead of an
+  OFFSET, so deep pages cost the same as the first one.
+  """
+  ordering = ('-created_at', '-id')
+  page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+  page_size_query_param = 'page_size'
+  max_page_size = 100
+
+  def get_next_cursor(self):
+    """Encoded cursor of the next page, None on the last page"""
+    return self._cursor_of(self.get_next_link())
+
+  def get_previous_cursor(self):
+    """Encoded cursor of the previous page, '' when that is the first page, None on the first page"""
+    return self._cursor_of(self.get_previous_link())
+
+  def _cursor_of(self, link):
+    if link is None:
+      return None
+    return parse_qs(urlsplit(link).query).get(self.cursor_query_param, [''])[0]
+
+  def page_link(self, request, cursor):
+    """
+    Link to the page at a cursor from get_next_cursor() or get_previous_cursor(),
+    built from the request's own URL like DRF's links
+    """
+    if cursor is None:
+      return None
+    url = request.build_absolute_uri()
+    if not cursor:
+      return remove_query_param(url, self.cursor_query_param)
+    return replace_query_param(url, self.cursor_query_param, cursor)
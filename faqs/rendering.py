@@ -0,0 +1,175 @@
+# faqs/rendering.py
+
+import itertools
+import json
+from gzip import GzipFile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.http import HttpResponse
+from django.utils.text import StreamingBuffer
+from rest_framework.renderers import JSONRenderer
+
+from . import metrics
+from .cache_keys import aget_versions, detail_key, faq_namespace, get_version, get_versions, modified_key
+from .languages import LANGUAGES
+from .models import FAQ, translations_prefetch
+from .serializers import FAQSerializer
+
+
+# Languages every FAQ is pre-rendered in when it is saved
+RENDERED_LANGUAGES = tuple(LANGUAGES)
+
+_renderer = JSONRenderer()
+
+
+def render_faq(faq, lang):
+  """Serialize an FAQ to JSON bytes"""
+  with metrics.timed('serialize'):
+    return _renderer.render(FAQSerializer(faq, context={'lang': lang}).data)
+
+
+def render_faqs(faqs, lang):
+  """Serialize many FAQs to JSON bytes each, looking their translations up together"""
+  with metrics.timed('serialize'):
+    return [_renderer.render(data) for data in FAQSerializer(faqs, many=True, context={'lang': lang}).data]
+
+
+def store_rendered(faq, languages=RENDERED_LANGUAGES):
+  """Pre-render an FAQ in every language and write the bytes to the cache"""
+  if 'translations' not in getattr(faq, '_prefetched_objects_cache', {}):
+    prefetch_related_objects([faq], translations_prefetch())
+  version = get_version(faq_namespace(faq.id))
+  payloads = {detail_key(faq.id, lang, version): render_faq(faq, lang) for lang in languages}
+  cache.set_many(
+    {**payloads, modified_key(faq.id, version): faq.updated_at.timestamp()},
+    timeout=settings.FAQ_RENDERED_TTL,
+  )
+  return payloads
+
+
+def get_rendered_many(ids, lang):
+  """Get the pre-rendered bytes for a list of FAQ ids, in order"""
+  versions = get_versions([faq_namespace(faq_id) for faq_id in ids])
+  keys = {faq_id: detail_key(faq_id, lang, versions[faq_namespace(faq_id)]) for faq_id in ids}
+  payloads = cache.get_many(list(keys.values()))
+
+  missing = [faq_id for faq_id, key in keys.items() if key not in payloads]
+  if missing:
+    faqs = list(FAQSerializer.prepare_queryset(FAQ.objects.filter(pk__in=missing, is_active=True), lang))
+    rendered = {keys[faq.id]: payload for faq, payload in zip(faqs, render_faqs(faqs, lang))}
+    cache.set_many(rendered, timeout=settings.FAQ_RENDERED_TTL)
+    payloads.update(rendered)
+
+  return [payloads[keys[faq_id]] for faq_id in ids if keys[faq_id] in payloads]
+
+
+async def aget_rendered_many(ids, lang):
+  """get_rendered_many() for async code, a miss is left to it in a thread"""
+  versions = await aget_versions([faq_namespace(faq_id) for faq_id in ids])
+  keys = {faq_id: detail_key(faq_id, lang, versions[faq_namespace(faq_id)]) for faq_id in ids}
+  payloads = await cache.aget_many(list(keys.values()))
+  if len(payloads) < len(keys):
+    return await sync_to_async(get_rendered_many)(ids, lang)
+  return [payloads[keys[faq_id]] for faq_id in ids]
+
+
+def iter_rendered(ids, lang, chunk_size=500):
+  """Pre-rendered bytes for a stream of FAQ ids, one list per chunk of ids"""
+  ids = iter(ids)
+  while True:
+    chunk = list(itertools.islice(ids, chunk_size))
+    if not chunk:
+      return
+    yield get_rendered_many(chunk, lang)
+
+
+def stream_json(chunks):
+  """A JSON array, written a chunk of pre-rendered FAQs at a time"""
+  yield b'['
+  separator = b''
+  for results in chunks:
+    if results:
+      yield separator + b','.join(results)
+      separator = b','
+  yield b']'
+
+
+def stream_ndjson(chunks):
+  """One pre-rendered FAQ per line"""
+  for results in chunks:
+    if results:
+      yield b''.join(result + b'\n' for result in results)
+
+
+async def aiter_rendered(ids, lang, chunk_size=500):
+  """iter_rendered() for an async stream of FAQ ids"""
+  chunk = []
+  async for faq_id in ids:
+    chunk.append(faq_id)
+    if len(chunk) == chunk_size:
+      yield await aget_rendered_many(chunk, lang)
+      chunk = []
+  if chunk:
+    yield await aget_rendered_many(chunk, lang)
+
+
+async def astream_json(chunks):
+  """stream_json() for async chunks"""
+  yield b'['
+  separator = b''
+  async for results in chunks:
+    if results:
+      yield separator + b','.join(results)
+      separator = b','
+  yield b']'
+
+
+async def astream_ndjson(chunks):
+  """stream_ndjson() for async chunks"""
+  async for results in chunks:
+    if results:
+      yield b''.join(result + b'\n' for result in results)
+
+
+async def acompress_sequence(sequence):
+  """django.utils.text.compress_sequence() for an async stream, one gzip member for all of it"""
+  buf = StreamingBuffer()
+  with GzipFile(mode='wb', compresslevel=6, fileobj=buf, mtime=0) as zfile:
+    yield buf.read()
+    async for item in sequence:
+      zfile.write(item)
+      data = buf.read()
+      if data:
+        yield data
+  yield buf.read()
+
+
+def render_page(results, next_link=None, previous_link=None):
+  """Stitch pre-rendered FAQs into a paginated list body without re-serializing them"""
+  return b''.join([
+    b'{"next":', json.dumps(next_link).encode(),
+    b',"previous":', json.dumps(previous_link).encode(),
+    b',"results":[', b','.join(results), b']}',
+  ])
+
+
+def render_changes(token, results, removed, has_more):
+  """Stitch pre-rendered FAQs into a change feed body"""
+  return b''.join([
+    b'{"token":', json.dumps(token).encode(),
+    b',"has_more":', json.dumps(has_more).encode(),
+    b',"changed":[', b','.join(results), b']',
+    b',"removed":', json.dumps(removed).encode(), b'}',
+  ])
+
+
+def render_json(data):
+  with metrics.timed('serialize'):
+    return _renderer.render(data)
+
+
+def json_response(payload, status=200):
+  return HttpResponse(payload, content_type='application/json', status=status)
@@ -0,0 +1,298 @@
+# faqs/search.py
+
+# Full-text search over an inverted index kept in the SearchTerm table. Every
+# active FAQ is indexed in every language, using the text the API serves in
+# that language (the translation, or the English fallback). Queries are
+# ranked by TF-IDF over a bounded set of candidates: the heaviest postings of
+# each term, read in weight order from the (lang, term, -weight) index. The
+# document frequencies come from SearchTermFrequency, kept in step with the
+# postings, so no query counts rows.
+
+import html
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.html import strip_tags
+
+from .languages import DEFAULT_LANGUAGE, LANGUAGES
+from .models import FAQ, SearchTerm, SearchTermFrequency, translations_prefetch
+
+
+# A match in the question counts this many times a match in the answer
+QUESTION_WEIGHT = 3
+
+# Longer queries are cut, each term is one more index range read per query
+MAX_QUERY_TERMS = 8
+
+MAX_TERM_LENGTH = 64
+SNIPPET_LENGTH = 160
+
+# Terms per UPDATE of the document frequencies, two query parameters each
+_FREQUENCY_UPDATE_SIZE = 500
+
+# Word characters plus the Devanagari and Bengali blocks (minus the danda
+# punctuation), since \w doesn't match the vowel signs and viramas and would
+# split words at every one of them
+_TOKEN_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u097f\u0980-\u09ff\u200c\u200d]+')
+
+# Zero width (non-)joiners only change how a word is drawn
+_JOINERS = dict.fromkeys([0x200c, 0x200d])
+
+
+def plain_text(value):
+  """Text of a (possibly HTML) field, with whitespace collapsed"""
+  text = html.unescape(strip_tags(value or ''))
+  return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+def normalize_term(token):
+  return unicodedata.normalize('NFC', token).casefold().translate(_JOINERS).strip('_')[:MAX_TERM_LENGTH]
+
+
+def tokenize(text):
+  """Normalized search terms of a plain text, in order"""
+  terms = (normalize_term(match.group()) for match in _TOKEN_RE.finditer(text))
+  return [term for term in terms if term]
+
+
+def served_text(faq, field_name, lang):
+  """The text the API serves for a field in a language"""
+  if lang != DEFAULT_LANGUAGE:
+    value = faq.get_translation(field_name, lang)
+    if value:
+      return value
+  return getattr(faq, field_name)
+
+
+def build_terms(faq, languages):
+  """SearchTerm rows of an FAQ"""
+  rows = []
+  for lang in languages:
+    weights = {}
+    for term in tokenize(plain_text(served_text(faq, 'question', lang))):
+      weights[term] = weights.get(term, 0) + QUESTION_WEIGHT
+    for term in tokenize(plain_text(served_text(faq, 'answer', lang))):
+      weights[term] = weights.get(term, 0) + 1
+    rows.extend(SearchTerm(faq_id=faq.pk, lang=lang, term=term, weight=weight) for term, weight in weights.items())
+  return rows
+
+
+def _document_counts(postings):
+  """
+  Counter of (lang, term) -> FAQs, from (faq_id, lang, term) postings. Each
+  language's FAQs are counted under the blank term.
+  """
+  counts = Counter()
+  documents = set()
+  for faq_id, lang, term in postings:
+    counts[lang, term] += 1
+    documents.add((faq_id, lang))
+  counts.update((lang, SearchTermFrequency.DOCUMENTS) for _, lang in documents)
+  return counts
+
+
+def _adjust_frequencies(deltas):
+  """Add a Counter of (lang, term) -> change to the stored document frequencies"""
+  deltas = {key: delta for key, delta in deltas.items() if delta}
+  if not deltas:
+    return
+  SearchTermFrequency.objects.bulk_create(
+    [SearchTermFrequency(lang=lang, term=term) for lang, term in deltas], ignore_conflicts=True, batch_size=5000,
+  )
+  by_lang = defaultdict(dict)
+  for (lang, term), delta in deltas.items():
+    by_lang[lang][term] = delta
+  for lang, changes in by_lang.items():
+    terms = list(changes)
+    for start in range(0, len(terms), _FREQUENCY_UPDATE_SIZE):
+      chunk = terms[start:start + _FREQUENCY_UPDATE_SIZE]
+      delta = Case(*[When(term=term, then=Value(changes[term])) for term in chunk], output_field=IntegerField())
+      SearchTermFrequency.objects.filter(lang=lang, term__in=chunk).update(documents=F('documents') + delta)
+
+
+def _replace_postings(faq_id, languages, rows):
+  postings = SearchTerm.objects.filter(faq_id=faq_id, lang__in=languages)
+  deltas = _document_counts((row.faq_id, row.lang, row.term) for row in rows)
+  deltas.subtract(_document_counts(postings.values_list('faq_id', 'lang', 'term')))
+  postings.delete()
+  SearchTerm.objects.bulk_create(rows)
+  _adjust_frequencies(deltas)
+
+
+def index_faq(faq, languages=None):
+  """(Re)index an FAQ, inactive FAQs are dropped from the index"""
+  languages = tuple(languages or LANGUAGES)
+  with transaction.atomic():
+    _replace_postings(faq.pk, languages, build_terms(faq, languages) if faq.is_active else [])
+
+
+def index_new_faqs(faqs):
+  """Index FAQs that have no postings yet, in the transaction that created them (bulk imports)"""
+  rows = [term for faq in faqs if faq.is_active for term in build_terms(faq, LANGUAGES)]
+  SearchTerm.objects.bulk_create(rows, batch_size=5000)
+  _adjust_frequencies(_document_counts((row.faq_id, row.lang, row.term) for row in rows))
+
+
+def unindex_on_delete(sender, instance, **kwargs):
+  """pre_delete receiver of FAQ, takes its postings out of the frequencies before they cascade away"""
+  _replace_postings(instance.pk, LANGUAGES, [])
+
+
+def rebuild_index(batch_size=500):
+  """Rebuild the whole index from the FAQs, returns the number of FAQs indexed"""
+  SearchTerm.objects.all().delete()
+  SearchTermFrequency.objects.all().delete()
+
+  count = 0
+  batch = []
+  counts = Counter()
+  faqs = FAQ.objects.filter(is_active=True).prefetch_related(translations_prefetch()).order_by('pk')
+  for faq in faqs.iterator(chunk_size=batch_size):
+    batch.extend(build_terms(faq, LANGUAGES))
+    count += 1
+    if count % batch_size == 0:
+      counts.update(_document_counts((row.faq_id, row.lang, row.term) for row in batch))
+      SearchTerm.objects.bulk_create(batch, batch_size=5000)
+      batch = []
+  counts.update(_document_counts((row.faq_id, row.lang, row.term) for row in batch))
+  SearchTerm.objects.bulk_create(batch, batch_size=5000)
+  SearchTermFrequency.objects.bulk_create(
+    [SearchTermFrequency(lang=lang, term=term, documents=n) for (lang, term), n in counts.items()], batch_size=5000,
+  )
+  return count
+
+
+def make_snippet(text, terms, length=SNIPPET_LENGTH):
+  """A window of the text around the first matching term"""
+  if len(text) <= length:
+    return text
+
+  start = 0
+  for match in _TOKEN_RE.finditer(text):
+    if normalize_term(match.group()) in terms:
+      start = match.start()
+      break
+
+  # Keep some context before the match without cutting words in half
+  begin = max(0, min(start - length // 4, len(text) - length))
+  if begin:
+    begin = text.rfind(' ', 0, begin) + 1
+  end = begin + length
+  if end < len(text):
+    end = text.rfind(' ', begin, end) if ' ' in text[begin:end] else end
+
+  snippet = text[begin:end].strip()
+  return f"{'…' if begin else ''}{snippet}{'…' if end < len(text) else ''}"
+
+
+def _query_terms(query, lang):
+  if lang not in LANGUAGES:
+    lang = DEFAULT_LANGUAGE
+  return lang, list(dict.fromkeys(tokenize(plain_text(query))))[:MAX_QUERY_TERMS]
+
+
+def _frequencies(lang, terms):
+  """(term, FAQs) of the query terms that are indexed, and (blank term, FAQs) for the language"""
+  return SearchTermFrequency.objects.filter(
+    lang=lang, term__in=[SearchTermFrequency.DOCUMENTS, *terms], documents__gt=0,
+  ).values_list('term', 'documents')
+
+
+def _candidates_per_term(limit):
+  return max(settings.FAQ_SEARCH_CANDIDATES_PER_TERM, limit)
+
+
+def _top_postings(lang, term, size):
+  """The `size` heaviest postings of a term, straight off the weight index"""
+  postings = SearchTerm.objects.filter(lang=lang, term=term).order_by('-weight', '-faq_id')
+  return postings.values_list('faq_id', 'term', 'weight')[:size]
+
+
+def _candidate_postings(lang, terms, faq_ids):
+  """Every posting of the query terms in the candidates, for their full scores"""
+  postings = SearchTerm.objects.filter(lang=lang, term__in=terms, faq_id__in=faq_ids)
+  return postings.values_list('faq_id', 'term', 'weight')
+
+
+def _rank(postings, frequencies, limit):
+  """The `limit` best scored FAQs of the postings, as [{'faq_id': ..., 'score': ...}]"""
+  frequencies = dict(frequencies)
+  # Frequencies stored before the FAQ counts were bounded by them
+  total = max(frequencies.pop(SearchTermFrequency.DOCUMENTS, 0), *frequencies.values())
+  idf = {term: math.log(1 + total / n) for term, n in frequencies.items()}
+
+  scores = defaultdict(float)
+  for faq_id, term, weight in postings:
+    scores[faq_id] += weight * idf[term]
+  ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)[:limit]
+  return [{'faq_id': faq_id, 'score': score} for faq_id, score in ranked]
+
+
+def _result_faqs(ranked, lang):
+  faqs = FAQ.objects.filter(pk__in=[row['faq_id'] for row in ranked])
+  return faqs.only('id', 'question', 'answer').with_translations(lang)
+
+
+def _results(ranked, faqs, lang, terms):
+  faqs = {faq.pk: faq for faq in faqs}
+  terms = set(terms)
+
+  results = []
+  for row in ranked:
+    faq = faqs.get(row['faq_id'])
+    if faq is None:
+      continue
+    results.append({
+      'id': faq.pk,
+      'question': served_text(faq, 'question', lang),
+      'snippet': make_snippet(plain_text(served_text(faq, 'answer', lang)), terms),
+      'score': round(row['score'], 4),
+    })
+  return results
+
+
+def search(query, lang=DEFAULT_LANGUAGE, limit=10):
+  """Ranked FAQs matching a query, with the question and a snippet of the answer"""
+  lang, terms = _query_terms(query, lang)
+  if not terms:
+    return []
+
+  frequencies = dict(_frequencies(lang, terms))
+  matched = [term for term in terms if term in frequencies]
+  if not matched:
+    return []
+
+  # Candidates are the heaviest postings of each term, a single term's are all it scores
+  size = _candidates_per_term(limit)
+  postings = [row for term in matched for row in _top_postings(lang, term, size)]
+  if len(matched) > 1:
+    postings = list(_candidate_postings(lang, matched, {faq_id for faq_id, _, _ in postings}))
+
+  ranked = _rank(postings, frequencies, limit)
+  return _results(ranked, _result_faqs(ranked, lang), lang, terms)
+
+
+async def asearch(query, lang=DEFAULT_LANGUAGE, limit=10):
+  """search() over the async ORM"""
+  lang, terms = _query_terms(query, lang)
+  if not terms:
+    return []
+
+  frequencies = {term: n async for term, n in _frequencies(lang, terms)}
+  matched = [term for term in terms if term in frequencies]
+  if not matched:
+    return []
+
+  size = _candidates_per_term(limit)
+  postings = [row for term in matched async for row in _top_postings(lang, term, size)]
+  if len(matched) > 1:
+    postings = [row async for row in _candidate_postings(lang, matched, {faq_id for faq_id, _, _ in postings})]
+
+  ranked = _rank(postings, frequencies, limit)
+  faqs = [faq async for faq in _result_faqs(ranked, lang)]
+  return _results(ranked, faqs, lang, terms)
@@ -3,19 +3,50 @@
 from rest_framework import serializers
 from .models import FAQ
 
+
+class FAQListSerializer(serializers.ListSerializer):
+  def to_representation(self, data):
+    # Look the translations of the whole list up at once, instead of per FAQ and field
+    faqs = list(data.all() if hasattr(data, 'all') else data)
+    self.child.translations = FAQ.get_cached_translations_many(faqs, self.context.get('lang', 'en'))
+    return super().to_representation(faqs)
+
+
 class FAQSerializer(serializers.ModelSerializer):
   question = serializers.SerializerMethodField()
   answer = serializers.SerializerMethodField()
 
+  # {(faq id, field): text} of the FAQs being serialized, filled in by the list serializer
+  translations = None
+
 
   class Meta:
     model = FAQ
     fields = ['id', 'question', 'answer', 'created_at', 'updated_at']
+    list_serializer_class = FAQListSerializer
 
-  def get_question(self, obj):
+  # FAQ columns read when serializing, the English text doubles as the fallback
+  # for missing translations
+  columns = ('id', 'question', 'answer', 'created_at', 'updated_at')
+
+  @classmethod
+  def prepare_queryset(cls, queryset, lang='en'):
+    """Load only the columns and translation rows needed to serialize in a language"""
+    return queryset.only(*cls.columns).with_translations(lang)
+
+  def to_representation(self, instance):
+    if self.parent is None:
+      self.translations = FAQ.get_cached_translations_many([instance], self.context.get('lang', 'en'))
+    return super().to_representation(instance)
+
+  def get_translated(self, obj, field_name):
     lang = self.context.get('lang', 'en')
-    return obj.get_question(lang)
+    if lang == 'en':
+      return getattr(obj, field_name)
+    return self.translations[(obj.pk, field_name)]
+
+  def get_question(self, obj):
+    return self.get_translated(obj, 'question')
 
   def get_answer(self, obj):
-    lang = self.context.get('lang', 'en')
-    return obj.get_answer(lang)
\ No newline at end of file
+    return self.get_translated(obj, 'answer')
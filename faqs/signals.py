@@ -0,0 +1,8 @@
+# faqs/signals.py
+
+from django.dispatch import Signal
+
+
+# Sent with faq_id by FAQ.clear_cache(), once the FAQ's cached responses and
+# every list page have been invalidated
+faq_cache_cleared = Signal()
@@ -1,9 +1,18 @@
 # faqs/tests/conftest.py
 
+import time
 import pytest
+from faqs import access_counts
 from faqs.models import FAQ
 from rest_framework.test import APIClient
 
+@pytest.fixture(autouse=True)
+def fresh_access_counts():
+  """Start every test with no counted requests, so none is flushed in the middle of it"""
+  access_counts._pending.clear()
+  access_counts._last_flush = time.monotonic()
+
+
 @pytest.fixture
 def api_client():
   return APIClient()
@@ -26,4 +35,38 @@ def faq_without_translations():
   return FAQ.objects.create(
     question = 'Question without translation',
     answer = '<p>Answer without translation</p>'
-  )
\ No newline at end of file
+  )
+
+
+class FakeBackend:
+  """Translator backend that tags every text with the target language, and records the calls"""
+
+  def __init__(self, misalign=False):
+    self.calls = []
+    self.misalign = misalign
+
+  def translate(self, text, dest):
+    self.calls.append((text, dest))
+    if self.misalign:
+      text = text.replace('\n\n', ' ')
+    return type('Translated', (), {'text': f'{dest}:' + text.replace('\n\n', f'\n\n{dest}:')})()
+
+
+class FakeTranslator:
+  """Deterministic stand-in for the network translator"""
+
+  def __init__(self):
+    self.calls = []
+
+  def translate_mixed_batch(self, texts, html_contents, target_langs):
+    texts, html_contents = list(texts), list(html_contents)
+    self.calls.extend((text, lang) for lang in target_langs for text in texts + html_contents)
+    return {
+      lang: tuple([f'[{lang}] {value}' if value else None for value in values] for values in (texts, html_contents))
+      for lang in target_langs
+    }
+
+
+@pytest.fixture
+def fake_translator():
+  return FakeTranslator()
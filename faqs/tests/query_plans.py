@@ -0,0 +1,55 @@
+# faqs/tests/query_plans.py
+
+# EXPLAIN based checks of the queries a block of code runs, for the query plan
+# tests. A query fails when the database reads a whole table and then sorts it
+# in a temporary B-tree, the plan that gets linearly slower with the table.
+
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+# SQLite: "SCAN faqs_faq" without "USING ... INDEX", then "USE TEMP B-TREE FOR ORDER BY"
+_SQLITE_FULL_SCAN = re.compile(r'^SCAN \w+$')
+_SQLITE_FULL_SORT = re.compile(r'^USE TEMP B-TREE FOR (ORDER BY|DISTINCT)$')
+
+# PostgreSQL: "Seq Scan on faqs_faq" below a "Sort"
+_POSTGRES_FULL_SCAN = re.compile(r'Seq Scan on ')
+_POSTGRES_FULL_SORT = re.compile(r'^\s*(->\s*)?(Incremental )?Sort\b')
+
+
+def explain(sql, params=()):
+  """The query plan of a SELECT, one line per step"""
+  with connection.cursor() as cursor:
+    if connection.vendor == 'sqlite':
+      cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+      return [row[-1] for row in cursor.fetchall()]
+    cursor.execute(f'EXPLAIN {sql}', params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def is_full_scan_sort(plan):
+  if connection.vendor == 'sqlite':
+    full_scan, full_sort = _SQLITE_FULL_SCAN, _SQLITE_FULL_SORT
+  else:
+    full_scan, full_sort = _POSTGRES_FULL_SCAN, _POSTGRES_FULL_SORT
+  return any(full_scan.search(line.strip()) for line in plan) and any(full_sort.search(line) for line in plan)
+
+
+@contextmanager
+def assert_no_full_scan_sorts():
+  """Fail if a SELECT run in the block is planned as a full table scan plus a sort"""
+  with CaptureQueriesContext(connection) as context:
+    yield context
+
+  offenders = []
+  for query in context.captured_queries:
+    sql = query['sql']
+    if not sql.lstrip().upper().startswith('SELECT'):
+      continue
+    plan = explain(sql)
+    if is_full_scan_sort(plan):
+      offenders.append(sql + '\n    ' + '\n    '.join(plan))
+  assert not offenders, 'Full table scan and sort:\n' + '\n'.join(offenders)
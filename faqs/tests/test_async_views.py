@@ -0,0 +1,123 @@
+# faqs/tests/test_async_views.py
+
+import gzip
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from django.urls import resolve
+from faqs import access_counts, async_views, rendering
+from faqs.cache_keys import detail_key, list_key
+from faqs.models import FAQ
+
+pytestmark = [pytest.mark.django_db, pytest.mark.urls('config.asgi_urls')]
+
+
+def get(path, headers=None):
+    return async_to_sync(AsyncClient().get)(path, headers=headers)
+
+
+class TestAsyncReadPath:
+    def test_asgi_routes_reads_to_async_views(self):
+        """Test that the ASGI URLs send the hot reads to the async views and the rest to DRF"""
+        assert resolve('/api/faqs/').func is async_views.faq_list
+        assert resolve('/api/faqs/1/').func is async_views.faq_detail
+        assert resolve('/api/faqs/search/').func is async_views.faq_search
+        assert resolve('/api/faqs/dump/').func is async_views.faq_dump
+
+    def test_detail_is_served_from_the_cache(self, sample_faq, django_assert_num_queries):
+        """Test that a cached detail is read without the database or the sync view"""
+        with django_assert_num_queries(0):
+            response = get(f'/api/faqs/{sample_faq.pk}/?lang=hi')
+
+        assert response.status_code == 200
+        assert response.json()['question'] == sample_faq.question_hi
+        revalidated = get(f'/api/faqs/{sample_faq.pk}/?lang=hi', headers={'If-None-Match': response['ETag']})
+        assert revalidated.status_code == 304
+
+    def test_detail_requests_are_counted(self, sample_faq):
+        """Test that detail responses served from the cache count towards the FAQ's accesses"""
+        get(f'/api/faqs/{sample_faq.pk}/?lang=hi')
+        get(f'/api/faqs/{sample_faq.pk}/?lang=bn')
+
+        assert access_counts._pending[sample_faq.pk] == 2
+
+    def test_detail_miss_falls_back_to_the_sync_view(self, sample_faq):
+        """Test that a miss is rendered, and a missing FAQ is a 404"""
+        cache.clear()
+        response = get(f'/api/faqs/{sample_faq.pk}/?lang=bn')
+        assert response.json()['question'] == sample_faq.question_bn
+        assert cache.get(detail_key(sample_faq.pk, 'bn')) is not None
+
+        assert get('/api/faqs/999999/').status_code == 404
+        assert cache.get('faq_999999_version') is None
+
+    def test_list_matches_the_sync_view(self, sample_faq, faq_without_translations):
+        """Test that the async list returns what the sync view built and cached"""
+        first = get('/api/faqs/?lang=hi&page_size=1')
+        assert cache.get(list_key('hi', 1, '')) is not None
+
+        second = get('/api/faqs/?lang=hi&page_size=1')
+        assert second.content == first.content
+        assert second['ETag'] == first['ETag']
+        assert get('/api/faqs/?lang=hi&page_size=1', headers={'If-None-Match': first['ETag']}).status_code == 304
+
+    def test_search(self, sample_faq):
+        """Test the async search returns the same results as the sync one"""
+        response = get('/api/faqs/search/?q=সেবাটি&lang=bn')
+        assert response.json()['results'][0]['id'] == sample_faq.pk
+        assert get('/api/faqs/search/?q=x&limit=x').status_code == 400
+
+    def test_async_cache_reads(self, sample_faq):
+        """Test that the native async reads see what the sync client wrote"""
+        cache.set('async-test', {'value': 1})
+        cache.set('async-int', 5)
+        cache.tier.store.clear()  # read them back from Redis, not process memory
+        found = async_to_sync(cache.aget_many)(['async-test', 'async-int', 'async-missing'])
+        assert found == {'async-test': {'value': 1}, 'async-int': 5}
+
+
+async def read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+class TestAsyncDump:
+    def test_dump_is_an_async_stream(self, sample_faq, faq_without_translations):
+        """Test that the dump streams from an async generator, so ASGI doesn't buffer it"""
+        response = get('/api/faqs/dump/?lang=hi')
+
+        assert response.is_async
+        faqs = json.loads(async_to_sync(read_stream)(response))
+        assert [faq['id'] for faq in faqs] == [faq_without_translations.pk, sample_faq.pk]
+        assert faqs[1]['question'] == sample_faq.question_hi
+        assert response['Content-Language'] == 'hi'
+
+    @override_settings(FAQ_DUMP_CHUNK_SIZE=2)
+    def test_ndjson_dump_in_chunks(self, sample_faq, faq_without_translations, monkeypatch):
+        """Test that FAQs are read a chunk at a time and written one per line"""
+        FAQ.objects.create(question='Question', answer='<p>Answer</p>')
+        chunks = []
+        original = rendering.aget_rendered_many
+        monkeypatch.setattr(
+            rendering, 'aget_rendered_many', lambda ids, lang: chunks.append(ids) or original(ids, lang),
+        )
+
+        response = get('/api/faqs/dump/?ndjson=1')
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = async_to_sync(read_stream)(response).splitlines()
+        assert [json.loads(line)['id'] for line in lines][1:] == [faq_without_translations.pk, sample_faq.pk]
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+
+    def test_gzip_dump(self, sample_faq):
+        """Test that the async stream is compressed when the client accepts gzip"""
+        response = get('/api/faqs/dump/', headers={'Accept-Encoding': 'gzip'})
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(async_to_sync(read_stream)(response)))[0]['id'] == sample_faq.pk
+
+    def test_empty_dump(self):
+        """Test that no FAQs is still valid JSON"""
+        assert json.loads(async_to_sync(read_stream)(get('/api/faqs/dump/'))) == []
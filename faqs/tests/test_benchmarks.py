@@ -0,0 +1,118 @@
+# faqs/tests/test_benchmarks.py
+
+import pytest
+from django.db import OperationalError
+from faqs.benchmarks import (
+    SEARCH_SHAPES, compare, percentile, run_read_under_write, run_searches, scenario_paths, search_queries, seed_faqs,
+    summarize,
+)
+from faqs.languages import LANGUAGES
+from faqs.models import FAQ
+from faqs.search import search
+
+pytestmark = pytest.mark.django_db
+
+
+def result(**values):
+    return {'requests': 100, 'errors': 0, 'rps': 500.0, 'p50': 5.0, 'p95': 40.0, 'p99': 60.0, 'queries': 2.0, **values}
+
+
+class TestSummaries:
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile(values, 100) == 100
+        assert percentile([], 50) is None
+
+    def test_summarize(self):
+        results = [(0.001 * i, 200, 2) for i in range(1, 100)] + [(0.1, 500, 4)]
+
+        summary = summarize(results, elapsed=2)
+
+        assert summary['requests'] == 100
+        assert summary['errors'] == 1
+        assert summary['rps'] == 50
+        assert summary['p50'] == 50
+        assert summary['queries'] == 2.02
+
+
+class TestCompare:
+    def test_same_numbers_pass(self):
+        assert compare({'list/warm': result()}, {'list/warm': result()}) == []
+
+    def test_regressions_are_reported(self):
+        current = {'list/warm': result(p95=80.0, rps=300.0, queries=3.0)}
+
+        regressions = compare(current, {'list/warm': result()}, tolerance=0.2)
+
+        assert len(regressions) == 3
+        assert all(message.startswith('list/warm') for message in regressions)
+
+    def test_small_latency_drift_is_noise(self):
+        """Test that a few ms on a fast endpoint isn't a regression"""
+        assert compare({'detail/warm': result(p95=5.0)}, {'detail/warm': result(p95=1.0)}) == []
+
+    def test_scenarios_missing_from_the_run_are_skipped(self):
+        assert compare({}, {'search/cold': result()}) == []
+
+
+class TestSeeding:
+    def test_seed_tops_up_to_the_count(self):
+        assert seed_faqs(5) == 5
+        assert seed_faqs(8) == 3
+        assert seed_faqs(8) == 0
+        assert FAQ.objects.count() == 8
+
+    def test_seeded_faqs_are_translated_and_indexed(self):
+        seed_faqs(3)
+
+        faq = FAQ.objects.first()
+        assert faq.question_hi == f'[hi] {faq.question}'
+        assert faq.answer_bn.startswith('<p>[bn] ')
+        assert search(faq.question, 'hi')[0]['id'] == faq.pk
+
+    def test_scenarios_request_every_language(self):
+        seed_faqs(3)
+
+        paths = scenario_paths('detail')
+
+        assert len(paths) == 3 * len(LANGUAGES)
+        assert {path.rsplit('lang=', 1)[1] for path in paths} == set(LANGUAGES)
+
+
+class TestReadUnderWrite:
+    def test_reads_are_timed_while_writers_run(self):
+        writes = []
+
+        summary = run_read_under_write(20, readers=2, writers=1, read=lambda i: None, write=lambda: writes.append(1))
+
+        assert summary['requests'] == 20
+        assert summary['errors'] == 0
+        assert summary['writes'] > 0
+        assert summary['write_errors'] == 0
+
+    def test_locked_reads_and_writes_are_errors(self):
+        def locked(*args):
+            raise OperationalError('database is locked')
+
+        summary = run_read_under_write(5, readers=1, writers=1, read=locked, write=locked)
+
+        assert summary['errors'] == 5
+        assert summary['write_errors'] > 0
+
+
+class TestSearchTimings:
+    def test_queries_have_the_shape_asked_for(self):
+        assert [len(query.split()) for query in search_queries(3, count=4)] == [3, 3, 3, 3]
+        assert search_queries(SEARCH_SHAPES['common words']) == ['how do i my']
+
+    def test_searches_are_timed_in_every_language(self):
+        seed_faqs(3)
+
+        summary = run_searches(search_queries(2, count=2), repeat=2)
+
+        assert summary['requests'] == 2 * 2 * len(LANGUAGES)
+        assert summary['p95'] >= summary['p50'] > 0
+        assert summary['queries'] >= 3
@@ -0,0 +1,98 @@
+# faqs/tests/test_bulk.py
+
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from faqs.bulk import import_faqs, read_rows
+from faqs.models import FAQ, FAQChange, TranslationJob
+from faqs.search import search
+from faqs.tests.conftest import FakeBackend
+from faqs.translation_memory import TranslationMemoryStore
+from faqs.utils import TranslationService
+
+pytestmark = pytest.mark.django_db
+
+
+def jsonl(rows):
+    return io.StringIO(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+
+
+class TestImportFaqs:
+    def test_import_writes_in_batches(self, django_assert_max_num_queries):
+        """Test that the number of queries grows with the batches, not the rows"""
+        rows = [{'question': f'Question {i}', 'answer': f'<p>Answer {i}</p>'} for i in range(20)]
+
+        with django_assert_max_num_queries(25):
+            count = import_faqs(read_rows(jsonl(rows)), batch_size=10)
+
+        assert count == 20
+        assert FAQ.objects.count() == 20
+        assert FAQChange.objects.count() == 20
+        # Nothing was translated, so the workers get every language
+        assert TranslationJob.objects.count() == 40
+        assert search('question 7')[0]['question'] == 'Question 7'
+
+    def test_provided_translations_are_kept(self):
+        """Test that translations in the file are stored and not queued"""
+        import_faqs([{
+            'question': 'What is this?', 'answer': '<p>A test.</p>',
+            'question_hi': 'यह क्या है?', 'answer_hi': '<p>एक परीक्षण।</p>',
+        }])
+
+        faq = FAQ.objects.get()
+        assert faq.question_hi == 'यह क्या है?'
+        assert list(TranslationJob.objects.values_list('lang', flat=True)) == ['bn']
+
+    def test_translate_batches_the_translator_calls(self):
+        """Test that --translate style imports make a few calls for a whole batch"""
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        rows = [{'question': f'Question {i}', 'answer': f'<p>Answer {i}</p>'} for i in range(10)]
+
+        import_faqs(rows, translator=service)
+
+        assert len(backend.calls) <= 4
+        assert TranslationJob.objects.count() == 0
+        faq = FAQ.objects.get(question='Question 3')
+        assert faq.question_bn == 'bn:Question 3'
+        assert faq.answer_hi == '<p>hi:Answer 3</p>'
+
+    def test_cache_is_invalidated_once(self, monkeypatch):
+        """Test that the lists are invalidated once per import, not per row"""
+        bumps = []
+        monkeypatch.setattr('faqs.bulk.bump_version', bumps.append)
+        import_faqs([{'question': f'Q{i}', 'answer': '<p>A</p>'} for i in range(5)], batch_size=2)
+        assert bumps == ['faq_list']
+
+    def test_invalid_rows_are_reported(self, tmp_path):
+        """Test that a row without an answer stops the import with its number"""
+        path = tmp_path / 'faqs.jsonl'
+        path.write_text(jsonl([{'question': 'Q', 'answer': 'A'}, {'question': 'Q'}]).getvalue())
+
+        with pytest.raises(CommandError, match='Row 2'):
+            call_command('import_faqs', str(path), stdout=io.StringIO())
+
+
+class TestExportFaqs:
+    def test_round_trip(self, sample_faq, faq_without_translations, tmp_path):
+        """Test that an export can be imported back, in both formats"""
+        for name in ('faqs.jsonl', 'faqs.csv'):
+            path = tmp_path / name
+            call_command('export_faqs', str(path), chunk_size=1, stdout=io.StringIO())
+            FAQ.objects.all().delete()
+            call_command('import_faqs', str(path), stdout=io.StringIO())
+
+            assert FAQ.objects.count() == 2
+            faq = FAQ.objects.get(question=sample_faq.question)
+            assert faq.answer == sample_faq.answer
+            assert faq.answer_bn == sample_faq.answer_bn
+
+    def test_export_to_stdout(self, sample_faq):
+        """Test that JSONL is written one FAQ per line"""
+        out = io.StringIO()
+        call_command('export_faqs', stdout=out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])['question_hi'] == sample_faq.question_hi
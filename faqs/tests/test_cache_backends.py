@@ -0,0 +1,115 @@
+# faqs/tests/test_cache_backends.py
+
+import time
+import uuid
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+from faqs import cache_backends
+from faqs.cache_backends import LocalStore, RedisInvalidationBus, TwoTierCache
+
+REMOTE_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'remote': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'two-tier-tests'},
+}
+
+
+@pytest.fixture
+def two_processes():
+    """Two two-tier caches with their own local tier, sharing one remote cache and channel"""
+    channel = f'test-{uuid.uuid4().hex}'
+    options = {'CHANNEL': channel, 'BUS': 'faqs.cache_backends.LocalInvalidationBus', 'LOCAL_TIMEOUT': 60}
+    with override_settings(CACHES=REMOTE_CACHES):
+        caches['remote'].clear()
+        processes = []
+        for _ in range(2):
+            cache_backends._tiers.pop('remote', None)
+            backend = TwoTierCache('remote', {'OPTIONS': options})
+            backend.tier  # create this "process"'s local tier
+            processes.append(backend)
+        cache_backends._tiers.pop('remote', None)
+        yield processes
+
+
+class CountingRemote:
+    def __init__(self, remote):
+        self.remote = remote
+        self.gets = 0
+
+    def __getattr__(self, name):
+        return getattr(self.remote, name)
+
+    def get(self, *args, **kwargs):
+        self.gets += 1
+        return self.remote.get(*args, **kwargs)
+
+
+class TestTwoTierCache:
+    def test_hot_reads_stay_local(self, two_processes, monkeypatch):
+        """Test that a repeated read doesn't go to the remote cache"""
+        first, _ = two_processes
+        first.set('key', 'value')
+
+        counting = CountingRemote(caches['remote'])
+        monkeypatch.setattr(TwoTierCache, 'remote', property(lambda self: counting))
+        assert first.get('key') == 'value'
+        assert first.get('key') == 'value'
+        assert counting.gets == 0
+
+    def test_write_invalidates_other_processes(self, two_processes):
+        """Test that a write in one process evicts the local copy in the other"""
+        first, second = two_processes
+        first.set('key', 'old')
+        assert second.get('key') == 'old'
+
+        first.set('key', 'new')
+        assert second.get('key') == 'new'
+
+        first.add('counter', 1)
+        assert second.get('counter') == 1
+        first.incr('counter')
+        assert second.get('counter') == 2
+
+    def test_delete_and_clear_are_propagated(self, two_processes):
+        """Test that deletes and clears reach the other process"""
+        first, second = two_processes
+        first.set_many({'a': 1, 'b': 2})
+        assert second.get_many(['a', 'b']) == {'a': 1, 'b': 2}
+
+        first.delete('a')
+        assert second.get('a') is None
+
+        first.clear()
+        assert second.get('b') is None
+
+    def test_local_store_is_bounded(self):
+        """Test that the local tier evicts by size and by age"""
+        store = LocalStore(max_entries=2, timeout=0.05)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.set('c', 3)
+        assert len(store) == 2
+        assert store.get('a') is cache_backends._MISSING
+
+        time.sleep(0.06)
+        assert store.get('c') is cache_backends._MISSING
+
+
+class TestRedisInvalidationBus:
+    def test_messages_reach_subscribers(self):
+        """Test the pub/sub channel against an in-memory Redis"""
+        fakeredis = pytest.importorskip('fakeredis')
+        client = fakeredis.FakeRedis()
+        bus = RedisInvalidationBus(client, f'test-{uuid.uuid4().hex}')
+
+        received = []
+        bus.subscribe(received.append)
+        deadline = time.time() + 2
+        while not received and time.time() < deadline:
+            time.sleep(0.01)
+
+        bus.publish({'origin': 'other', 'keys': ['faq:1:key']})
+        while len(received) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert received == [{'clear': True}, {'origin': 'other', 'keys': ['faq:1:key']}]
@@ -0,0 +1,74 @@
+# faqs/tests/test_cache_fill.py
+
+import threading
+import time
+import pytest
+from django.core.cache import cache
+from faqs.cache_fill import get_or_compute, single_flight
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class Counter:
+    def __init__(self, value='fresh', delay=0):
+        self.calls = 0
+        self.value = value
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+class TestStampedeProtection:
+    def test_concurrent_misses_compute_once(self):
+        """Test that a burst of misses on one key runs the computation once"""
+        compute = Counter(delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute('page', compute, 60, 600)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert compute.calls == 1
+        assert results == ['fresh'] * 10
+
+    def test_miss_serves_stale_while_another_process_rebuilds(self):
+        """Test that a hard miss returns the stale copy when the rebuild lock is taken"""
+        get_or_compute('page_v1', Counter('old'), 60, 600, stale_key='page_stale')
+        cache.add('page_v2_lock', 1)
+
+        compute = Counter('new')
+        assert get_or_compute('page_v2', compute, 60, 600, stale_key='page_stale') == 'old'
+        assert compute.calls == 0
+
+    def test_soft_expired_value_is_refreshed_once(self):
+        """Test that past the soft TTL one caller refreshes and the others get the old value"""
+        get_or_compute('page', Counter('old'), 0, 600)
+
+        cache.add('page_lock', 1)
+        assert get_or_compute('page', Counter('new'), 60, 600) == 'old'
+        cache.delete('page_lock')
+
+        assert get_or_compute('page', Counter('new'), 60, 600) == 'new'
+        assert get_or_compute('page', Counter('newer'), 60, 600) == 'new'
+
+    def test_miss_waits_for_rebuild_without_stale_copy(self, settings):
+        """Test that without a stale copy the caller waits for the other rebuild"""
+        settings.FAQ_CACHE_LOCK_WAIT = 1
+        cache.add('detail_lock', 1)
+        threading.Timer(0.1, lambda: cache.set('detail', b'rendered')).start()
+
+        compute = Counter(b'mine')
+        assert single_flight('detail', compute, timeout=60) == b'rendered'
+        assert compute.calls == 0
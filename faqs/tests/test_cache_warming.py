@@ -0,0 +1,176 @@
+# faqs/tests/test_cache_warming.py
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from faqs import access_counts
+from faqs.access_counts import flush_access_counts, most_requested, record_access
+from faqs.cache_keys import detail_key, modified_key
+from faqs.cache_warming import Rewarmer, rewarm_on_clear, warm_cache, warm_faqs, warm_list_pages
+from faqs.languages import LANGUAGES
+from faqs.models import FAQ, FAQAccessCount
+from faqs.signals import faq_cache_cleared
+
+pytestmark = pytest.mark.django_db
+
+
+def make_faqs(count):
+    faqs = [FAQ.objects.create(question=f'Question {i}?', answer=f'<p>Answer {i}.</p>') for i in range(count)]
+    # save() writes the responses through, start from a cold cache
+    cache.clear()
+    return faqs
+
+
+def is_warm(faq):
+    keys = [detail_key(faq.id, lang) for lang in LANGUAGES] + [modified_key(faq.id)]
+    return len(cache.get_many(keys)) == len(keys)
+
+
+class TestAccessCounts:
+    def test_flush_adds_to_the_stored_counts(self):
+        first, second = make_faqs(2)
+        for faq_id in (first.id, first.id, second.id):
+            record_access(faq_id)
+
+        assert flush_access_counts() == 3
+        record_access(first.id)
+        assert flush_access_counts() == 1
+
+        assert dict(FAQAccessCount.objects.values_list('faq_id', 'count')) == {first.id: 3, second.id: 1}
+
+    def test_deleted_faqs_are_left_out(self):
+        faq, = make_faqs(1)
+        record_access(faq.id)
+        record_access(faq.id + 1000)
+
+        flush_access_counts()
+
+        assert list(FAQAccessCount.objects.values_list('faq_id', flat=True)) == [faq.id]
+
+    def test_a_flush_is_due_after_the_interval(self):
+        with override_settings(FAQ_ACCESS_FLUSH_INTERVAL=3600):
+            assert not record_access(1)
+        with override_settings(FAQ_ACCESS_FLUSH_INTERVAL=0):
+            assert record_access(1)
+
+    def test_served_faqs_are_counted(self, api_client):
+        faq, = make_faqs(1)
+
+        api_client.get(f'/api/faqs/{faq.id}/')
+        api_client.get(f'/api/faqs/{faq.id}/?lang=hi')
+        api_client.get('/api/faqs/999999/')
+
+        assert dict(access_counts._pending) == {faq.id: 2}
+
+    def test_most_requested_skips_inactive_faqs(self):
+        quiet, busy, hidden = make_faqs(3)
+        FAQAccessCount.objects.bulk_create([
+            FAQAccessCount(faq=quiet, count=1), FAQAccessCount(faq=busy, count=5), FAQAccessCount(faq=hidden, count=9),
+        ])
+        FAQ.objects.filter(pk=hidden.pk).update(is_active=False)
+
+        assert most_requested(10) == [busy.id, quiet.id]
+        assert most_requested(1) == [busy.id]
+
+
+class TestWarming:
+    def test_warm_faqs_renders_every_language(self, django_assert_num_queries):
+        faqs = make_faqs(3)
+
+        assert warm_faqs([faq.id for faq in faqs]) == 3
+        assert all(is_warm(faq) for faq in faqs)
+        with django_assert_num_queries(0):
+            assert warm_faqs([faq.id for faq in faqs]) == 0
+
+    def test_inactive_faqs_are_not_rendered(self):
+        faq, = make_faqs(1)
+        FAQ.objects.filter(pk=faq.pk).update(is_active=False)
+
+        assert warm_faqs([faq.id]) == 0
+        assert not is_warm(faq)
+
+    def test_warmed_list_pages_are_served_from_the_cache(self, api_client, django_assert_num_queries):
+        make_faqs(15)
+
+        for lang in LANGUAGES:
+            assert warm_list_pages(lang, pages=5) == 2
+
+        with django_assert_num_queries(0):
+            first = api_client.get('/api/faqs/?lang=hi').json()
+            api_client.get(first['next'])
+
+    @override_settings(ALLOWED_HOSTS=['localhost', 'faq.example.com'])
+    def test_warmed_list_links_use_the_requesting_host(self, api_client):
+        make_faqs(15)
+
+        warm_list_pages('en', pages=1)
+
+        response = api_client.get('/api/faqs/', HTTP_HOST='faq.example.com', secure=True)
+        assert response.json()['next'].startswith('https://faq.example.com/api/faqs/')
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWarmingThreads:
+    def test_warm_cache_uses_a_pool_of_threads(self):
+        faqs = make_faqs(5)
+
+        totals = warm_cache(workers=2, chunk_size=2)
+
+        assert totals == {'pages': len(LANGUAGES), 'faqs': 5, 'errors': 0}
+        assert all(is_warm(faq) for faq in faqs)
+
+    def test_command_warms_the_most_requested_faqs(self):
+        quiet, busy = make_faqs(2)
+        FAQAccessCount.objects.create(faq=busy, count=10)
+        out = StringIO()
+
+        call_command('warm_faq_cache', '--top', '1', '--pages', '0', '--workers', '2', stdout=out)
+
+        assert 'rendered 1 FAQ(s)' in out.getvalue()
+        assert is_warm(busy) and not is_warm(quiet)
+
+    def test_command_without_counts_warms_the_lists(self):
+        make_faqs(1)
+        out = StringIO()
+
+        call_command('warm_faq_cache', '--top', '5', stdout=out)
+
+        assert 'No access counts recorded yet' in out.getvalue()
+        assert f'Warmed {len(LANGUAGES)} list page(s) and rendered 0 FAQ(s)' in out.getvalue()
+
+    def test_rewarmer_warms_invalidated_faqs(self):
+        faq, = make_faqs(1)
+        rewarmer = Rewarmer()
+
+        rewarmer.schedule(faq.id).result()
+
+        assert is_warm(faq)
+
+
+class TestRewarmOnClear:
+    def test_clear_cache_sends_the_signal(self):
+        faq, = make_faqs(1)
+        received = []
+        faq_cache_cleared.connect(
+            lambda sender, faq_id, **kwargs: received.append(faq_id), weak=False, dispatch_uid='test',
+        )
+        try:
+            faq.clear_cache()
+        finally:
+            faq_cache_cleared.disconnect(dispatch_uid='test')
+
+        assert received == [faq.id]
+
+    def test_rewarm_waits_for_the_commit(self, monkeypatch, django_capture_on_commit_callbacks):
+        scheduled = []
+        monkeypatch.setattr('faqs.cache_warming.rewarmer.schedule', scheduled.append)
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            rewarm_on_clear(FAQ, faq_id=7)
+            assert scheduled == []
+
+        assert len(callbacks) == 1
+        assert scheduled == [7]
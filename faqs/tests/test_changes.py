@@ -0,0 +1,118 @@
+# faqs/tests/test_changes.py
+
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faqs.models import FAQ, FAQChange
+from faqs.translation_queue import process_pending_jobs
+
+pytestmark = pytest.mark.django_db
+
+
+def sync(api_client, since=0, lang='en'):
+    response = api_client.get(f"{reverse('faqs:faq-changes')}?since={since}&lang={lang}")
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestChangesFeed:
+    def test_initial_sync_returns_every_faq(self, api_client, sample_faq, faq_without_translations):
+        """Test that token 0 returns the current FAQs and a token to continue from"""
+        body = sync(api_client, lang='hi')
+
+        assert {faq['id'] for faq in body['changed']} == {sample_faq.pk, faq_without_translations.pk}
+        assert body['removed'] == []
+        assert body['has_more'] is False
+        assert body['token'] == FAQChange.objects.latest('pk').pk
+        assert sync(api_client, body['token'])['changed'] == []
+
+    def test_updates_and_deactivations_since_token(self, api_client, sample_faq, faq_without_translations):
+        """Test that only what changed after the token is returned, collapsed per FAQ"""
+        token = sync(api_client)['token']
+
+        sample_faq.question = "Changed question"
+        sample_faq.save()
+        sample_faq.answer = "<p>Changed answer</p>"
+        sample_faq.save()
+        faq_without_translations.is_active = False
+        faq_without_translations.save()
+
+        body = sync(api_client, token)
+        assert [faq['question'] for faq in body['changed']] == ["Changed question"]
+        assert body['removed'] == [faq_without_translations.pk]
+
+    def test_deleted_faqs_are_removed(self, api_client, sample_faq):
+        """Test that a deleted FAQ shows up as removed"""
+        token = sync(api_client)['token']
+        faq_id = sample_faq.pk
+        sample_faq.delete()
+
+        assert sync(api_client, token)['removed'] == [faq_id]
+
+    def test_queryset_deletes_are_removed(self, api_client, sample_faq, faq_without_translations):
+        """Test that a bulk delete, like the admin's "Delete selected", is logged and uncached"""
+        detail = reverse('faqs:faq-detail', kwargs={'pk': sample_faq.pk})
+        assert api_client.get(detail).status_code == 200
+        token = sync(api_client)['token']
+        faq_ids = [sample_faq.pk, faq_without_translations.pk]
+
+        FAQ.objects.filter(pk__in=faq_ids).delete()
+
+        assert sorted(sync(api_client, token)['removed']) == sorted(faq_ids)
+        assert api_client.get(detail).status_code == 404
+
+    def test_translation_changes_only_reach_their_language(self, api_client, faq_without_translations, fake_translator):
+        """Test that a worker translating into Hindi doesn't make English clients refetch"""
+        token = sync(api_client)['token']
+        process_pending_jobs(translator=fake_translator)
+
+        assert sync(api_client, token, 'en')['changed'] == []
+        changed = sync(api_client, token, 'hi')['changed']
+        assert changed[0]['question'] == '[hi] Question without translation'
+
+    @override_settings(FAQ_CHANGES_PAGE_SIZE=2)
+    def test_feed_is_paged(self, api_client):
+        """Test that a long feed is read in pages by following the token"""
+        faqs = [FAQ.objects.create(question=f'Question {i}', answer='<p>Answer</p>') for i in range(5)]
+
+        seen, token, has_more = [], 0, True
+        while has_more:
+            body = sync(api_client, token)
+            seen.extend(faq['id'] for faq in body['changed'])
+            token, has_more = body['token'], body['has_more']
+
+        assert sorted(seen) == sorted(faq.pk for faq in faqs)
+
+    @override_settings(FAQ_CHANGES_SETTLE_SECONDS=60)
+    def test_recent_changes_are_held_back(self, api_client, sample_faq):
+        """Test that changes stay out of the feed until they are older than the settle time"""
+        FAQChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        token = sync(api_client)['token']
+
+        sample_faq.question = 'Changed question'
+        sample_faq.save()
+        body = sync(api_client, token)
+        assert body == {'token': token, 'has_more': False, 'changed': [], 'removed': []}
+
+        FAQChange.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        assert [faq['question'] for faq in sync(api_client, token)['changed']] == ['Changed question']
+
+    @override_settings(FAQ_CHANGES_SETTLE_SECONDS=60)
+    def test_token_stops_before_the_oldest_unsettled_change(self, api_client, sample_faq, faq_without_translations):
+        """Test that a settled change doesn't move the token past a lower id still settling"""
+        settling = FAQChange.record(sample_faq)
+        settled = FAQChange.record(faq_without_translations)
+        FAQChange.objects.exclude(pk=settling.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+
+        body = sync(api_client)
+        assert body['token'] == settling.pk - 1
+        assert settled.pk > body['token']
+
+    def test_invalid_token(self, api_client):
+        """Test that a malformed token is rejected"""
+        url = reverse('faqs:faq-changes')
+        assert api_client.get(f"{url}?since=abc").status_code == 400
+        assert api_client.get(f"{url}?since=-1").status_code == 400
@@ -0,0 +1,45 @@
+# faqs/tests/test_db.py
+
+import sqlite3
+import pytest
+from django.db import connection
+from django.test import override_settings
+from faqs.db import apply_sqlite_pragmas
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeConnection:
+    def __init__(self, raw, vendor='sqlite'):
+        self.connection = raw
+        self.vendor = vendor
+
+
+class TestSqlitePragmas:
+    def test_new_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone()[0] == 5000
+            cursor.execute('PRAGMA cache_size')
+            assert cursor.fetchone()[0] == -20000
+
+    def test_file_databases_switch_to_wal(self, tmp_path):
+        raw = sqlite3.connect(tmp_path / 'faqs.sqlite3')
+
+        apply_sqlite_pragmas(None, FakeConnection(raw))
+
+        assert raw.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert raw.execute('PRAGMA synchronous').fetchone()[0] == 1
+        raw.close()
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_tuning_can_be_turned_off(self, tmp_path):
+        raw = sqlite3.connect(tmp_path / 'faqs.sqlite3')
+
+        apply_sqlite_pragmas(None, FakeConnection(raw))
+
+        assert raw.execute('PRAGMA journal_mode').fetchone()[0] == 'delete'
+        raw.close()
+
+    def test_other_databases_are_left_alone(self):
+        apply_sqlite_pragmas(None, FakeConnection(None, vendor='postgresql'))
@@ -0,0 +1,105 @@
+# faqs/tests/test_html_segments.py
+
+import pytest
+from faqs.html_segments import rebuild_html, segment_html
+from faqs.translation_memory import TranslationMemoryStore
+from faqs.utils import TranslationService
+from faqs.tests.conftest import FakeBackend
+
+pytestmark = pytest.mark.django_db
+
+
+class TestHTMLSegments:
+    def test_round_trip_preserves_markup(self):
+        """Test that rebuilding with the original segments gives back the input"""
+        content = '<p class="intro">Hello &amp; <b>welcome</b></p>\n<ul><li>One</li><li> Two </li></ul><br/>'
+        tokens, segments = segment_html(content)
+
+        assert segments == ['Hello & <g1>welcome</g1>', 'One', 'Two']
+        assert rebuild_html(tokens, segments) == content
+
+    def test_a_block_is_one_segment(self):
+        """Test that a sentence split by inline tags reaches the translator whole"""
+        content = '<p>Click <a href="/reset">here</a> to <b>reset <i>your</i></b> password.<br>Thanks!</p><p>Next</p>'
+        tokens, segments = segment_html(content)
+
+        assert segments == ['Click <g1>here</g1> to <g2>reset <g3>your</g3></g2> password.<x4/>Thanks!', 'Next']
+        assert rebuild_html(tokens, segments) == content
+
+    def test_translations_can_move_the_inline_tags(self):
+        """Test that placeholders are put back wherever the translator moved them"""
+        tokens, segments = segment_html('<p>Open <a href="/help">the help page</a> now</p>')
+
+        translated = rebuild_html(tokens, ['अभी < g1 >सहायता पृष्ठ</ g1> खोलें'])
+
+        assert translated == '<p>अभी <a href="/help">सहायता पृष्ठ</a> खोलें</p>'
+
+    def test_dropped_and_unknown_placeholders_keep_the_html_well_formed(self):
+        """Test that a translation losing or inventing placeholders still rebuilds valid markup"""
+        tokens, segments = segment_html('<p>One <b>two</b> three<br>four</p>')
+
+        assert rebuild_html(tokens, ['<g1>एक <g9>दो तीन चार']) == '<p><b>एक दो तीन चार</b><br></p>'
+
+    def test_blocks_split_at_every_block_tag(self):
+        """Test that list items, headings and unknown tags each end a segment"""
+        tokens, segments = segment_html(
+            '<h2>Title</h2>Loose text<ul><li>One <em>a</em></li><li>Two</li></ul><custom>Tail</custom>'
+        )
+
+        assert segments == ['Title', 'Loose text', 'One <g1>a</g1>', 'Two', 'Tail']
+
+    def test_code_and_script_are_not_segmented(self):
+        """Test that code blocks and scripts are left alone"""
+        tokens, segments = segment_html('<p>Run</p><pre>pip install</pre><script>var a = "<b>";</script>')
+
+        assert segments == ['Run']
+        assert rebuild_html(tokens, ['Chalao']) == '<p>Chalao</p><pre>pip install</pre><script>var a = "<b>";</script>'
+
+    def test_inline_code_is_one_placeholder(self):
+        """Test that a code span inside a sentence is kept whole and untranslated"""
+        tokens, segments = segment_html('<p>Run <code>pip <b>install</b></code> first</p>')
+
+        assert segments == ['Run <x1/> first']
+        assert rebuild_html(tokens, ['पहले <x1/> चलाएँ']) == '<p>पहले <code>pip <b>install</b></code> चलाएँ</p>'
+
+    def test_translated_text_is_escaped(self):
+        """Test that translations can't inject markup"""
+        tokens, segments = segment_html('<p>Hi</p>')
+        assert rebuild_html(tokens, ['<b>x</b>']) == '<p>&lt;b&gt;x&lt;/b&gt;</p>'
+
+
+class TestSegmentedHTMLTranslation:
+    def test_translate_html_keeps_tags(self):
+        """Test that a paragraph is translated in one piece with its links kept"""
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        translated = service.translate_html('<p>Hello <a href="/help">help</a></p>', 'hi')
+
+        assert backend.calls == [('Hello <g1>help</g1>', 'hi')]
+        assert translated == '<p>hi:Hello <a href="/help">help</a></p>'
+
+    def test_editing_one_paragraph_translates_one_segment(self):
+        """Test that unchanged paragraphs come from the translation memory"""
+        memory = TranslationMemoryStore()
+        original = '<p>First paragraph.</p><p>Second paragraph.</p><p>Third paragraph.</p>'
+        TranslationService(translator=FakeBackend(), memory=memory).translate_html(original, 'hi')
+
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=memory)
+        edited = original.replace('Second', 'Edited second')
+        translated = service.translate_html(edited, 'hi')
+
+        assert backend.calls == [('Edited second paragraph.', 'hi')]
+        assert translated == (
+            '<p>hi:First paragraph.</p><p>hi:Edited second paragraph.</p><p>hi:Third paragraph.</p>'
+        )
+
+    def test_html_batch(self):
+        """Test translating several documents in one go"""
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        result = service.translate_html_batch(['<p>One</p>', None, '<p>Two</p>'], ['hi', 'bn'])
+
+        assert result['hi'] == ['<p>hi:One</p>', None, '<p>hi:Two</p>']
+        assert result['bn'] == ['<p>bn:One</p>', None, '<p>bn:Two</p>']
+        assert len(backend.calls) == 2
@@ -0,0 +1,77 @@
+# faqs/tests/test_languages.py
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from faqs import languages
+from faqs.cache_keys import LIST_NAMESPACE, get_version, list_key
+from faqs.languages import fallback_chain, match_language, negotiate_language, parse_accept_language
+
+pytestmark = pytest.mark.django_db
+
+
+class TestResolver:
+    def test_fallback_chain_drops_subtags(self):
+        assert fallback_chain('bn-IN') == ['bn-in', 'bn']
+        assert fallback_chain('zh_Hant_TW') == ['zh-hant-tw', 'zh-hant', 'zh']
+
+    def test_configured_fallbacks_come_before_the_base_language(self, monkeypatch):
+        monkeypatch.setattr(languages, 'LANGUAGE_FALLBACKS', {'as-in': ('bn',)})
+        assert fallback_chain('as-IN') == ['as-in', 'bn', 'as']
+
+    def test_match_language(self):
+        assert match_language('bn-IN') == 'bn'
+        assert match_language('HI') == 'hi'
+        assert match_language('en-US') == 'en'
+        assert match_language('fr') is None
+        assert match_language('<script>') is None
+
+    def test_accept_language_is_ordered_by_quality(self):
+        assert parse_accept_language('fr;q=0.4, bn-IN, hi;q=0.8, de;q=0') == ('bn-IN', 'hi', 'fr')
+        assert parse_accept_language('en;q=abc, hi') == ('hi',)
+
+    def test_negotiation_skips_unserved_languages(self):
+        assert negotiate_language('fr-FR, fr;q=0.9, hi;q=0.8, en;q=0.5') == 'hi'
+        assert negotiate_language('bn-BD,en;q=0.7') == 'bn'
+        assert negotiate_language('de, fr') == 'en'
+        assert negotiate_language('*') == 'en'
+
+    def test_parsed_headers_are_memoized(self):
+        negotiate_language.cache_clear()
+        for _ in range(3):
+            negotiate_language('hi-IN,hi;q=0.9,en;q=0.8')
+        assert negotiate_language.cache_info().hits == 2
+
+
+class TestNegotiatedViews:
+    def test_accept_language_selects_the_translation(self, api_client, sample_faq):
+        response = api_client.get(f'/api/faqs/{sample_faq.pk}/', HTTP_ACCEPT_LANGUAGE='bn-IN,bn;q=0.9,en;q=0.8')
+
+        assert response.json()['question'] == sample_faq.question_bn
+        assert response['Content-Language'] == 'bn'
+        assert 'Accept-Language' in response['Vary']
+
+    def test_lang_parameter_wins_over_the_header(self, api_client, sample_faq):
+        response = api_client.get(f'/api/faqs/{sample_faq.pk}/?lang=hi', HTTP_ACCEPT_LANGUAGE='bn')
+
+        assert response.json()['question'] == sample_faq.question_hi
+
+    def test_unknown_languages_share_the_english_cache_entries(self, api_client, sample_faq):
+        """Test that arbitrary ?lang= values can't fan out cache entries"""
+        cache.clear()
+        english = api_client.get('/api/faqs/?lang=en')
+        unknown = api_client.get('/api/faqs/?lang=xx-made-up')
+
+        assert unknown['ETag'] == english['ETag']
+        assert unknown['Content-Language'] == 'en'
+        version = get_version(LIST_NAMESPACE)
+        assert cache.get(list_key('xx-made-up', 10, '', version)) is None
+
+    @pytest.mark.urls('config.asgi_urls')
+    def test_async_views_negotiate_too(self, sample_faq):
+        response = async_to_sync(AsyncClient().get)(f'/api/faqs/{sample_faq.pk}/', headers={'Accept-Language': 'hi-IN'})
+
+        assert response.json()['question'] == sample_faq.question_hi
+        assert response['Content-Language'] == 'hi'
+        assert 'Accept-Language' in response['Vary']
@@ -0,0 +1,106 @@
+# faqs/tests/test_metrics.py
+
+import re
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient, override_settings
+from faqs import metrics
+from faqs.tests.conftest import FakeBackend
+from faqs.utils import TranslationService
+
+pytestmark = pytest.mark.django_db
+
+
+def server_timing(response):
+    """Server-Timing entries of a response as {name: {param: value}}"""
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        entries[name] = dict(param.split('=', 1) for param in params)
+    return entries
+
+
+class TestServerTiming:
+    def test_miss_reports_database_cache_and_serialization(self, api_client, sample_faq):
+        cache.clear()
+
+        timings = server_timing(api_client.get(f'/api/faqs/{sample_faq.pk}/?lang=hi'))
+
+        assert int(timings['db']['desc'].split()[0].strip('"')) > 0
+        assert 'misses' in timings['cache']['desc']
+        assert timings['serialize']['desc'] == '"1 calls"'
+        assert float(timings['total']['dur']) > 0
+
+    def test_hit_reports_cache_only(self, api_client, sample_faq):
+        api_client.get(f'/api/faqs/{sample_faq.pk}/')
+
+        timings = server_timing(api_client.get(f'/api/faqs/{sample_faq.pk}/'))
+
+        assert set(timings) == {'cache', 'total'}
+        assert re.match(r'"\d+ hits / 0 misses"', timings['cache']['desc'])
+
+    @pytest.mark.urls('config.asgi_urls')
+    def test_async_views_are_timed(self, sample_faq):
+        response = async_to_sync(AsyncClient().get)(f'/api/faqs/{sample_faq.pk}/')
+
+        assert 'cache' in server_timing(response)
+
+    @override_settings(FAQ_SERVER_TIMING=False)
+    def test_header_can_be_turned_off(self, api_client, sample_faq):
+        assert 'Server-Timing' not in api_client.get(f'/api/faqs/{sample_faq.pk}/')
+
+
+class TestMetrics:
+    def test_requests_and_operations_are_aggregated(self, api_client, sample_faq):
+        before = metrics.REQUEST_SECONDS.count('faqs:faq-detail', 'GET')
+        hits = metrics.CACHE_LOOKUPS.value('hit')
+
+        api_client.get(f'/api/faqs/{sample_faq.pk}/')
+
+        assert metrics.REQUEST_SECONDS.count('faqs:faq-detail', 'GET') == before + 1
+        assert metrics.CACHE_LOOKUPS.value('hit') > hits
+
+    def test_translator_calls_are_timed(self):
+        before = metrics.OPERATION_SECONDS.count('translation')
+
+        TranslationService(translator=FakeBackend()).translate_html('<p>One</p><p>Two</p>', 'hi')
+
+        assert metrics.OPERATION_SECONDS.count('translation') > before
+
+    @override_settings(FAQ_METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_metrics_endpoint(self, api_client, sample_faq):
+        api_client.get(f'/api/faqs/{sample_faq.pk}/')
+
+        response = api_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        body = response.content.decode()
+        assert '# TYPE faq_request_duration_seconds histogram' in body
+        assert 'faq_request_duration_seconds_count{view="faqs:faq-detail",method="GET"}' in body
+        assert 'faq_operation_duration_seconds_bucket{kind="db",le="+Inf"}' in body
+        assert 'faq_cache_lookups_total{result="hit"}' in body
+
+    def test_metrics_are_off_by_default(self, api_client):
+        assert api_client.get('/metrics').status_code == 404
+
+    @override_settings(FAQ_METRICS_ALLOWED_IPS=['10.0.0.5'], FAQ_METRICS_TOKEN='s3cret')
+    def test_only_allowed_scrapers_get_the_metrics(self, api_client):
+        assert api_client.get('/metrics').status_code == 403
+        assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+
+        assert api_client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code == 200
+        assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code == 200
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_seconds', 'Test', ('kind',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, 'a')
+
+        lines = histogram.render()
+
+        assert 'test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{kind="a",le="1.0"} 3' in lines
+        assert 'test_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+        assert 'test_seconds_count{kind="a"} 4' in lines
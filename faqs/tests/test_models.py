@@ -2,7 +2,9 @@
 
 import pytest
 from django.core.cache import cache
-from faqs.models import FAQ
+from faqs.cache_keys import translation_key
+from faqs.models import FAQ, FAQTranslation, TranslationJob
+from faqs.translation_queue import process_pending_jobs
 from django.test import override_settings
 
 pytestmark = pytest.mark.django_db
@@ -13,17 +15,64 @@ class TestFAQModel:
         assert isinstance(sample_faq, FAQ)
         assert str(sample_faq) == "What is this service?"
 
-    def test_automatic_translation_on_create(self):
-        """Test that translations are automatically generated on creation"""
+    def test_automatic_translation_on_create(self, fake_translator):
+        """Test that translations are queued on creation and filled in by the workers"""
         faq = FAQ.objects.create(
             question="Hello, how are you?",
             answer="<p>I am fine, thank you.</p>"
         )
+        # Saving must not wait for the translator
+        assert faq.question_hi is None
+        assert faq.translation_status('hi') == TranslationJob.STATUS_PENDING
+        assert faq.translation_status('bn') == TranslationJob.STATUS_PENDING
+
+        process_pending_jobs(translator=fake_translator)
+
         # Check if translations were generated
+        faq.refresh_from_db()
         assert faq.question_hi is not None
         assert faq.question_bn is not None
         assert faq.answer_hi is not None
         assert faq.answer_bn is not None
+        assert faq.translation_status('hi') == TranslationJob.STATUS_DONE
+
+    def test_provided_translations_are_not_queued(self, sample_faq):
+        """Test that languages entered by hand are not sent to the translator"""
+        assert sample_faq.translation_status('hi') == TranslationJob.STATUS_DONE
+        assert sample_faq.translation_status('bn') == TranslationJob.STATUS_DONE
+
+    def test_update_retranslates_only_changed_fields(self, sample_faq, fake_translator):
+        """Test that editing the English question only re-translates the question"""
+        faq = FAQ.objects.get(pk=sample_faq.pk)
+        faq.question = "What does this service do?"
+        faq.save()
+
+        assert faq.translation_status('hi') == TranslationJob.STATUS_PENDING
+        process_pending_jobs(translator=fake_translator)
+
+        faq.refresh_from_db()
+        assert faq.question_hi == "[hi] What does this service do?"
+        assert faq.answer_hi == sample_faq.answer_hi
+        assert faq.translation_status('hi') == TranslationJob.STATUS_DONE
+        assert {text for text, lang in fake_translator.calls} == {"What does this service do?"}
+
+    def test_unchanged_save_does_not_queue(self, sample_faq):
+        """Test that saving without touching the English text queues nothing"""
+        faq = FAQ.objects.get(pk=sample_faq.pk)
+        faq.is_active = False
+        faq.save()
+
+        assert not TranslationJob.objects.filter(status=TranslationJob.STATUS_PENDING).exists()
+
+    def test_manual_translation_edit_is_kept(self, sample_faq):
+        """Test that an editor's own translation is not overwritten"""
+        faq = FAQ.objects.get(pk=sample_faq.pk)
+        faq.question = "What does this service do?"
+        faq.question_hi = "यह सेवा क्या करती है?"
+        faq.save()
+
+        assert faq.translation_status('hi') == TranslationJob.STATUS_DONE
+        assert faq.translation_status('bn') == TranslationJob.STATUS_PENDING
 
     def test_fallback_to_english(self, faq_without_translations):
         """Test fallback to English when translation is in unkown language"""
@@ -43,7 +92,7 @@ class TestFAQModel:
 
         # First call should cache the result
         original_question = sample_faq.get_question('hi')
-        cache_key = f'faq_{sample_faq.id}_question_hi'
+        cache_key = translation_key(sample_faq.id, 'question', 'hi')
 
         # Verify cache was set
         assert cache.get(cache_key) == original_question
@@ -64,9 +113,50 @@ class TestFAQModel:
         sample_faq.get_question('hi')
         sample_faq.get_question('bn')
 
+        old_key = translation_key(sample_faq.id, 'question', 'hi')
+
         # Clear cache
         sample_faq.clear_cache()
 
         # Verify cache was cleared
-        cache_key = f'faq_{sample_faq.id}_question_hi'
-        assert cache.get(cache_key) is None
\ No newline at end of file
+        cache_key = translation_key(sample_faq.id, 'question', 'hi')
+        assert cache_key != old_key
+        assert cache.get(cache_key) is None
+
+    def test_clear_cache_is_constant_round_trips(self, sample_faq, monkeypatch):
+        """Test that invalidation is one counter bump for the FAQ and one for the lists"""
+        calls = []
+        monkeypatch.setattr(cache, 'incr', lambda key, delta=1: calls.append(key) or 1)
+        monkeypatch.setattr(cache, 'delete', lambda key: calls.append(key))
+
+        sample_faq.clear_cache()
+
+        assert calls == [f'faq_{sample_faq.id}_version', 'faq_list_version']
+
+    def test_clear_cache_on_unsaved_faq_is_noop(self):
+        """Test that clearing an unsaved FAQ doesn't touch faq_None_* keys"""
+        faq = FAQ(question='Unsaved', answer='<p>Unsaved</p>')
+        faq.clear_cache()
+        assert cache.get('faq_None_version') is None
+
+
+class TestFAQTranslation:
+    def test_translations_are_stored_as_rows(self, sample_faq):
+        """Test that each language is one FAQTranslation row"""
+        rows = {row.lang: row for row in FAQTranslation.objects.filter(faq=sample_faq)}
+        assert set(rows) == {'hi', 'bn'}
+        assert rows['hi'].question == sample_faq.question_hi
+        assert rows['bn'].answer == sample_faq.answer_bn
+
+    def test_with_translations_prefetches_one_language(self, sample_faq, django_assert_num_queries):
+        """Test that a language filtered queryset only loads that language's rows"""
+        with django_assert_num_queries(2):
+            faq = FAQ.objects.with_translations('hi').get(pk=sample_faq.pk)
+            assert [row.lang for row in faq.translations.all()] == ['hi']
+            assert faq.get_question('hi') == sample_faq.question_hi
+
+    def test_with_translations_for_english_skips_rows(self, sample_faq, django_assert_num_queries):
+        """Test that English reads don't touch the translation table"""
+        with django_assert_num_queries(1):
+            faq = FAQ.objects.with_translations('en').get(pk=sample_faq.pk)
+            assert faq.get_question('en') == sample_faq.question
@@ -0,0 +1,69 @@
+# faqs/tests/test_query_plans.py
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from faqs.models import FAQ, FAQChange
+from faqs.tests.query_plans import assert_no_full_scan_sorts, explain, is_full_scan_sort
+
+pytestmark = pytest.mark.django_db
+
+# Enough rows for the planner to prefer an index wherever it has one
+ROWS = 100_000
+
+
+@pytest.fixture(scope='class')
+def many_faqs(django_db_setup, django_db_blocker):
+    """Seeded once for the whole class, in a transaction rolled back after its last test"""
+    with django_db_blocker.unblock(), transaction.atomic():
+        FAQ.objects.bulk_create(
+            (FAQ(question=f'Question {i}?', answer=f'<p>Answer {i}.</p>', is_active=i % 10 != 0) for i in range(ROWS)),
+            batch_size=5000,
+        )
+        # bulk_create skips save(), so log changes for a slice of them by hand
+        FAQChange.objects.bulk_create(
+            FAQChange(faq_id=pk, action=FAQChange.ACTION_UPDATED)
+            for pk in FAQ.objects.order_by('-pk').values_list('pk', flat=True)[:1000]
+        )
+        yield
+        transaction.set_rollback(True)
+
+
+def plan_of(queryset):
+    sql, params = queryset.query.sql_with_params()
+    return explain(sql, params)
+
+
+class TestQueryPlans:
+    def test_the_helper_catches_a_full_scan_sort(self, many_faqs):
+        assert is_full_scan_sort(plan_of(FAQ.objects.order_by('question')))
+
+        with pytest.raises(AssertionError, match='Full table scan and sort'):
+            with assert_no_full_scan_sorts():
+                list(FAQ.objects.order_by('question')[:10])
+
+    def test_api_reads_use_indexes(self, many_faqs, api_client):
+        # Cold, so every read reaches the database
+        cache.clear()
+        with assert_no_full_scan_sorts() as context:
+            first = api_client.get('/api/faqs/?lang=hi').json()
+            api_client.get(first['next'])
+            api_client.get(f"/api/faqs/{first['results'][0]['id']}/?lang=bn")
+            api_client.get('/api/faqs/changes/?since=0')
+            api_client.get('/api/faqs/search/?q=question')
+        assert context.captured_queries
+
+    def test_keyset_reads_use_the_active_index(self, many_faqs):
+        active = FAQ.objects.filter(is_active=True).order_by('-created_at', '-id')
+        assert 'faqs_faq_active_created_idx' in ' '.join(plan_of(active[:11]))
+        assert not is_full_scan_sort(plan_of(active.values_list('id', flat=True)))
+
+    def test_admin_changelist_uses_indexes(self, many_faqs, admin_client):
+        # Default order, the is_active and date filters and every sortable date column
+        queries = [
+            '', '?is_active__exact=1', '?is_active__exact=0', '?o=4', '?o=-4', '?o=5', '?o=-5',
+            '?created_at__gte=2020-01-01+00:00:00%2B00:00', '?updated_at__gte=2020-01-01+00:00:00%2B00:00&o=-5',
+        ]
+        with assert_no_full_scan_sorts():
+            for query in queries:
+                assert admin_client.get(f'/admin/faqs/faq/{query}').status_code == 200
@@ -0,0 +1,186 @@
+# faqs/tests/test_search.py
+
+import math
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faqs.bulk import import_faqs
+from faqs.models import FAQ, SearchTerm, SearchTermFrequency
+from faqs.search import make_snippet, search, tokenize
+from faqs.translation_queue import process_pending_jobs
+
+pytestmark = pytest.mark.django_db
+
+
+def recounted_frequencies():
+    """The document frequencies counted from the postings"""
+    counts = Counter()
+    documents = set()
+    for faq_id, lang, term in SearchTerm.objects.values_list('faq_id', 'lang', 'term'):
+        counts[lang, term] += 1
+        documents.add((faq_id, lang))
+    counts.update((lang, '') for _, lang in documents)
+    return dict(counts)
+
+
+def stored_frequencies():
+    rows = SearchTermFrequency.objects.values_list('lang', 'term', 'documents')
+    return {(lang, term): n for lang, term, n in rows if n}
+
+
+class TestTokenize:
+    def test_devanagari_words_are_not_split_at_vowel_signs(self):
+        """Test that matras and viramas stay part of the word"""
+        assert tokenize('यह सेवा क्या है?') == ['यह', 'सेवा', 'क्या', 'है']
+
+    def test_bengali_and_danda(self):
+        """Test Bengali words, with the danda treated as punctuation"""
+        assert tokenize('এটি একটি পরীক্ষা।') == ['এটি', 'একটি', 'পরীক্ষা']
+
+    def test_case_and_joiners_are_normalized(self):
+        """Test that case and zero width joiners don't change a term"""
+        assert tokenize('Hello WORLD') == ['hello', 'world']
+        assert tokenize('क्‍ष') == tokenize('क्ष')
+
+
+class TestSearch:
+    def test_index_is_maintained_on_save(self, sample_faq):
+        """Test that saving indexes every language and deactivating drops the FAQ"""
+        assert set(SearchTerm.objects.filter(faq=sample_faq).values_list('lang', flat=True)) == {'en', 'hi', 'bn'}
+        assert search('service')[0]['id'] == sample_faq.pk
+
+        sample_faq.is_active = False
+        sample_faq.save()
+        assert search('service') == []
+
+    def test_search_in_each_language(self, sample_faq, faq_without_translations):
+        """Test that each language is searched in the text served in it"""
+        assert [result['id'] for result in search('सेवा', 'hi')] == [sample_faq.pk]
+        assert [result['id'] for result in search('পরীক্ষা', 'bn')] == [sample_faq.pk]
+        # Untranslated FAQs are found through their English fallback
+        assert [result['id'] for result in search('translation', 'hi')] == [faq_without_translations.pk]
+
+    def test_results_are_ranked(self):
+        """Test that question matches and rarer terms rank higher"""
+        in_answer = FAQ.objects.create(question='Shipping times', answer='<p>Refunds take a week.</p>')
+        in_question = FAQ.objects.create(question='How do refunds work?', answer='<p>Ask support.</p>')
+        FAQ.objects.create(question='How do I log in?', answer='<p>Use your email.</p>')
+
+        results = search('refunds')
+        assert [result['id'] for result in results] == [in_question.pk, in_answer.pk]
+        assert results[0]['score'] > results[1]['score']
+
+        # Matching both terms beats matching the common one only
+        assert len(search('how refunds')) == 3
+        assert search('how refunds')[0]['id'] == in_question.pk
+
+    def test_translations_are_indexed_by_the_workers(self, faq_without_translations, fake_translator):
+        """Test that a worker's translation replaces the English fallback in the index"""
+        process_pending_jobs(translator=fake_translator)
+        assert search('question', 'hi')[0]['question'] == '[hi] Question without translation'
+
+    def test_snippet_is_centered_on_the_match(self):
+        """Test that long answers are cut around the first match"""
+        text = ' '.join(['filler'] * 50 + ['needle'] + ['filler'] * 50)
+        snippet = make_snippet(text, {'needle'}, length=60)
+        assert 'needle' in snippet
+        assert snippet.startswith('…') and snippet.endswith('…')
+        assert len(snippet) <= 62
+
+    def test_rebuild_command(self, sample_faq, faq_without_translations):
+        """Test that the index can be rebuilt from scratch"""
+        expected = set(SearchTerm.objects.values_list('faq_id', 'lang', 'term', 'weight'))
+        SearchTerm.objects.all().delete()
+
+        call_command('rebuild_search_index', batch_size=1)
+        assert set(SearchTerm.objects.values_list('faq_id', 'lang', 'term', 'weight')) == expected
+
+
+class TestFrequencies:
+    def test_saves_and_deletes_keep_the_frequencies_in_step(self, sample_faq, faq_without_translations):
+        """Test that the stored frequencies match the postings after every kind of change"""
+        assert stored_frequencies() == recounted_frequencies()
+        assert stored_frequencies()[('en', '')] == 2
+
+        sample_faq.question = 'What is a different service?'
+        sample_faq.save()
+        assert stored_frequencies() == recounted_frequencies()
+
+        faq_without_translations.is_active = False
+        faq_without_translations.save()
+        assert stored_frequencies() == recounted_frequencies()
+        assert stored_frequencies()[('en', '')] == 1
+
+        import_faqs([{'question': f'Imported {i}?', 'answer': '<p>Imported service.</p>'} for i in range(3)])
+        assert stored_frequencies() == recounted_frequencies()
+        assert stored_frequencies()[('en', 'service')] == 4
+
+        FAQ.objects.filter(question__startswith='Imported').delete()
+        sample_faq.delete()
+        assert stored_frequencies() == recounted_frequencies() == {}
+
+    def test_inactive_faqs_are_not_counted(self):
+        """Test that the IDF only counts the FAQs in the index"""
+        FAQ.objects.create(question='Refunds?', answer='<p>Yes.</p>')
+        FAQ.objects.create(question='Hidden', answer='<p>Refunds.</p>', is_active=False)
+
+        assert stored_frequencies()[('en', '')] == 1
+        # log(1 + 1 / 1), the hidden FAQ would make it log(1 + 2 / 1)
+        assert search('refunds')[0]['score'] == round(3 * math.log(2), 4)
+
+    def test_rebuild_recounts(self, sample_faq, faq_without_translations):
+        SearchTermFrequency.objects.update(documents=0)
+
+        call_command('rebuild_search_index')
+
+        assert stored_frequencies() == recounted_frequencies()
+
+
+class TestCandidates:
+    @override_settings(FAQ_SEARCH_CANDIDATES_PER_TERM=5)
+    def test_reads_a_bounded_number_of_postings(self):
+        """Test that a query reads the heaviest postings of each term, however many FAQs match"""
+        faqs = [
+            FAQ.objects.create(question='Refund' if i == 7 else f'Question {i}', answer='<p>Refund order.</p>')
+            for i in range(30)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            results = search('refund order', limit=3)
+
+        assert results[0]['id'] == faqs[7].pk
+        assert len(results) == 3
+        # Frequencies, 2 terms' heaviest postings, the candidates' postings, the FAQs
+        assert len(context.captured_queries) == 5
+        assert sum('LIMIT 5' in query['sql'] for query in context.captured_queries) == 2
+
+    def test_limit_widens_the_candidates(self):
+        FAQ.objects.bulk_create(FAQ(question=f'Question {i}', answer='<p>Refund.</p>') for i in range(3))
+        call_command('rebuild_search_index')
+
+        with override_settings(FAQ_SEARCH_CANDIDATES_PER_TERM=1):
+            assert len(search('refund', limit=3)) == 3
+
+
+class TestSearchView:
+    def test_search_endpoint(self, api_client, sample_faq):
+        """Test the search endpoint returns ranked results with snippets"""
+        url = reverse('faqs:faq-search')
+        response = api_client.get(f"{url}?q=सेवा&lang=hi")
+
+        assert response.status_code == 200
+        result = response.json()['results'][0]
+        assert result['id'] == sample_faq.pk
+        assert result['question'] == sample_faq.question_hi
+        assert result['snippet'] == 'यह एक परीक्षण सेवा है।'
+
+    def test_empty_and_invalid_queries(self, api_client, sample_faq):
+        """Test that an empty query returns nothing and a bad limit is rejected"""
+        url = reverse('faqs:faq-search')
+        assert api_client.get(url).json()['results'] == []
+        assert api_client.get(f"{url}?q=service&limit=many").status_code == 400
@@ -0,0 +1,85 @@
+# faqs/tests/test_serializers.py
+
+import pytest
+from django.core.cache import cache
+from faqs.models import FAQ
+from faqs.serializers import FAQSerializer
+
+pytestmark = pytest.mark.django_db
+
+CACHE_METHODS = ('get', 'get_many', 'set', 'set_many', 'add', 'incr')
+
+
+@pytest.fixture
+def cache_calls(monkeypatch):
+    """Names of the cache methods called, in order"""
+    calls = []
+    for name in CACHE_METHODS:
+        method = getattr(cache, name)
+
+        def recorded(*args, _name=name, _method=method, **kwargs):
+            calls.append(_name)
+            return _method(*args, **kwargs)
+        monkeypatch.setattr(cache, name, recorded)
+    return calls
+
+
+def create_faqs(count):
+    return [
+        FAQ.objects.create(
+            question=f'Question {i}', answer=f'<p>Answer {i}</p>',
+            question_hi=f'प्रश्न {i}', answer_hi=f'<p>उत्तर {i}</p>',
+        )
+        for i in range(count)
+    ]
+
+
+def serialize(faqs, lang):
+    return FAQSerializer(faqs, many=True, context={'lang': lang}).data
+
+
+class TestFAQListSerializer:
+    def test_matches_the_per_object_lookup(self, sample_faq, faq_without_translations):
+        """Test that the bulk path returns what FAQ.get_question / get_answer return"""
+        faqs = list(FAQ.objects.order_by('pk'))
+
+        for lang in ('en', 'hi', 'bn', 'fr'):
+            data = serialize(faqs, lang)
+            assert [row['question'] for row in data] == [faq.get_question(lang) for faq in faqs]
+            assert [row['answer'] for row in data] == [faq.get_answer(lang) for faq in faqs]
+
+    @pytest.mark.parametrize('count', [3, 12])
+    def test_cache_round_trips_are_constant_per_page(self, count, cache_calls):
+        """Test that a page of FAQs without loaded translations is one cache read and one write"""
+        create_faqs(count)
+        cache_calls.clear()
+
+        data = serialize(list(FAQ.objects.order_by('pk')), 'hi')
+
+        assert [row['question'] for row in data] == [f'प्रश्न {i}' for i in range(count)]
+        # Counter versions, translations, then the translations that were missing
+        assert cache_calls == ['get_many', 'get_many', 'set_many']
+
+        cache_calls.clear()
+        serialize(list(FAQ.objects.order_by('pk')), 'hi')
+        assert cache_calls == ['get_many', 'get_many']
+
+    def test_loaded_translations_skip_the_cache(self, cache_calls, django_assert_num_queries):
+        """Test that FAQs read with their translations are serialized from memory"""
+        create_faqs(5)
+        faqs = list(FAQSerializer.prepare_queryset(FAQ.objects.order_by('pk'), 'hi'))
+        cache_calls.clear()
+
+        with django_assert_num_queries(0):
+            data = serialize(faqs, 'hi')
+
+        assert data[4]['answer'] == '<p>उत्तर 4</p>'
+        assert cache_calls == []
+
+    def test_single_faq_uses_the_same_lookup(self, sample_faq, cache_calls):
+        cache_calls.clear()
+
+        data = FAQSerializer(FAQ.objects.get(pk=sample_faq.pk), context={'lang': 'bn'}).data
+
+        assert data['question'] == sample_faq.question_bn
+        assert cache_calls == ['get_many', 'get_many', 'set_many']
@@ -0,0 +1,61 @@
+# faqs/tests/test_translation_memory.py
+
+import pytest
+from faqs.models import TranslationMemory
+from faqs.hashing import source_hash
+from faqs.translation_memory import TranslationMemoryStore
+from faqs.utils import TranslationService
+from faqs.tests.conftest import FakeBackend
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTranslationMemory:
+    def test_source_hash_normalizes_whitespace(self):
+        """Test that whitespace differences share a hash"""
+        assert source_hash('Contact  support\n for details') == source_hash('Contact support for details')
+        assert source_hash('Contact support') != source_hash('Contact sales')
+
+    def test_repeated_text_is_translated_once(self):
+        """Test that the backend is skipped for remembered texts"""
+        backend = FakeBackend()
+        memory = TranslationMemoryStore()
+        service = TranslationService(translator=backend, memory=memory)
+
+        assert service.translate_text('Contact support', 'hi') == 'hi:Contact support'
+        assert service.translate_text('Contact support', 'hi') == 'hi:Contact support'
+
+        assert len(backend.calls) == 1
+        assert memory.stats == {'local_hits': 1, 'db_hits': 0, 'misses': 1}
+
+    def test_memory_persists_across_processes(self):
+        """Test that a fresh LRU falls back to the database table"""
+        TranslationService(translator=FakeBackend(), memory=TranslationMemoryStore()).translate_text('Hello', 'bn')
+
+        backend = FakeBackend()
+        memory = TranslationMemoryStore()
+        service = TranslationService(translator=backend, memory=memory)
+
+        assert service.translate_text('Hello', 'bn') == 'bn:Hello'
+        assert backend.calls == []
+        assert memory.stats['db_hits'] == 1
+        assert TranslationMemory.objects.get(target_lang='bn').hits == 1
+
+    def test_batch_only_sends_unknown_texts(self):
+        """Test that a batch only translates what the memory is missing"""
+        memory = TranslationMemoryStore()
+        TranslationService(translator=FakeBackend(), memory=memory).translate_batch(['Known'], ['hi'])
+
+        backend = FakeBackend()
+        result = TranslationService(translator=backend, memory=memory).translate_batch(['Known', 'New'], ['hi'])
+
+        assert result['hi'] == ['hi:Known', 'hi:New']
+        assert backend.calls == [('New', 'hi')]
+
+    def test_lru_is_bounded(self):
+        """Test that the in-process tier evicts the oldest entries"""
+        memory = TranslationMemoryStore(max_entries=2)
+        memory.store_many({'a': '1', 'b': '2', 'c': '3'}, 'hi', 'test')
+
+        assert len(memory._entries) == 2
+        assert TranslationMemory.objects.count() == 3
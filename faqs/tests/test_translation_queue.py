@@ -0,0 +1,125 @@
+# faqs/tests/test_translation_queue.py
+
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.utils import timezone
+from faqs.models import FAQ, TranslationJob
+from faqs.tests.conftest import FakeBackend
+from faqs.translation_memory import TranslationMemoryStore
+from faqs.translation_queue import (
+    TranslationWorkerPool, claim_job, process_job, process_pending_jobs, get_retry_delay,
+)
+from faqs.utils import TranslationService
+
+pytestmark = pytest.mark.django_db
+
+
+class FailingTranslator:
+    def translate_mixed_batch(self, texts, html_contents, target_langs):
+        return {lang: ([None] * len(texts), [None] * len(html_contents)) for lang in target_langs}
+
+
+def redis_is_down(*args, **kwargs):
+    raise ConnectionError('Redis is down')
+
+
+class TestTranslationQueue:
+    def test_claim_job_is_exclusive(self, faq_without_translations):
+        """Test that a claimed job is not handed out twice"""
+        first = claim_job()
+        second = claim_job()
+        third = claim_job()
+
+        assert first.status == TranslationJob.STATUS_RUNNING
+        assert first.attempts == 1
+        assert {first.lang, second.lang} == {'hi', 'bn'}
+        assert third is None
+
+    def test_process_job_fills_translations(self, faq_without_translations, fake_translator):
+        """Test that a job writes the translated columns"""
+        job = claim_job()
+        assert process_job(job, fake_translator)
+
+        faq = FAQ.objects.get(pk=faq_without_translations.pk)
+        assert getattr(faq, f'question_{job.lang}') == f'[{job.lang}] Question without translation'
+        job.refresh_from_db()
+        assert job.status == TranslationJob.STATUS_DONE
+
+    def test_question_and_answer_share_one_backend_call(self, faq_without_translations):
+        """Test that a job sends both fields to the translator in one batch"""
+        backend = FakeBackend()
+        job = claim_job()
+        assert process_job(job, TranslationService(translator=backend, memory=TranslationMemoryStore()))
+
+        assert len(backend.calls) == 1
+        faq = FAQ.objects.get(pk=faq_without_translations.pk)
+        assert getattr(faq, f'question_{job.lang}') == f'{job.lang}:Question without translation'
+        assert getattr(faq, f'answer_{job.lang}') == f'<p>{job.lang}:Answer without translation</p>'
+
+    def test_failed_job_is_retried_with_backoff(self, faq_without_translations):
+        """Test that a failure reschedules the job further in the future"""
+        job = claim_job()
+        before = timezone.now()
+        assert not process_job(job, FailingTranslator())
+
+        job.refresh_from_db()
+        assert job.status == TranslationJob.STATUS_PENDING
+        assert job.run_after >= before + timedelta(seconds=get_retry_delay(1))
+        assert job.last_error
+
+    @override_settings(FAQ_TRANSLATION_MAX_ATTEMPTS=1)
+    def test_job_fails_after_max_attempts(self, faq_without_translations):
+        """Test that a job gives up after the configured number of attempts"""
+        process_pending_jobs(translator=FailingTranslator())
+
+        assert faq_without_translations.translation_status('hi') == TranslationJob.STATUS_FAILED
+        assert faq_without_translations.translation_status('bn') == TranslationJob.STATUS_FAILED
+
+    def test_retry_delay_is_exponential(self):
+        """Test the backoff doubles after every attempt"""
+        assert get_retry_delay(2) == 2 * get_retry_delay(1)
+        assert get_retry_delay(3) == 4 * get_retry_delay(1)
+
+    def test_abandoned_job_is_reclaimed(self, faq_without_translations):
+        """Test that a job left running by a dead worker is picked up again"""
+        TranslationJob.objects.update(
+            status=TranslationJob.STATUS_RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        assert claim_job() is not None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_worker_survives_errors_after_translating(
+        self, faq_without_translations, fake_translator, monkeypatch, caplog,
+    ):
+        """Test that an error outside the translation is logged and the worker moves on to the next job"""
+        monkeypatch.setattr('faqs.translation_queue.TranslationService', lambda: fake_translator)
+        monkeypatch.setattr('faqs.translation_queue.store_rendered', redis_is_down)
+        pool = TranslationWorkerPool(workers=1, poll_interval=0, once=True)
+
+        pool.start()
+        pool.join()
+
+        assert pool.errors == 2
+        assert [record.exc_info[0] for record in caplog.records if record.exc_info] == [ConnectionError] * 2
+        assert not TranslationJob.objects.filter(status=TranslationJob.STATUS_PENDING).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_run_workers_command_reports_errors(self, faq_without_translations, fake_translator, monkeypatch):
+        """Test that the command doesn't report success when jobs errored"""
+        monkeypatch.setattr('faqs.translation_queue.TranslationService', lambda: fake_translator)
+        monkeypatch.setattr('faqs.translation_queue.store_rendered', redis_is_down)
+
+        with pytest.raises(CommandError, match='2 error'):
+            call_command('run_translation_workers', '--once', '--workers', '1', '--poll-interval', '0')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_run_workers_command(self, faq_without_translations, fake_translator, monkeypatch):
+        """Test the management command drains the queue with --once"""
+        monkeypatch.setattr('faqs.translation_queue.TranslationService', lambda: fake_translator)
+        call_command('run_translation_workers', '--once', '--workers', '1')
+
+        assert not TranslationJob.objects.exclude(status=TranslationJob.STATUS_DONE).exists()
@@ -2,6 +2,10 @@
 
 import pytest
 from faqs.utils import TranslationService
+from faqs.tests.conftest import FakeBackend
+from faqs.translation_memory import TranslationMemoryStore
+
+pytestmark = pytest.mark.django_db
 
 class TestTranslationService:
     @pytest.fixture
@@ -30,4 +34,46 @@ class TestTranslationService:
     def test_invalid_language_code(self, translator):
         """Test handling of invalid language codes"""
         translated = translator.translate_text("Hello", 'invalid_code')
-        assert translated is None or translated == "Hello"  # Depending on your implementation
\ No newline at end of file
+        assert translated is None or translated == "Hello"  # Depending on your implementation
+
+class TestTranslateBatch:
+    def test_batch_returns_translations_in_order(self):
+        """Test that every input gets its translation back in position"""
+        service = TranslationService(translator=FakeBackend(), memory=TranslationMemoryStore())
+        result = service.translate_batch(['Hello', '', 'World'], ['hi', 'bn'])
+
+        assert result['hi'] == ['hi:Hello', None, 'hi:World']
+        assert result['bn'] == ['bn:Hello', None, 'bn:World']
+
+    def test_batch_dedupes_and_packs(self):
+        """Test that repeated texts are translated once and packed into one call per language"""
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        texts = ['Contact support', 'Hello', 'Contact support'] * 50
+        result = service.translate_batch(texts, ['hi', 'bn'])
+
+        assert len(backend.calls) == 2
+        assert result['hi'][0] == result['hi'][2] == 'hi:Contact support'
+
+    def test_batch_splits_large_input(self, settings):
+        """Test that chunks respect the configured segment limit"""
+        settings.FAQ_TRANSLATION_BATCH_SIZE = 10
+        backend = FakeBackend()
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        service.translate_batch([f'Text {i}' for i in range(25)], ['hi'])
+
+        assert len(backend.calls) == 3
+
+    def test_batch_falls_back_when_misaligned(self):
+        """Test that a chunk that can't be split back is translated one by one"""
+        backend = FakeBackend(misalign=True)
+        service = TranslationService(translator=backend, memory=TranslationMemoryStore())
+        result = service.translate_batch(['One', 'Two'], ['hi'])
+
+        assert result['hi'] == ['hi:One', 'hi:Two']
+        assert len(backend.calls) == 3
+
+    def test_client_is_shared(self, monkeypatch):
+        """Test that services reuse one translator client"""
+        monkeypatch.setattr('faqs.utils._client', None)
+        assert TranslationService().translator is TranslationService().translator
@@ -1,9 +1,24 @@
 # faqs/tests/test_views.py
 
+import gzip
+import json
+import time
 import pytest
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from faqs.cache_keys import LIST_NAMESPACE, detail_key, get_version, list_key
+from faqs.conditional import make_etag
+from faqs import rendering
+from faqs.models import FAQ, FAQChange
+from faqs.translation_queue import process_pending_jobs
 
 pytestmark = pytest.mark.django_db
 
@@ -14,9 +29,9 @@ class TestFAQViewSet:
         response = api_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert isinstance(response.data, list)
-        assert len(response.data) == 1
-        assert response.data[0]['question'] == sample_faq.question
+        assert isinstance(response.json()['results'], list)
+        assert len(response.json()['results']) == 1
+        assert response.json()['results'][0]['question'] == sample_faq.question
 
     def test_list_faqs_with_language(self, api_client, sample_faq):
         """Test listing FAQs with different languages"""
@@ -25,12 +40,12 @@ class TestFAQViewSet:
         # Test Hindi
         response = api_client.get(f"{url}?lang=hi")
         assert response.status_code == status.HTTP_200_OK
-        assert response.data[0]['question'] == sample_faq.question_hi
+        assert response.json()['results'][0]['question'] == sample_faq.question_hi
 
         # Test Bengali
         response = api_client.get(f"{url}?lang=bn")
         assert response.status_code == status.HTTP_200_OK
-        assert response.data[0]['question'] == sample_faq.question_bn
+        assert response.json()['results'][0]['question'] == sample_faq.question_bn
 
     def test_retrieve_faq(self, api_client, sample_faq):
         """Test retrieving single FAQ"""
@@ -38,7 +53,7 @@ class TestFAQViewSet:
         response = api_client.get(url)
 
         assert response.status_code == status.HTTP_200_OK
-        assert response.data['question'] == sample_faq.question
+        assert response.json()['question'] == sample_faq.question
 
     def test_retrieve_faq_with_language(self, api_client, sample_faq):
         """Test retrieving single FAQ with different languages"""
@@ -47,12 +62,12 @@ class TestFAQViewSet:
         # Test Hindi
         response = api_client.get(f"{url}?lang=hi")
         assert response.status_code == status.HTTP_200_OK
-        assert response.data['question'] == sample_faq.question_hi
+        assert response.json()['question'] == sample_faq.question_hi
 
         # Test Bengali
         response = api_client.get(f"{url}?lang=bn")
         assert response.status_code == status.HTTP_200_OK
-        assert response.data['question'] == sample_faq.question_bn
+        assert response.json()['question'] == sample_faq.question_bn
 
     def test_invalid_language_code(self, api_client, sample_faq):
         """Test behavior with invalid language code"""
@@ -61,7 +76,7 @@ class TestFAQViewSet:
 
         assert response.status_code == status.HTTP_200_OK
         # Should fallback to English
-        assert response.data[0]['question'] == sample_faq.question
+        assert response.json()['results'][0]['question'] == sample_faq.question
 
     @pytest.mark.django_db(transaction=True)
     def test_api_caching(self, api_client, sample_faq):
@@ -78,4 +93,312 @@ class TestFAQViewSet:
         # Second request should return cached response
         response2 = api_client.get(f"{url}?lang=hi")
 
-        assert response1.data == response2.data
\ No newline at end of file
+        assert response1.json() == response2.json()
+
+    def test_list_is_cursor_paginated(self, api_client):
+        """Test that the list is returned one page at a time, newest first"""
+        faqs = [FAQ.objects.create(question=f'Question {i}', answer=f'<p>Answer {i}</p>') for i in range(5)]
+        url = reverse('faqs:faq-list')
+
+        response = api_client.get(f"{url}?page_size=2")
+        assert [item['id'] for item in response.json()['results']] == [faqs[4].id, faqs[3].id]
+        assert response.json()['previous'] is None
+
+        response = api_client.get(response.json()['next'])
+        assert [item['id'] for item in response.json()['results']] == [faqs[2].id, faqs[1].id]
+
+        response = api_client.get(response.json()['next'])
+        assert [item['id'] for item in response.json()['results']] == [faqs[0].id]
+        assert response.json()['next'] is None
+
+    def test_pages_are_cached_separately(self, api_client, sample_faq, faq_without_translations):
+        """Test that each page is cached under its own key and cleared on save"""
+        cache.clear()
+        url = reverse('faqs:faq-list')
+
+        first = api_client.get(f"{url}?page_size=1")
+        second = api_client.get(first.json()['next'])
+        assert first.json()['results'] != second.json()['results']
+        page_key = list_key('en', 1, '')
+        assert cache.get(page_key)['value']['ids'] == [item['id'] for item in first.json()['results']]
+
+        sample_faq.question = "Changed question"
+        sample_faq.save()
+        assert list_key('en', 1, '') != page_key
+        assert cache.get(list_key('en', 1, '')) is None
+
+    def test_detail_is_served_from_prerendered_bytes(self, api_client, sample_faq, django_assert_num_queries):
+        """Test that a saved FAQ is served without touching the database"""
+        url = reverse('faqs:faq-detail', kwargs={'pk': sample_faq.pk})
+
+        with django_assert_num_queries(0):
+            response = api_client.get(f"{url}?lang=hi")
+
+        assert response.json()['question'] == sample_faq.question_hi
+
+    def test_missing_faqs_leave_nothing_in_the_cache(self, api_client):
+        """Test that a 404 doesn't create a generation counter"""
+        cache.clear()
+        for _ in range(3):
+            response = api_client.get(reverse('faqs:faq-detail', kwargs={'pk': 987654}))
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        assert cache.get('faq_987654_version') is None
+
+    def test_zero_padded_pk_shares_the_faq_cache(self, api_client, sample_faq):
+        """Test that /01/ is invalidated along with /1/ on an edit and a deactivation"""
+        padded = f'/api/faqs/{sample_faq.pk:03d}/'
+        assert api_client.get(padded).json()['question'] == sample_faq.question
+
+        sample_faq.question = 'What is this service now?'
+        sample_faq.save()
+        assert api_client.get(padded).json()['question'] == 'What is this service now?'
+
+        sample_faq.is_active = False
+        sample_faq.save()
+        assert api_client.get(padded).status_code == status.HTTP_404_NOT_FOUND
+        assert api_client.get('/api/faqs/abc/').status_code == status.HTTP_404_NOT_FOUND
+
+    def test_list_stitches_prerendered_bytes(self, api_client, sample_faq, faq_without_translations):
+        """Test that the list body is built from the pre-rendered FAQs"""
+        url = reverse('faqs:faq-list')
+        api_client.get(url)
+
+        # Tamper with the stored bytes to prove the list reuses them as-is
+        cache.set(detail_key(sample_faq.pk, 'en'), b'{"id": "stored"}')
+        response = api_client.get(url)
+        assert {"id": "stored"} in response.json()['results']
+
+    @override_settings(ALLOWED_HOSTS=['one.example.com', 'two.example.com'])
+    def test_cached_page_links_are_built_per_request(self, api_client):
+        """Test that a cached page links to each requester's own host and query"""
+        for i in range(3):
+            FAQ.objects.create(question=f'Question {i}', answer='<p>Answer</p>')
+        url = reverse('faqs:faq-list')
+
+        first = api_client.get(f'{url}?page_size=2', HTTP_HOST='one.example.com').json()
+        second = api_client.get(f'{url}?page_size=2&lang=hi', HTTP_HOST='two.example.com', secure=True).json()
+
+        first_next, second_next = urlsplit(first['next']), urlsplit(second['next'])
+        assert first_next[:3] == ('http', 'one.example.com', '/api/faqs/')
+        assert second_next[:3] == ('https', 'two.example.com', '/api/faqs/')
+        assert parse_qs(second_next.query) == {**parse_qs(first_next.query), 'lang': ['hi']}
+
+        page_two = api_client.get(first['next'], HTTP_HOST='two.example.com').json()
+        assert urlsplit(page_two['previous'])[:2] == ('http', 'two.example.com')
+        assert page_two['next'] is None
+        back = api_client.get(page_two['previous'], HTTP_HOST='one.example.com').json()
+        assert back['results'] == first['results']
+
+    def test_cache_misses_skip_inactive_faqs(self, sample_faq, faq_without_translations):
+        """Test that an FAQ deactivated after its page was cached isn't rendered again"""
+        FAQ.objects.filter(pk=faq_without_translations.pk).update(is_active=False)
+        cache.clear()
+
+        results = rendering.get_rendered_many([sample_faq.pk, faq_without_translations.pk], 'en')
+        assert [json.loads(result)['id'] for result in results] == [sample_faq.pk]
+
+
+def selected_columns(sql):
+    """The column names in the SELECT clause of a query"""
+    select = sql[len('SELECT '):sql.index(' FROM ')]
+    return {column.strip().split('.')[-1].strip('"') for column in select.split(',')}
+
+
+class TestColumnPruning:
+    def fetch_detail(self, api_client, faq, lang):
+        cache.clear()
+        url = reverse('faqs:faq-detail', kwargs={'pk': faq.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(f"{url}?lang={lang}")
+        assert response.status_code == status.HTTP_200_OK
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+
+    def test_english_reads_only_faq_columns(self, api_client, sample_faq):
+        """Test that an English request doesn't load translations or unused columns"""
+        queries = self.fetch_detail(api_client, sample_faq, 'en')
+
+        assert len(queries) == 1
+        assert selected_columns(queries[0]) == {'id', 'question', 'answer', 'created_at', 'updated_at'}
+
+    def test_translated_reads_only_one_language(self, api_client, sample_faq):
+        """Test that a Hindi request loads only the Hindi row, without the source hashes"""
+        faq_query, translation_query = self.fetch_detail(api_client, sample_faq, 'hi')
+
+        assert selected_columns(faq_query) == {'id', 'question', 'answer', 'created_at', 'updated_at'}
+        assert selected_columns(translation_query) == {'id', 'faq_id', 'lang', 'question', 'answer'}
+        assert '"lang" = \'hi\'' in translation_query
+
+
+class TestConditionalGet:
+    def test_detail_etag_returns_304(self, api_client, sample_faq, django_assert_num_queries):
+        """Test that a current ETag is answered with a 304 and no body"""
+        url = reverse('faqs:faq-detail', kwargs={'pk': sample_faq.pk})
+        response = api_client.get(f"{url}?lang=hi")
+        etag = response['ETag']
+        assert response['Last-Modified']
+
+        with django_assert_num_queries(0):
+            response = api_client.get(f"{url}?lang=hi", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+        # Each language is its own representation
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_detail_etag_changes_on_update(self, api_client, sample_faq):
+        """Test that an edit makes the old ETag and Last-Modified stale"""
+        url = reverse('faqs:faq-detail', kwargs={'pk': sample_faq.pk})
+        response = api_client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+
+        created = sample_faq.updated_at
+        sample_faq.question = "Changed question"
+        sample_faq.save()
+        assert sample_faq.updated_at > created
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['question'] == "Changed question"
+        assert response['ETag'] != etag
+
+    def test_worker_translation_bumps_updated_at(self, api_client, faq_without_translations, fake_translator):
+        """Test that a translation written by the workers counts as a modification"""
+        url = reverse('faqs:faq-detail', kwargs={'pk': faq_without_translations.pk})
+        etag = api_client.get(f"{url}?lang=hi")['ETag']
+        FAQ.objects.filter(pk=faq_without_translations.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        process_pending_jobs(translator=fake_translator)
+
+        faq_without_translations.refresh_from_db()
+        assert faq_without_translations.updated_at > timezone.now() - timedelta(minutes=1)
+        response = api_client.get(f"{url}?lang=hi", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['question'].startswith('[hi]')
+
+    def test_list_etag_returns_304_without_fetching_the_page(self, api_client, sample_faq, monkeypatch):
+        """Test that the list short-circuits before the page is read"""
+        url = reverse('faqs:faq-list')
+        response = api_client.get(url)
+        etag = response['ETag']
+        assert response['Last-Modified']
+
+        def fail(*args, **kwargs):
+            raise AssertionError('page fetched')
+        monkeypatch.setattr('faqs.views.get_or_compute', fail)
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_stale_list_keeps_its_generation_etag(self, api_client, sample_faq):
+        """Test that a page served stale during a rebuild isn't validated as the current generation"""
+        url = reverse('faqs:faq-list')
+        old_etag = api_client.get(url)['ETag']
+
+        sample_faq.clear_cache()
+        current_etag = make_etag('faq_list', get_version(LIST_NAMESPACE), 'en', 10, '')
+        # Another process is rebuilding the new generation's page
+        cache.add(f"{list_key('en', 10, '')}_lock", 1, timeout=60)
+
+        response = api_client.get(url)
+        assert response['ETag'] == old_etag != current_etag
+
+        # Once the page is rebuilt, the old copy is no longer current
+        cache.delete(f"{list_key('en', 10, '')}_lock")
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=old_etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] == current_etag
+
+    def test_list_if_modified_since(self, api_client, sample_faq):
+        """Test Last-Modified on the list, deactivating an FAQ counts as a change"""
+        url = reverse('faqs:faq-list')
+        last_modified = api_client.get(url)['Last-Modified']
+        assert api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == status.HTTP_304_NOT_MODIFIED
+
+        # A client clock ahead of ours still sees the deactivation made after it
+        later = http_date(time.time() + 3600)
+        sample_faq.is_active = False
+        sample_faq.save()
+        FAQ.objects.filter(pk=sample_faq.pk).update(updated_at=timezone.now() + timedelta(hours=2))
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=later)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'] == []
+
+    def test_list_if_modified_since_sees_deletions(self, api_client, sample_faq, faq_without_translations):
+        """Test that deleting an FAQ moves the list's Last-Modified, though no FAQ was updated"""
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        FAQ.objects.update(updated_at=an_hour_ago)
+        FAQChange.objects.update(created_at=an_hour_ago)
+        cache.clear()
+        url = reverse('faqs:faq-list')
+        last_modified = api_client.get(url)['Last-Modified']
+
+        faq_without_translations.delete()
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_200_OK
+        assert [faq['id'] for faq in response.json()['results']] == [sample_faq.pk]
+
+    def test_etags_survive_a_cache_flush(self, api_client, sample_faq):
+        """Test that the generations counted again after a flush don't validate ETags from before it"""
+        cache.clear()
+        url = reverse('faqs:faq-detail', kwargs={'pk': sample_faq.pk})
+        etag, list_etag = api_client.get(url)['ETag'], api_client.get(reverse('faqs:faq-list'))['ETag']
+        sample_faq.question = 'Changed question'
+        sample_faq.save()
+
+        # Redis restarted: every counter is gone
+        time.sleep(0.002)
+        cache.clear()
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['question'] == 'Changed question'
+        assert api_client.get(reverse('faqs:faq-list'), HTTP_IF_NONE_MATCH=list_etag).status_code == status.HTTP_200_OK
+
+
+class TestDump:
+    def test_dump_streams_a_json_array(self, api_client, sample_faq, faq_without_translations):
+        """Test that the dump is every active FAQ, streamed"""
+        response = api_client.get(f"{reverse('faqs:faq-dump')}?lang=hi")
+
+        assert response.streaming
+        faqs = json.loads(b''.join(response.streaming_content))
+        assert [faq['id'] for faq in faqs] == [faq_without_translations.pk, sample_faq.pk]
+        assert faqs[1]['question'] == sample_faq.question_hi
+
+    @override_settings(FAQ_DUMP_CHUNK_SIZE=2)
+    def test_dump_reads_in_chunks(self, api_client, monkeypatch):
+        """Test that FAQs are fetched a chunk at a time, as the response is consumed"""
+        for i in range(5):
+            FAQ.objects.create(question=f'Question {i}', answer='<p>Answer</p>', is_active=i != 2)
+        chunks = []
+        original = rendering.get_rendered_many
+        monkeypatch.setattr(rendering, 'get_rendered_many', lambda ids, lang: chunks.append(ids) or original(ids, lang))
+
+        response = api_client.get(f"{reverse('faqs:faq-dump')}?ndjson=1")
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert chunks == []
+
+        lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == 4
+        assert [len(chunk) for chunk in chunks] == [2, 2]
+
+    def test_dump_gzip(self, api_client, sample_faq):
+        """Test that the stream is compressed when the client accepts gzip"""
+        response = api_client.get(reverse('faqs:faq-dump'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response['Vary']
+        faqs = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        assert faqs[0]['id'] == sample_faq.pk
+
+    def test_empty_dump(self, api_client):
+        """Test that no FAQs is still valid JSON"""
+        response = api_client.get(reverse('faqs:faq-dump'))
+        assert json.loads(b''.join(response.streaming_content)) == []
@@ -0,0 +1,118 @@
+# faqs/translation_memory.py
+
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+
+from .hashing import source_hash
+from .models import TranslationMemory
+
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationMemoryStore:
+  """
+  Translation memory backed by the TranslationMemory table, with an
+  in-process LRU in front of it
+  """
+
+  def __init__(self, max_entries=None):
+    self.max_entries = max_entries or getattr(settings, 'FAQ_TRANSLATION_MEMORY_SIZE', 10000)
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self.stats = {'local_hits': 0, 'db_hits': 0, 'misses': 0}
+
+  def _remember(self, key, value):
+    with self._lock:
+      self._entries[key] = value
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def _count(self, name, amount=1):
+    with self._lock:
+      self.stats[name] += amount
+
+  def lookup_many(self, texts, target_lang, backend):
+    """Return a dict of text -> translation for the texts found in memory"""
+    found = {}
+    missing = {}
+    for text in texts:
+      key = (source_hash(text), target_lang, backend)
+      with self._lock:
+        value = self._entries.get(key)
+        if value is not None:
+          self._entries.move_to_end(key)
+      if value is not None:
+        found[text] = value
+      else:
+        missing.setdefault(key[0], []).append(text)
+    self._count('local_hits', len(found))
+
+    if missing:
+      try:
+        rows = list(
+          TranslationMemory.objects
+          .filter(source_hash__in=list(missing), target_lang=target_lang, backend=backend)
+          .values_list('pk', 'source_hash', 'translated_text')
+        )
+        if rows:
+          TranslationMemory.objects.filter(pk__in=[row[0] for row in rows]).update(hits=F('hits') + 1)
+      except Exception as e:
+        logger.error(f"Translation memory lookup failed: {str(e)}")
+        rows = []
+
+      for pk, hash_, translated in rows:
+        self._remember((hash_, target_lang, backend), translated)
+        for text in missing[hash_]:
+          found[text] = translated
+      self._count('db_hits', len(rows))
+      self._count('misses', len(missing) - len(rows))
+
+    return found
+
+  def store_many(self, translations, target_lang, backend):
+    """Remember a dict of text -> translation"""
+    entries = {}
+    for text, translated in translations.items():
+      if not text or not translated:
+        continue
+      hash_ = source_hash(text)
+      self._remember((hash_, target_lang, backend), translated)
+      entries[hash_] = TranslationMemory(
+        source_hash=hash_,
+        target_lang=target_lang,
+        backend=backend,
+        source_text=text,
+        translated_text=translated,
+      )
+
+    if entries:
+      try:
+        TranslationMemory.objects.bulk_create(entries.values(), ignore_conflicts=True)
+      except Exception as e:
+        logger.error(f"Translation memory write failed: {str(e)}")
+
+  def clear(self):
+    """Drop the in-process entries and reset the counters"""
+    with self._lock:
+      self._entries.clear()
+      self.stats = dict.fromkeys(self.stats, 0)
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+  """Return the process wide translation memory"""
+  global _memory
+  if _memory is None:
+    with _memory_lock:
+      if _memory is None:
+        _memory = TranslationMemoryStore()
+  return _memory
@@ -0,0 +1,206 @@
+# faqs/translation_queue.py
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .hashing import source_hash
+from .models import FAQ, FAQChange, FAQTranslation, TRANSLATED_FIELDS, TranslationJob
+from .rendering import store_rendered
+from .search import index_faq
+from .utils import TranslationService
+
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationError(Exception):
+  """Raised when the translator could not produce a translation"""
+
+
+def get_max_attempts():
+  return getattr(settings, 'FAQ_TRANSLATION_MAX_ATTEMPTS', 5)
+
+
+def get_retry_delay(attempts):
+  """Exponential backoff delay (in seconds) after the given number of attempts"""
+  base = getattr(settings, 'FAQ_TRANSLATION_RETRY_BACKOFF', 30)
+  cap = getattr(settings, 'FAQ_TRANSLATION_RETRY_MAX_DELAY', 60 * 60)
+  return min(base * (2 ** max(attempts - 1, 0)), cap)
+
+
+def _claimable(now):
+  """Jobs that are due, or running jobs whose worker has gone away"""
+  lease = getattr(settings, 'FAQ_TRANSLATION_LEASE', 5 * 60)
+  return (
+    Q(status=TranslationJob.STATUS_PENDING, run_after__lte=now)
+    | Q(status=TranslationJob.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=lease))
+  )
+
+
+def claim_job():
+  """Atomically claim the next due job, returns None when the queue is empty"""
+  now = timezone.now()
+  candidates = (
+    TranslationJob.objects
+    .filter(_claimable(now))
+    .order_by('run_after', 'id')
+    .values_list('pk', flat=True)[:10]
+  )
+
+  for pk in candidates:
+    # The conditional update makes sure only one worker wins the job
+    claimed = TranslationJob.objects.filter(_claimable(now), pk=pk).update(
+      status=TranslationJob.STATUS_RUNNING,
+      locked_at=now,
+      attempts=F('attempts') + 1,
+    )
+    if claimed:
+      return TranslationJob.objects.select_related('faq').get(pk=pk)
+
+  return None
+
+
+def translate_faq(job, translator):
+  """
+  Translate the fields of a job's FAQ whose English source changed (or that
+  are still empty). Returns the translated values along with the hashes of
+  the source they were made from.
+  """
+  faq, lang = job.faq, job.lang
+  row = FAQTranslation.objects.filter(faq=faq, lang=lang).first()
+
+  hashes = {}
+  for field in TRANSLATED_FIELDS:
+    current_hash = source_hash(getattr(faq, field))
+    if not (row and getattr(row, field) and getattr(row, f'{field}_source_hash') == current_hash):
+      hashes[field] = current_hash
+  if not hashes:
+    return {}
+
+  # Every stale field in one batch, so they share the backend calls
+  text_fields = [field for field in hashes if field != 'answer']
+  html_fields = [field for field in hashes if field == 'answer']
+  texts, documents = translator.translate_mixed_batch(
+    [getattr(faq, field) for field in text_fields], [getattr(faq, field) for field in html_fields], [lang],
+  )[lang]
+
+  values = {}
+  for field, value in zip(text_fields + html_fields, texts + documents):
+    values[field] = value
+    values[f'{field}_source_hash'] = hashes[field]
+
+  missing = [field for field in TRANSLATED_FIELDS if field in values and not values[field]]
+  if missing:
+    raise TranslationError(f"No translation returned for {', '.join(missing)}")
+
+  return values
+
+
+def process_job(job, translator=None):
+  """Run a claimed job, scheduling a retry with backoff if it fails"""
+  translator = translator or TranslationService()
+
+  try:
+    values = translate_faq(job, translator)
+  except Exception as e:
+    logger.error(f"Translation job {job.pk} ({job.lang}) failed: {str(e)}")
+    if job.attempts >= get_max_attempts():
+      job.status = TranslationJob.STATUS_FAILED
+    else:
+      job.status = TranslationJob.STATUS_PENDING
+      job.run_after = timezone.now() + timedelta(seconds=get_retry_delay(job.attempts))
+    job.locked_at = None
+    job.last_error = str(e)
+    job.save(update_fields=['status', 'run_after', 'locked_at', 'last_error', 'updated_at'])
+    return False
+
+  # Write only the translated fields so concurrent edits to the others survive
+  if values:
+    FAQTranslation.objects.update_or_create(faq_id=job.faq_id, lang=job.lang, defaults=values)
+    # The served FAQ changed, update() bypasses auto_now
+    FAQ.objects.filter(pk=job.faq_id).update(updated_at=timezone.now())
+    FAQChange.objects.create(faq_id=job.faq_id, lang=job.lang, action=FAQChange.ACTION_UPDATED)
+  job.faq.clear_cache()
+
+  faq = FAQ.objects.filter(pk=job.faq_id, is_active=True).first()
+  if faq is not None:
+    index_faq(faq, [job.lang])
+    store_rendered(faq)
+
+  # If the FAQ was edited while we worked, save() has put the job back to
+  # pending and this update leaves it there for another pass
+  TranslationJob.objects.filter(pk=job.pk, status=TranslationJob.STATUS_RUNNING, locked_at=job.locked_at).update(
+    status=TranslationJob.STATUS_DONE,
+    locked_at=None,
+    last_error='',
+    updated_at=timezone.now(),
+  )
+  return True
+
+
+def process_pending_jobs(translator=None, limit=None):
+  """Process due jobs until the queue is drained, returns the number processed"""
+  processed = 0
+  while limit is None or processed < limit:
+    job = claim_job()
+    if job is None:
+      break
+    process_job(job, translator)
+    processed += 1
+  return processed
+
+
+class TranslationWorkerPool:
+  """A pool of threads polling the translation queue"""
+
+  def __init__(self, workers=2, poll_interval=2.0, once=False):
+    self.workers = workers
+    self.poll_interval = poll_interval
+    self.once = once
+    self._stop = threading.Event()
+    self._threads = []
+    self._lock = threading.Lock()
+    self.errors = 0
+
+  def _run(self):
+    translator = TranslationService()
+    try:
+      while not self._stop.is_set():
+        job = None
+        try:
+          close_old_connections()
+          job = claim_job()
+          if job is None:
+            if self.once:
+              break
+            self._stop.wait(self.poll_interval)
+            continue
+          process_job(job, translator)
+        except Exception:
+          # E.g. the database or Redis is down: the job is reclaimed once its
+          # lease expires, and the worker keeps polling
+          logger.exception(f"Translation worker error on job {job.pk if job else None}")
+          with self._lock:
+            self.errors += 1
+          self._stop.wait(self.poll_interval)
+    finally:
+      connection.close()
+
+  def start(self):
+    for i in range(self.workers):
+      thread = threading.Thread(target=self._run, name=f'translation-worker-{i}', daemon=True)
+      thread.start()
+      self._threads.append(thread)
+
+  def stop(self):
+    self._stop.set()
+
+  def join(self, timeout=None):
+    for thread in self._threads:
+      thread.join(timeout)
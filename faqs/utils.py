@@ -1,16 +1,42 @@
 # faqs/utils.py
 
+from concurrent.futures import ThreadPoolExecutor
 from googletrans import Translator
 from django.conf import settings
 import logging
+import threading
+
+from . import metrics
+from .html_segments import rebuild_html, segment_html
+from .translation_memory import get_translation_memory
 
 
 logger = logging.getLogger(__name__)
 
+# Segments packed into one backend call are joined with a paragraph break,
+# which the translator keeps in place
+SEGMENT_SEPARATOR = '\n\n'
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_translator_client():
+  """Return the process wide translator client, creating it on first use"""
+  global _client
+  if _client is None:
+    with _client_lock:
+      if _client is None:
+        _client = Translator()
+  return _client
+
 
 class TranslationService:
-  def __init__(self):
-    self.translator = Translator()
+  backend_name = 'googletrans'
+
+  def __init__(self, translator=None, memory=None):
+    self.translator = translator or get_translator_client()
+    self.memory = memory if memory is not None else get_translation_memory()
     self.supported_languages = {'hi': 'hindi', 'bn': 'bengali'}
 
   def translate_text(self, text, target_lang):
@@ -21,11 +47,17 @@ class TranslationService:
       if not text:
         return None
 
-      translation = self.translator.translate(
-        text,
-        dest=target_lang
-      )
+      remembered = self.memory.lookup_many([text], target_lang, self.backend_name)
+      if text in remembered:
+        return remembered[text]
+
+      with metrics.timed('translation'):
+        translation = self.translator.translate(
+          text,
+          dest=target_lang
+        )
 
+      self.memory.store_many({text: translation.text}, target_lang, self.backend_name)
       return translation.text
     except Exception as e:
       logger.error(f"Translation error: {str(e)}")
@@ -35,16 +67,134 @@ class TranslationService:
     """
     Translate HTML content while preserving HTML tags
     """
-    try:
-      if not html_content:
-        return None
+    if not html_content:
+      return None
 
-      # Simple HTML preservation for now
-      translation = self.translator.translate(
-        html_content,
-        dest=target_lang
-      )
-      return translation.text
+    return self.translate_html_batch([html_content], [target_lang])[target_lang][0]
+
+  def translate_html_batch(self, html_contents, target_langs):
+    """
+    Translate many HTML documents, sending only their text segments to the translator.
+
+    Markup is never translated, and since every segment goes through the
+    translation memory an edit to one paragraph only translates that paragraph.
+    Returns the same shape as ``translate_batch``.
+    """
+    translated = self.translate_mixed_batch([], html_contents, target_langs)
+    return {lang: documents for lang, (_, documents) in translated.items()}
+
+  def translate_mixed_batch(self, texts, html_contents, target_langs):
+    """
+    ``translate_batch`` of plain texts and ``translate_html_batch`` of HTML
+    documents together, so they share the backend calls (e.g. an FAQ's question
+    and answer). Returns a dict mapping each language to a (texts, html_contents)
+    pair of lists.
+    """
+    texts = list(texts)
+    try:
+      documents = [segment_html(content) if content else None for content in html_contents]
+      segments = [segment for document in documents if document for segment in document[1]]
+      translated = self.translate_batch(texts + segments, target_langs)
     except Exception as e:
       logger.error(f"HTML translation error: {str(e)}")
-      return None
\ No newline at end of file
+      return {lang: ([None] * len(texts), [None] * len(html_contents)) for lang in target_langs}
+
+    results = {}
+    for lang in target_langs:
+      offset = len(texts)
+      rebuilt = []
+      for document in documents:
+        if document is None:
+          rebuilt.append(None)
+          continue
+
+        tokens, document_segments = document
+        values = translated[lang][offset:offset + len(document_segments)]
+        offset += len(document_segments)
+        if any(value is None for value in values):
+          rebuilt.append(None)
+        else:
+          rebuilt.append(rebuild_html(tokens, values))
+      results[lang] = (translated[lang][:len(texts)], rebuilt)
+    return results
+
+  def translate_batch(self, texts, target_langs):
+    """
+    Translate many texts into many languages with as few backend calls as possible.
+
+    Returns a dict mapping each language to a list of translations in the same
+    order as ``texts`` (None where a text is empty or could not be translated).
+    """
+    texts = list(texts)
+    unique_texts = list(dict.fromkeys(text for text in texts if text))
+
+    # Only the texts the translation memory doesn't know go to the backend
+    translated = {}
+    jobs = []
+    for lang in target_langs:
+      translated[lang] = self.memory.lookup_many(unique_texts, lang, self.backend_name)
+      pending = [text for text in unique_texts if text not in translated[lang]]
+      jobs.extend((lang, chunk) for chunk in self._pack(pending))
+
+    if jobs:
+      max_workers = min(len(jobs), getattr(settings, 'FAQ_TRANSLATION_CONCURRENCY', 4))
+      with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda job: self._translate_chunk(*job), jobs)
+        fresh = {lang: {} for lang in target_langs}
+        for (lang, chunk), chunk_result in zip(jobs, results):
+          fresh[lang].update(zip(chunk, chunk_result))
+
+      # Backend calls run on the pool, the memory is filled from this thread
+      for lang, values in fresh.items():
+        self.memory.store_many(values, lang, self.backend_name)
+        translated[lang].update(values)
+
+    return {
+      lang: [translated[lang].get(text) if text else None for text in texts]
+      for lang in target_langs
+    }
+
+  def _pack(self, texts):
+    """Group texts into chunks that fit in a single backend call"""
+    max_chars = getattr(settings, 'FAQ_TRANSLATION_BATCH_CHARS', 4500)
+    max_segments = getattr(settings, 'FAQ_TRANSLATION_BATCH_SIZE', 100)
+
+    chunks = []
+    chunk, size = [], 0
+    for text in texts:
+      length = len(text) + len(SEGMENT_SEPARATOR)
+      if chunk and (size + length > max_chars or len(chunk) >= max_segments):
+        chunks.append(chunk)
+        chunk, size = [], 0
+      chunk.append(text)
+      size += length
+
+      # Texts that contain the separator can not be split back apart
+      if SEGMENT_SEPARATOR in text:
+        chunks.append(chunk)
+        chunk, size = [], 0
+    if chunk:
+      chunks.append(chunk)
+    return chunks
+
+  def _call_backend(self, text, lang):
+    try:
+      with metrics.timed('translation'):
+        return self.translator.translate(text, dest=lang).text
+    except Exception as e:
+      logger.error(f"Translation error: {str(e)}")
+      return None
+
+  def _translate_chunk(self, lang, chunk):
+    """Translate one packed chunk, falling back to one call per text if it comes back misaligned"""
+    if len(chunk) == 1:
+      return [self._call_backend(chunk[0], lang)]
+
+    joined = self._call_backend(SEGMENT_SEPARATOR.join(chunk), lang)
+    if joined is not None:
+      parts = [part.strip() for part in joined.split(SEGMENT_SEPARATOR)]
+      if len(parts) == len(chunk):
+        return parts
+
+    logger.warning(f"Batched translation to {lang} came back misaligned, translating {len(chunk)} texts one by one")
+    return [self._call_backend(text, lang) for text in chunk]
@@ -1,54 +1,207 @@
 # faqs/views.py
 
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.conf import settings
 from django.core.cache import cache
-from .models import FAQ
+from django.db.models import Max
+from django.http import Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.text import compress_sequence
+from .models import FAQ, FAQChange
+from .access_counts import flush_access_counts, record_access
+from .pagination import FAQCursorPagination
+from .cache_fill import get_or_compute, single_flight
+from .changes import get_changes
+from .cache_keys import LIST_NAMESPACE, detail_key, faq_namespace, get_version, list_key, modified_key, stale_list_key
+from .conditional import is_not_modified, make_etag, not_modified, page_etag, set_validators
+from .languages import get_language, set_language_headers
+from .metrics import render as render_metrics
+from .rendering import (
+  get_rendered_many, iter_rendered, json_response, render_changes, render_faq, render_page, stream_json, stream_ndjson,
+)
+from .search import search as search_faqs
 from .serializers import FAQSerializer
 
 class FAQViewSet(viewsets.ReadOnlyModelViewSet):
   queryset = FAQ.objects.filter(is_active=True)
   serializer_class = FAQSerializer
+  pagination_class = FAQCursorPagination
+  # Only digits, normalized to an int so /01/ and /1/ share one cache namespace
+  lookup_value_regex = r'\d+'
+
+  def initial(self, request, *args, **kwargs):
+    super().initial(request, *args, **kwargs)
+    # Resolved to a served language, so arbitrary inputs share its cache entries
+    self.lang = get_language(request)
+
+  def finalize_response(self, request, response, *args, **kwargs):
+    response = super().finalize_response(request, response, *args, **kwargs)
+    if hasattr(self, 'lang'):
+      set_language_headers(response, self.lang)
+    return response
+
+  def get_queryset(self):
+    # Only the columns and translations of the requested language are read
+    return FAQSerializer.prepare_queryset(super().get_queryset(), self.lang)
 
   def get_serializer_context(self):
     context = super().get_serializer_context()
-    context['lang'] = self.request.query_params.get('lang', 'en')
+    context['lang'] = self.lang
     return context
 
   def list(self, req, *args, **kwargs):
-    lang = req.query_params.get('lang', 'en')
-    cache_key = f'faq_list_{lang}'
+    lang = self.lang
+    cursor = req.query_params.get(self.paginator.cursor_query_param, '')
+    page_size = self.paginator.get_page_size(req)
+    version = get_version(LIST_NAMESPACE)
+    etag = make_etag('faq_list', version, lang, page_size, cursor)
 
-    # Try to get cached responses
-    cached_response = cache.get(cache_key)
-    if cached_response:
-      return Response(cached_response)
+    def build_page():
+      queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None).only('id', 'created_at')
+      faqs = self.paginate_queryset(queryset)
+      # Across all FAQs, so deactivating one shows up as a modification too,
+      # and the change log's newest entry, which is all a deletion leaves
+      latest = max(filter(None, [
+        FAQ.objects.aggregate(latest=Max('updated_at'))['latest'],
+        FAQChange.objects.aggregate(latest=Max('created_at'))['latest'],
+      ]), default=None)
+      return {
+        'ids': [faq.id for faq in faqs],
+        # Cursors only, the links are built per request from its own host and query
+        'next_cursor': self.paginator.get_next_cursor(),
+        'previous_cursor': self.paginator.get_previous_cursor(),
+        'last_modified': latest.timestamp() if latest else None,
+        'version': version,
+      }
 
-    # If not cached then generate the response
-    queryset = self.filter_queryset(self.get_queryset())
-    serializer = self.get_serializer(queryset, many=True)
-    response_data = serializer.data
+    # Answered from the counter alone when the client's copy is of the current generation
+    if 'If-None-Match' in req.headers and is_not_modified(req, etag, None):
+      return not_modified(etag)
 
-    # Cache the response for 1 hour
-    cache.set(cache_key, response_data, timeout=3600)
+    # The page cache only holds the ids and cursors, the FAQs themselves are pre-rendered.
+    # A single request rebuilds an expired page while the others get the previous one,
+    # whose validators are the ones of the generation it was built in.
+    page = get_or_compute(
+      list_key(lang, page_size, cursor, version),
+      build_page,
+      soft_ttl=settings.FAQ_LIST_SOFT_TTL,
+      hard_ttl=settings.FAQ_LIST_HARD_TTL,
+      stale_key=stale_list_key(lang, page_size, cursor),
+    )
+    served_etag = page_etag(page, lang, page_size, cursor)
+    if is_not_modified(req, served_etag, lambda: page.get('last_modified')):
+      return not_modified(served_etag)
 
-    return Response(response_data)
+    results = get_rendered_many(page['ids'], lang)
+    next_link = self.paginator.page_link(req, page.get('next_cursor'))
+    previous_link = self.paginator.page_link(req, page.get('previous_cursor'))
+    response = json_response(render_page(results, next_link, previous_link))
+    return set_validators(response, served_etag, page.get('last_modified'))
+
+  def get_last_modified(self, pk, version):
+    """Modification time of an active FAQ, None if there is no such FAQ"""
+    key = modified_key(pk, version)
+    last_modified = cache.get(key)
+    if last_modified is None:
+      updated_at = FAQ.objects.filter(pk=pk, is_active=True).values_list('updated_at', flat=True).first()
+      if updated_at is None:
+        return None
+      last_modified = updated_at.timestamp()
+      cache.set(key, last_modified, timeout=settings.FAQ_RENDERED_TTL)
+    return last_modified
 
   def retrieve(self, req, *args, **kwargs):
-    lang = req.query_params.get('lang', 'en')
-    instance = self.get_object()
-    cache_key = f'faq_detail_{instance.id}_{lang}'
+    lang = self.lang
+    pk = int(kwargs['pk'])
+    version = get_version(faq_namespace(pk))
+    etag = make_etag('faq', pk, version, lang)
+
+    # Answer from the generation counter alone when the client's copy is current
+    if is_not_modified(req, etag, lambda: self.get_last_modified(pk, version)):
+      return not_modified(etag)
+
+    def render():
+      faq = self.get_object()
+      cache.set(modified_key(faq.pk, version), faq.updated_at.timestamp(), timeout=settings.FAQ_RENDERED_TTL)
+      return render_faq(faq, lang)
+
+    # Serve the pre-rendered response, only one request renders it on a miss
+    payload = single_flight(detail_key(pk, lang, version), render, timeout=settings.FAQ_RENDERED_TTL)
+    if record_access(pk):
+      flush_access_counts()
+    return set_validators(json_response(payload), etag, self.get_last_modified(pk, version))
+
+  @action(detail=False, methods=['get'])
+  def search(self, req):
+    lang = self.lang
+    query = req.query_params.get('q', '').strip()
+    try:
+      limit = min(max(int(req.query_params.get('limit', 10)), 1), settings.FAQ_SEARCH_MAX_RESULTS)
+    except ValueError:
+      return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'query': query, 'results': search_faqs(query, lang, limit=limit)})
+
+  @action(detail=False, methods=['get'])
+  def changes(self, req):
+    lang = self.lang
+    try:
+      since = int(req.query_params.get('since', 0))
+    except ValueError:
+      since = -1
+    if since < 0:
+      return Response({'detail': 'since must be a token returned by this endpoint'}, status=status.HTTP_400_BAD_REQUEST)
+
+    changes = get_changes(since, lang, limit=settings.FAQ_CHANGES_PAGE_SIZE)
+    results = get_rendered_many(changes['changed'], lang)
+    return json_response(render_changes(changes['token'], results, changes['removed'], changes['has_more']))
+
+  @action(detail=False, methods=['get'])
+  def dump(self, req):
+    """Every active FAQ in one language, streamed so memory use doesn't grow with their number"""
+    ids = dump_ids().iterator(chunk_size=settings.FAQ_DUMP_CHUNK_SIZE)
+    chunks = iter_rendered(ids, self.lang, chunk_size=settings.FAQ_DUMP_CHUNK_SIZE)
+
+    if req.query_params.get('ndjson'):
+      content, content_type = stream_ndjson(chunks), 'application/x-ndjson'
+    else:
+      content, content_type = stream_json(chunks), 'application/json'
+    return dump_response(req, content, content_type, compress_sequence)
+
+
+def dump_ids():
+  """Ids of every active FAQ, newest first like the list"""
+  return FAQ.objects.filter(is_active=True).order_by('-created_at', '-id').values_list('id', flat=True)
+
+
+def dump_response(request, content, content_type, compress):
+  """Stream a dump, through ``compress`` when the client accepts gzip"""
+  gzip = re_accepts_gzip.search(request.headers.get('Accept-Encoding', ''))
+  response = StreamingHttpResponse(compress(content) if gzip else content, content_type=content_type)
+  if gzip:
+    response['Content-Encoding'] = 'gzip'
+  patch_vary_headers(response, ('Accept-Encoding',))
+  return response
 
-    # Try to get the cached response
-    cached_response = cache.get(cache_key)
-    if cached_response:
-      return Response(cached_response)
 
-    # If not present in cache, we generate a response
-    serializer = self.get_serializer(instance)
-    response_data = serializer.data
+def _may_read_metrics(request):
+  token = settings.FAQ_METRICS_TOKEN
+  if token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+    return True
+  return request.META.get('REMOTE_ADDR') in settings.FAQ_METRICS_ALLOWED_IPS
 
-    # Cache the response for an hour
-    cache.set(cache_key, response_data, timeout=3600)
 
-    return Response(response_data)
\ No newline at end of file
+def metrics(request):
+  """
+  Request and operation histograms of this process, in the Prometheus text
+  format. Only for the scrapers FAQ_METRICS_ALLOWED_IPS / FAQ_METRICS_TOKEN let in.
+  """
+  if not settings.FAQ_METRICS_ALLOWED_IPS and not settings.FAQ_METRICS_TOKEN:
+    raise Http404
+  if not _may_read_metrics(request):
+    return HttpResponseForbidden()
+  return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')